@@ -0,0 +1,54 @@
+class Acumulador:
+    """Sumas acumuladas de un grupo de notas para obtener sus promedios en O(1)"""
+    def __init__(self):
+        self.suma = 0.0
+        self.suma_ponderada = 0.0
+        self.suma_pesos = 0.0
+        self.conteo = 0
+
+    def agregar(self, nota):
+        self.suma += nota.calificacion
+        self.suma_ponderada += nota.calificacion * nota.peso
+        self.suma_pesos += nota.peso
+        self.conteo += 1
+
+    def agregar_valores(self, calificacion, peso):
+        """Como agregar, a partir de columnas en lugar de un objeto Nota"""
+        self.suma += calificacion
+        self.suma_ponderada += calificacion * peso
+        self.suma_pesos += peso
+        self.conteo += 1
+
+    def quitar(self, nota):
+        self.conteo -= 1
+        if self.conteo == 0:
+            # Evita arrastrar el error de redondeo de las restas sucesivas
+            self.suma = self.suma_ponderada = self.suma_pesos = 0.0
+            return
+        self.suma -= nota.calificacion
+        self.suma_ponderada -= nota.calificacion * nota.peso
+        self.suma_pesos -= nota.peso
+
+    def promedio(self):
+        if not self.conteo:
+            return 0
+        return self.suma / self.conteo
+
+    def promedio_ponderado(self):
+        if not self.conteo:
+            return 0
+        return self.suma_ponderada / self.suma_pesos if self.suma_pesos != 0 else 0
+
+    def valores(self):
+        """(suma, suma_ponderada, suma_pesos, conteo), lo que se guarda en el snapshot"""
+        return (self.suma, self.suma_ponderada, self.suma_pesos, self.conteo)
+
+    @classmethod
+    def desde_valores(cls, suma, suma_ponderada, suma_pesos, conteo):
+        """Reconstruye un acumulador guardado en el snapshot"""
+        acumulador = cls()
+        acumulador.suma = suma
+        acumulador.suma_ponderada = suma_ponderada
+        acumulador.suma_pesos = suma_pesos
+        acumulador.conteo = conteo
+        return acumulador
@@ -1,7 +1,11 @@
+import sys
+
 class Asignatura:
     """Clase que representa una asignatura"""
+    __slots__ = ('codigo', 'nombre', 'creditos', 'profesor')
+
     def __init__(self, codigo, nombre, creditos=0, profesor=""):
-        self.codigo = codigo
+        self.codigo = sys.intern(codigo)
         self.nombre = nombre
         self.creditos = creditos
         self.profesor = profesor
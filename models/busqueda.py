@@ -0,0 +1,127 @@
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from functools import lru_cache
+from itertools import islice
+
+_DIACRITICOS = re.compile('[\u0300-\u036f]')  # marcas combinantes que deja la descomposición NFKD
+
+@lru_cache(maxsize=65536)
+def normalizar(texto):
+    """Clave de búsqueda: minúsculas y sin tildes, para que 'jose' encuentre 'José'"""
+    texto = texto.casefold()
+    if texto.isascii():
+        return texto
+    return _DIACRITICOS.sub('', unicodedata.normalize('NFKD', texto))
+
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _con_prefijo(ordenados, prefijo):
+    """Claves de los pares (texto, clave) ordenados cuyo texto empieza por el prefijo"""
+    inicio = bisect_left(ordenados, (prefijo,))
+    claves = []
+    for texto, clave in islice(ordenados, inicio, None):
+        if not texto.startswith(prefijo):
+            break
+        claves.append(clave)
+    return claves
+
+
+class IndiceBusqueda:
+    """Índice en memoria para buscar entidades por código y por texto, sin tildes ni mayúsculas.
+
+    Los códigos (y cada palabra de los textos) se guardan ordenados para buscar
+    por prefijo con bisect; el texto completo se indexa por trigramas para
+    buscar subcadenas sin recorrer todas las entradas. Se mantiene al día con
+    agregar y eliminar en cada alta, edición o baja.
+    """
+    def __init__(self):
+        self._entradas = {}  # {clave: (codigo normalizado, texto normalizado)}
+        self._codigos = []  # [(codigo normalizado, clave)], ordenada
+        self._palabras = []  # [(palabra normalizada, clave)], ordenada
+        self._trigramas = {}  # {trigrama: {clave}}
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def agregar(self, clave, codigo, *textos):
+        """Indexa (o reindexa) la entidad con su código y sus textos buscables"""
+        if clave in self._entradas:
+            self.eliminar(clave)
+        codigo, texto = self._indexar(clave, codigo, textos)
+        insort(self._codigos, (codigo, clave))
+        for palabra in set(texto.split()):
+            insort(self._palabras, (palabra, clave))
+
+    def agregar_varios(self, entradas):
+        """Indexa (clave, codigo, *textos) en bloque: las listas ordenadas se ordenan una sola vez"""
+        for clave, codigo, *textos in entradas:
+            if clave in self._entradas:
+                self.eliminar(clave)
+            codigo, texto = self._indexar(clave, codigo, textos)
+            self._codigos.append((codigo, clave))
+            self._palabras.extend((palabra, clave) for palabra in set(texto.split()))
+        self._codigos.sort()
+        self._palabras.sort()
+
+    def _indexar(self, clave, codigo, textos):
+        codigo = normalizar(codigo)
+        texto = " ".join(normalizar(t) for t in (codigo, *textos) if t)
+        self._entradas[clave] = (codigo, texto)
+        for trigrama in _trigramas(texto):
+            self._trigramas.setdefault(trigrama, set()).add(clave)
+        return codigo, texto
+
+    def eliminar(self, clave):
+        entrada = self._entradas.pop(clave, None)
+        if entrada is None:
+            return False
+        codigo, texto = entrada
+        del self._codigos[bisect_left(self._codigos, (codigo, clave))]
+        for palabra in set(texto.split()):
+            del self._palabras[bisect_left(self._palabras, (palabra, clave))]
+        for trigrama in _trigramas(texto):
+            claves = self._trigramas[trigrama]
+            claves.discard(clave)
+            if not claves:
+                del self._trigramas[trigrama]
+        return True
+
+    def buscar(self, texto, limite=None):
+        """Claves que coinciden con el texto: primero las de código con ese prefijo (en orden de código),
+        luego las demás por orden de clave; sin texto, todas"""
+        texto = normalizar(texto.strip())
+        if not texto:
+            return list(self._entradas)[:limite]
+        encontradas = _con_prefijo(self._codigos, texto)
+        vistas = set(encontradas)
+        encontradas.extend(sorted(clave for clave in self._por_texto(texto) if clave not in vistas))
+        return encontradas[:limite]
+
+    def coincide(self, clave, texto):
+        """Si buscar(texto) incluiría la clave, comprobándolo solo sobre su entrada"""
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            return False
+        texto = normalizar(texto.strip())
+        codigo, completo = entrada
+        if not texto or codigo.startswith(texto):
+            return True
+        if len(texto) < 3:
+            return any(palabra.startswith(texto) for palabra in completo.split())
+        return texto in completo
+
+    def _por_texto(self, texto):
+        if len(texto) < 3:
+            # Demasiado corto para los trigramas: palabras que empiezan por el texto
+            return set(_con_prefijo(self._palabras, texto))
+        conjuntos = [self._trigramas.get(trigrama) for trigrama in _trigramas(texto)]
+        if not all(conjuntos):
+            return set()
+        conjuntos.sort(key=len)
+        candidatas = conjuntos[0].intersection(*conjuntos[1:])
+        # Los trigramas pueden coincidir sin formar la subcadena completa
+        return {clave for clave in candidatas if texto in self._entradas[clave][1]}
@@ -0,0 +1,271 @@
+from array import array
+from itertools import compress
+from operator import and_, or_
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usan los arreglos de la biblioteca estándar
+    np = None
+
+_SEGUNDOS_DIA = 86400
+
+class _Codificador:
+    """Asigna un entero estable a cada código de entidad"""
+    def __init__(self):
+        self.enteros = {}  # {codigo: entero}
+        self.codigos = []  # [codigo], indexado por entero
+
+    def codificar(self, codigo):
+        entero = self.enteros.get(codigo)
+        if entero is None:
+            entero = self.enteros[codigo] = len(self.codigos)
+            self.codigos.append(codigo)
+        return entero
+
+
+# Columnas del almacén, todas con una entrada por nota (los nombres coinciden con los del snapshot)
+COLUMNAS = ('calificaciones', 'pesos', 'fechas', 'estudiantes', 'asignaturas', 'descripciones', 'ids')
+
+# Codificador de cada columna que guarda textos como enteros
+_CODIFICADORES = {'estudiantes': 'codigos_estudiante', 'asignaturas': 'codigos_asignatura',
+                  'descripciones': 'codigos_descripcion'}
+
+class AlmacenColumnar:
+    """Copia columnar de las notas: una columna contigua por campo numérico.
+
+    Las estadísticas recorren memoria contigua (vectorizadas con NumPy si está
+    disponible) en lugar de acceder a atributos de millones de objetos Nota.
+    Al borrar, la última fila ocupa el hueco para mantener las columnas compactas.
+    """
+    def __init__(self):
+        self.calificaciones = array('d')
+        self.pesos = array('d')
+        self.fechas = array('q')  # ordinal en segundos (ver Nota.fecha_ordinal)
+        self.estudiantes = array('i')  # código de estudiante codificado
+        self.asignaturas = array('i')  # código de asignatura codificado
+        self.descripciones = array('i')  # descripción codificada
+        self.ids = array('q')
+        self._filas = {}  # {id_nota: fila}; None mientras no se necesite (ver _indice_filas)
+        self.codigos_estudiante = _Codificador()
+        self.codigos_asignatura = _Codificador()
+        self.codigos_descripcion = _Codificador()
+
+    @classmethod
+    def desde_snapshot(cls, snapshot):
+        """Copia las columnas de un SnapshotBinario sin crear objetos por fila"""
+        almacen = cls()
+        for nombre in COLUMNAS:
+            setattr(almacen, nombre, snapshot.copiar_columna(nombre))
+        for codificador, codigos in ((almacen.codigos_estudiante, snapshot.metadatos['codigos_estudiante']),
+                                     (almacen.codigos_asignatura, snapshot.metadatos['codigos_asignatura']),
+                                     (almacen.codigos_descripcion, snapshot.metadatos['descripciones'])):
+            for codigo in codigos:
+                codificador.codificar(codigo)
+        almacen._filas = None
+        return almacen
+
+    def _indice_filas(self):
+        # Se construye al primer borrado: cargar desde un snapshot no debe recorrer las filas
+        if self._filas is None:
+            self._filas = {id_nota: fila for fila, id_nota in enumerate(self.ids)}
+        return self._filas
+
+    def __len__(self):
+        return len(self.ids)
+
+    def fila(self, id_nota):
+        """Valores de la nota en el orden de Nota.to_fila(), o None si no está"""
+        fila = self._indice_filas().get(id_nota)
+        if fila is None:
+            return None
+        return (self.codigos_estudiante.codigos[self.estudiantes[fila]],
+                self.codigos_asignatura.codigos[self.asignaturas[fila]],
+                self.calificaciones[fila],
+                self.fechas[fila],
+                self.pesos[fila],
+                self.codigos_descripcion.codigos[self.descripciones[fila]],
+                self.ids[fila])
+
+    def _columnas(self):
+        return tuple(getattr(self, nombre) for nombre in COLUMNAS)
+
+    def agregar(self, nota):
+        if self._filas is not None:
+            self._filas[nota.id_nota] = len(self.ids)
+        self.calificaciones.append(nota.calificacion)
+        self.pesos.append(nota.peso)
+        self.fechas.append(nota.fecha_ordinal)
+        self.estudiantes.append(self.codigos_estudiante.codificar(nota.estudiante))
+        self.asignaturas.append(self.codigos_asignatura.codificar(nota.asignatura))
+        self.descripciones.append(self.codigos_descripcion.codificar(nota.descripcion))
+        self.ids.append(nota.id_nota)
+
+    def eliminar(self, id_nota):
+        filas = self._indice_filas()
+        fila = filas.pop(id_nota)
+        ultima = len(self.ids) - 1
+        if fila != ultima:
+            for columna in self._columnas():
+                columna[fila] = columna[ultima]
+            filas[self.ids[fila]] = fila
+        for columna in self._columnas():
+            columna.pop()
+
+    def eliminar_varios(self, ids_notas):
+        """Quita varias filas: con pocas se rellena cada hueco, con muchas se compactan las columnas en una pasada"""
+        if len(ids_notas) * 16 < len(self.ids):
+            for id_nota in ids_notas:
+                self.eliminar(id_nota)
+            return
+        conservar = [id_nota not in ids_notas for id_nota in self.ids]
+        for nombre in COLUMNAS:
+            columna = getattr(self, nombre)
+            setattr(self, nombre, array(columna.typecode, compress(columna, conservar)))
+        self._filas = None
+
+    def columna(self, nombre):
+        """Copia de la columna como arreglo de NumPy o, sin NumPy, como array.
+
+        Es una copia porque un array que exporta su buffer a NumPy ya no puede
+        crecer: una vista retenida por quien llama haría fallar la siguiente alta.
+        """
+        columna = getattr(self, nombre)
+        if np is not None:
+            return np.array(columna, dtype=columna.typecode)
+        return columna[:]
+
+    def maximo(self):
+        return max(self.calificaciones) if self.calificaciones else 0
+
+    def minimo(self):
+        return min(self.calificaciones) if self.calificaciones else 0
+
+    def contar_entre(self, minimo=None, maximo=None):
+        """Cantidad de calificaciones en [minimo, maximo)"""
+        if np is not None:
+            valores = self.columna('calificaciones')
+            mascara = np.ones(len(valores), dtype=bool)
+            if minimo is not None:
+                mascara &= valores >= minimo
+            if maximo is not None:
+                mascara &= valores < maximo
+            return int(np.count_nonzero(mascara))
+        return sum(1 for valor in self.calificaciones
+                   if (minimo is None or valor >= minimo) and (maximo is None or valor < maximo))
+
+    def histograma(self, intervalos=10):
+        """(conteos, bordes) de las calificaciones, con el mismo rango automático que numpy.histogram"""
+        if np is not None:
+            conteos, bordes = np.histogram(self.columna('calificaciones'), bins=intervalos)
+            return conteos.tolist(), bordes.tolist()
+
+        if not self.calificaciones:
+            inferior, superior = 0.0, 1.0
+        else:
+            inferior, superior = min(self.calificaciones), max(self.calificaciones)
+            if inferior == superior:
+                inferior, superior = inferior - 0.5, superior + 0.5
+        ancho = (superior - inferior) / intervalos
+        bordes = [inferior + i * ancho for i in range(intervalos)] + [superior]
+        conteos = [0] * intervalos
+        for valor in self.calificaciones:
+            conteos[min(int((valor - inferior) / ancho), intervalos - 1)] += 1
+        return conteos, bordes
+
+    def _instantanea(self, nombres):
+        """Copia de las columnas indicadas ('dias' se deriva de 'fechas').
+
+        Las consultas pueden correr fuera del hilo de la interfaz mientras esta
+        agrega o borra filas; sobre una copia no ven columnas a medio cambiar
+        (y NumPy no retiene el buffer de un array que aún debe crecer).
+        """
+        columnas = {nombre: getattr(self, 'fechas' if nombre == 'dias' else nombre)[:] for nombre in nombres}
+        filas = min(map(len, columnas.values()), default=0)
+        return {nombre: columna if len(columna) == filas else columna[:filas] for nombre, columna in columnas.items()}
+
+    @staticmethod
+    def _valores(nombre, columnas):
+        columna = columnas[nombre]
+        if np is not None:
+            valores = np.frombuffer(columna, dtype=columna.typecode) if len(columna) else np.empty(0, columna.typecode)
+            return valores // _SEGUNDOS_DIA if nombre == 'dias' else valores
+        if nombre == 'dias':
+            return [fecha // _SEGUNDOS_DIA for fecha in columna]
+        return columna
+
+    def valores_por_id(self, nombre):
+        """{id_nota: valor} de una columna, con los textos ya decodificados ('dias' se deriva de 'fechas')"""
+        columnas = self._instantanea(('ids', nombre))
+        valores = columnas[nombre]
+        if nombre == 'dias':
+            valores = [fecha // _SEGUNDOS_DIA for fecha in valores]
+        elif nombre in _CODIFICADORES:
+            codigos = getattr(self, _CODIFICADORES[nombre]).codigos[:]
+            valores = map(codigos.__getitem__, valores)
+        return dict(zip(columnas['ids'], valores))
+
+    def valores_distintos(self, nombre):
+        """Valores distintos de una columna, ordenados"""
+        valores = self._valores(nombre, self._instantanea((nombre,)))
+        if np is not None:
+            return np.unique(valores).tolist()
+        return sorted(set(valores))
+
+    def _seleccion(self, condicion, columnas):
+        """Máscara de NumPy o, sin NumPy, lista de booleanos con las filas que cumplen la condición"""
+        nombre, *limites = condicion
+        valores = self._valores(nombre, columnas)
+        if len(limites) == 2:
+            minimo, maximo = limites
+            if np is not None:
+                mascara = np.ones(len(valores), dtype=bool)
+                if minimo is not None:
+                    mascara &= valores >= minimo
+                if maximo is not None:
+                    mascara &= valores < maximo
+                return mascara
+            return [(minimo is None or valor >= minimo) and (maximo is None or valor < maximo)
+                    for valor in valores]
+        aceptados = limites[0]
+        if np is not None:
+            return np.isin(valores, np.fromiter(aceptados, dtype=valores.dtype, count=len(aceptados)))
+        return [valor in aceptados for valor in valores]
+
+    def filtrar(self, todas=(), alguna=()):
+        """Ids (en orden creciente) que cumplen todas las condiciones de `todas` y, si se dan,
+        al menos una de `alguna`.
+
+        Cada condición es (columna, valores aceptados) o (columna, minimo, maximo)
+        para el rango [minimo, maximo); ninguna recorre objetos Nota.
+        """
+        columnas = self._instantanea({'ids'} | {condicion[0] for condicion in (*todas, *alguna)})
+        ids = columnas['ids']
+        if np is not None:
+            mascara = np.ones(len(ids), dtype=bool)
+            for condicion in todas:
+                mascara &= self._seleccion(condicion, columnas)
+            if alguna:
+                mascara &= np.logical_or.reduce([self._seleccion(condicion, columnas) for condicion in alguna])
+            return array('q', np.sort(self._valores('ids', columnas)[mascara]).tobytes())
+
+        seleccion = None
+        for condicion in todas:
+            otra = self._seleccion(condicion, columnas)
+            seleccion = otra if seleccion is None else list(map(and_, seleccion, otra))
+        if alguna:
+            cualquiera = None
+            for condicion in alguna:
+                otra = self._seleccion(condicion, columnas)
+                cualquiera = otra if cualquiera is None else list(map(or_, cualquiera, otra))
+            seleccion = cualquiera if seleccion is None else list(map(and_, seleccion, cualquiera))
+        if seleccion is None:
+            return self.ids_ordenados(ids)
+        return self.ids_ordenados(array('q', compress(ids, seleccion)))
+
+    @staticmethod
+    def ids_ordenados(ids):
+        """Los ids en orden creciente: eliminar rellena cada hueco con la última fila, así que las filas
+        no siguen el orden de alta"""
+        if np is not None:
+            return array('q', np.sort(np.frombuffer(ids, dtype='q')).tobytes()) if len(ids) else array('q')
+        return array('q', sorted(ids))
@@ -0,0 +1,77 @@
+import json
+import os
+
+OPERACION_LOTE = 'transaccion'
+
+def contar_mutaciones(operacion, datos):
+    """Mutaciones que representa un registro: los lotes y los datos en forma de lista agrupan varias"""
+    if operacion == OPERACION_LOTE:
+        return sum(contar_mutaciones(op, d) for op, d in datos)
+    return len(datos) if isinstance(datos, list) else 1
+
+class DiarioCambios:
+    """Diario de solo-anexado: un registro compacto por cada mutación del sistema"""
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.total_registros = 0  # mutaciones individuales, contando las de cada lote
+        self._archivo_abierto = None
+
+    def registrar(self, secuencia, operacion, datos):
+        """Anexa un registro al final del diario"""
+        self.registrar_varios([(secuencia, operacion, datos)])
+
+    def registrar_varios(self, registros, sincronizar=False):
+        """Anexa varios registros (secuencia, operacion, datos) con una sola escritura; con
+        sincronizar=True no vuelve hasta que el sistema operativo los ha llevado al disco"""
+        if not registros:
+            return
+        if self._archivo_abierto is None:
+            self._archivo_abierto = open(self.archivo, 'a', encoding='utf-8')
+        self._archivo_abierto.write(''.join(
+            json.dumps({'s': secuencia, 'op': operacion, 'd': datos},
+                       ensure_ascii=False, separators=(',', ':')) + '\n'
+            for secuencia, operacion, datos in registros))
+        self._archivo_abierto.flush()
+        if sincronizar:
+            os.fsync(self._archivo_abierto.fileno())
+        self.total_registros += sum(contar_mutaciones(operacion, datos) for _, operacion, datos in registros)
+
+    def leer(self):
+        """Devuelve los registros válidos del diario como tuplas (secuencia, operacion, datos)"""
+        registros = []
+        if not os.path.exists(self.archivo):
+            return registros
+
+        posicion_valida = 0
+        total = 0
+        with open(self.archivo, 'rb') as f:
+            for linea in f:
+                # Un registro incompleto solo puede aparecer al final (escritura interrumpida)
+                if not linea.endswith(b'\n'):
+                    break
+                try:
+                    registro = json.loads(linea.decode('utf-8'))
+                except ValueError:
+                    break
+                registros.append((registro['s'], registro['op'], registro['d']))
+                posicion_valida += len(linea)
+                total += contar_mutaciones(registro['op'], registro['d'])
+
+        # Descartar la cola corrupta para que los nuevos registros queden legibles
+        if posicion_valida < os.path.getsize(self.archivo):
+            with open(self.archivo, 'r+b') as f:
+                f.truncate(posicion_valida)
+
+        self.total_registros = total
+        return registros
+
+    def truncar(self):
+        """Vacía el diario después de un checkpoint"""
+        self.cerrar()
+        open(self.archivo, 'w').close()
+        self.total_registros = 0
+
+    def cerrar(self):
+        if self._archivo_abierto is not None:
+            self._archivo_abierto.close()
+            self._archivo_abierto = None
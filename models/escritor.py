@@ -0,0 +1,156 @@
+import threading
+import time
+
+ESPERA_ESCRITURA = 0.5  # segundos sin mutaciones antes de escribir una ráfaga
+LATENCIA_MAXIMA_ESCRITURA = 5.0  # ningún cambio espera más que esto, aunque la ráfaga continúe
+
+class EscritorSegundoPlano:
+    """Hilo dedicado a la persistencia: agrupa ráfagas de mutaciones en una sola escritura.
+
+    El hilo de la interfaz solo encola los registros del diario y, al llegar al
+    umbral de checkpoint, una captura del estado; este hilo escribe cuando pasan
+    `espera` segundos sin cambios o cuando el cambio pendiente más antiguo cumple
+    `latencia_maxima` segundos. Una captura nueva reemplaza a la que aún no se
+    escribió, de modo que solo se escribe el estado más reciente.
+    """
+    def __init__(self, diario, escribir_checkpoint, espera=ESPERA_ESCRITURA,
+                 latencia_maxima=LATENCIA_MAXIMA_ESCRITURA, al_cambiar_estado=None):
+        self.diario = diario
+        self._escribir_checkpoint = escribir_checkpoint  # función(captura) que escribe el snapshot
+        self.espera = espera
+        self.latencia_maxima = latencia_maxima
+        self.al_cambiar_estado = al_cambiar_estado  # función(pendiente), llamada desde cualquiera de los hilos
+        self.escrituras = 0  # ráfagas escritas
+        self.ultimo_error = None
+
+        self._condicion = threading.Condition()
+        self._registros = []  # [(secuencia, operacion, datos)] aún no escritos
+        self._captura = None  # (secuencia, ...) del checkpoint pendiente
+        self._primer_cambio = None  # time.monotonic() del cambio pendiente más antiguo
+        self._ultimo_cambio = None
+        self._escribiendo = False
+        self._vaciando = 0  # hilos esperando en vaciar(): se escribe sin esperar
+        self._reintentar_en = 0  # tras un error, no se reintenta antes de este instante
+        self._detenido = False
+        self._hilo = threading.Thread(target=self._ejecutar, name="escritor-datos", daemon=True)
+        self._hilo.start()
+
+    def anexar(self, secuencia, operacion, datos):
+        """Encola un registro del diario"""
+        with self._condicion:
+            self._registros.append((secuencia, operacion, datos))
+            avisar = self._anotar_cambio()
+        self._avisar(avisar)
+
+    def solicitar_checkpoint(self, captura):
+        """Encola una captura del estado para escribirla como snapshot"""
+        with self._condicion:
+            self._captura = captura
+            avisar = self._anotar_cambio()
+        self._avisar(avisar)
+
+    def _anotar_cambio(self):
+        ahora = time.monotonic()
+        estaba_vacio = self._primer_cambio is None and not self._escribiendo
+        if self._primer_cambio is None:
+            self._primer_cambio = ahora
+        self._ultimo_cambio = ahora
+        self._condicion.notify_all()
+        return estaba_vacio
+
+    def _avisar(self, avisar, pendiente=True):
+        if avisar and self.al_cambiar_estado is not None:
+            self.al_cambiar_estado(pendiente)
+
+    def _hay_pendiente(self):
+        return bool(self._registros) or self._captura is not None or self._escribiendo
+
+    def pendiente(self):
+        """True mientras haya cambios sin escribir en disco"""
+        with self._condicion:
+            return self._hay_pendiente()
+
+    def vaciar(self, timeout=None):
+        """Escribe ya lo pendiente y espera a que llegue al disco; False si se agotó el tiempo"""
+        with self._condicion:
+            self._vaciando += 1
+            self._condicion.notify_all()
+            try:
+                return self._condicion.wait_for(lambda: not self._hay_pendiente(), timeout)
+            finally:
+                self._vaciando -= 1
+
+    def detener(self, timeout=None):
+        """Vacía lo pendiente y termina el hilo; False si no se pudo escribir todo a tiempo"""
+        escrito = self.vaciar(timeout)
+        with self._condicion:
+            self._detenido = True
+            self._condicion.notify_all()
+        self._hilo.join(timeout)
+        return escrito
+
+    def _esperar_lote(self):
+        """Espera a que toque escribir y toma lo pendiente; None al detenerse"""
+        with self._condicion:
+            while True:
+                hay_cambios = bool(self._registros) or self._captura is not None
+                if self._detenido and (not hay_cambios or self._reintentar_en > time.monotonic()):
+                    return None
+                if not hay_cambios:
+                    self._condicion.wait()
+                    continue
+                ahora = time.monotonic()
+                if self._vaciando or self._detenido:
+                    limite = self._reintentar_en
+                else:
+                    limite = max(min(self._ultimo_cambio + self.espera, self._primer_cambio + self.latencia_maxima),
+                                 self._reintentar_en)
+                if ahora >= limite:
+                    break
+                self._condicion.wait(limite - ahora)
+
+            registros, self._registros = self._registros, []
+            captura, self._captura = self._captura, None
+            self._primer_cambio = self._ultimo_cambio = None
+            self._escribiendo = True
+            return registros, captura
+
+    def _ejecutar(self):
+        while True:
+            lote = self._esperar_lote()
+            if lote is None:
+                return
+            registros, captura = lote
+            try:
+                self._escribir(registros, captura)
+                error = None
+            except Exception as e:
+                print(f"Error al escribir en segundo plano: {e}")
+                error = e
+
+            with self._condicion:
+                self._escribiendo = False
+                self.ultimo_error = error
+                if error is None:
+                    self.escrituras += 1
+                else:
+                    # Devolver lo no escrito a la cola; reescribir registros ya escritos es inocuo
+                    # porque la reproducción omite las secuencias ya aplicadas
+                    self._registros[:0] = registros
+                    if self._captura is None:
+                        self._captura = captura
+                    self._reintentar_en = time.monotonic() + self.latencia_maxima
+                    self._anotar_cambio()
+                pendiente = self._hay_pendiente()
+                self._condicion.notify_all()
+            self._avisar(not pendiente, pendiente=False)
+
+    def _escribir(self, registros, captura):
+        if captura is None:
+            self.diario.registrar_varios(registros, sincronizar=True)
+            return
+        # Los registros posteriores a la captura deben sobrevivir al vaciado del diario
+        secuencia = captura[0]
+        self.diario.registrar_varios([r for r in registros if r[0] <= secuencia], sincronizar=True)
+        self._escribir_checkpoint(captura)
+        self.diario.registrar_varios([r for r in registros if r[0] > secuencia], sincronizar=True)
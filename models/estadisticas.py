@@ -0,0 +1,131 @@
+import math
+from array import array
+from bisect import bisect_left
+from operator import mul
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se hace una sola pasada en Python puro
+    np = None
+
+# Límites inferiores de cada categoría de calificación, de menor a mayor
+LIMITES_CATEGORIAS = (3.0, 4.0, 4.5)
+CATEGORIAS = ('deficientes', 'regulares', 'buenas', 'excelentes')  # <3.0, 3.0-4.0, 4.0-4.5, ≥4.5
+PERCENTILES = (25, 50, 75, 90)
+
+class ResumenCalificaciones:
+    """Estadísticas de un conjunto de calificaciones calculadas en una sola pasada"""
+    __slots__ = ('total', 'promedio', 'promedio_ponderado', 'desviacion', 'minimo', 'maximo',
+                 'percentiles', 'deficientes', 'regulares', 'buenas', 'excelentes')
+
+    def __init__(self):
+        self.total = 0
+        self.promedio = 0
+        self.promedio_ponderado = 0
+        self.desviacion = 0  # desviación estándar poblacional
+        self.minimo = 0
+        self.maximo = 0
+        self.percentiles = {}  # {percentil: valor}
+        self.deficientes = self.regulares = self.buenas = self.excelentes = 0
+
+    @property
+    def mediana(self):
+        return self.percentiles.get(50, 0)
+
+    @property
+    def aprobadas(self):
+        return self.total - self.deficientes
+
+    def porcentaje(self, cantidad):
+        return cantidad / self.total * 100 if self.total else 0
+
+    def conteos(self):
+        """{categoria: cantidad} en el orden de CATEGORIAS"""
+        return {categoria: getattr(self, categoria) for categoria in CATEGORIAS}
+
+
+def _percentil_ordenado(ordenados, p):
+    # Interpolación lineal entre los vecinos más cercanos, igual que numpy.percentile
+    posicion = (len(ordenados) - 1) * p / 100
+    inferior = math.floor(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+
+def resumir_calificaciones(calificaciones, pesos=None, percentiles=PERCENTILES):
+    """ResumenCalificaciones de una secuencia de calificaciones (array, lista o arreglo de NumPy)"""
+    resumen = ResumenCalificaciones()
+    resumen.total = len(calificaciones)
+    if not resumen.total:
+        return resumen
+
+    if np is not None:
+        valores = np.asarray(calificaciones, dtype=float)
+        conteos = np.bincount(np.searchsorted(LIMITES_CATEGORIAS, valores, side='right'),
+                              minlength=len(CATEGORIAS)).tolist()
+        resumen.promedio = float(valores.mean())
+        resumen.desviacion = float(valores.std())
+        resumen.minimo = float(valores.min())
+        resumen.maximo = float(valores.max())
+        resumen.percentiles = dict(zip(percentiles, np.percentile(valores, percentiles).tolist()))
+        if pesos is not None:
+            suma_pesos = float(np.sum(pesos))
+            resumen.promedio_ponderado = float(np.dot(valores, np.asarray(pesos, dtype=float))) / suma_pesos \
+                if suma_pesos else 0
+    else:
+        # Ordenar y sumar corre en C; los conteos por categoría salen de bisecciones sobre la lista ordenada
+        ordenados = sorted(calificaciones)
+        cortes = [0] + [bisect_left(ordenados, limite) for limite in LIMITES_CATEGORIAS] + [resumen.total]
+        conteos = [cortes[i + 1] - cortes[i] for i in range(len(CATEGORIAS))]
+        resumen.promedio = math.fsum(ordenados) / resumen.total
+        varianza = sum(map(mul, ordenados, ordenados)) / resumen.total - resumen.promedio ** 2
+        resumen.desviacion = math.sqrt(max(varianza, 0.0))
+        resumen.minimo, resumen.maximo = ordenados[0], ordenados[-1]
+        resumen.percentiles = {p: _percentil_ordenado(ordenados, p) for p in percentiles}
+        if pesos is not None:
+            suma_pesos = math.fsum(pesos)
+            resumen.promedio_ponderado = sum(map(mul, calificaciones, pesos)) / suma_pesos if suma_pesos else 0
+
+    resumen.deficientes, resumen.regulares, resumen.buenas, resumen.excelentes = conteos
+    return resumen
+
+
+def resumir_notas(notas, percentiles=PERCENTILES):
+    """ResumenCalificaciones de una lista de objetos Nota"""
+    calificaciones = array('d', (nota.calificacion for nota in notas))
+    pesos = array('d', (nota.peso for nota in notas))
+    return resumir_calificaciones(calificaciones, pesos, percentiles)
+
+
+if __name__ == '__main__':
+    # Comparativa: python -m models.estadisticas
+    import random
+    import timeit
+    from .nota import Nota
+
+    random.seed(0)
+    notas = [Nota("E1", "A1", round(random.uniform(0, 5), 1), 0, random.choice((10.0, 20.0, 30.0)))
+             for _ in range(200000)]
+
+    def por_separado():
+        # Lo que hacían las pestañas: una comprensión por categoría y el promedio con sum/len
+        return (len([n for n in notas if n.calificacion >= 4.5]),
+                len([n for n in notas if 4.0 <= n.calificacion < 4.5]),
+                len([n for n in notas if 3.0 <= n.calificacion < 4.0]),
+                len([n for n in notas if n.calificacion < 3.0]),
+                sum(n.calificacion for n in notas) / len(notas))
+
+    resumen = resumir_notas(notas)
+    assert por_separado()[:4] == (resumen.excelentes, resumen.buenas, resumen.regulares, resumen.deficientes)
+
+    calificaciones = array('d', (nota.calificacion for nota in notas))
+    pesos = array('d', (nota.peso for nota in notas))
+    tiempos = {}
+    for nombre, funcion in (("Por separado (comprensiones + sum/len)", por_separado),
+                            ("resumir_notas (desde objetos Nota)", lambda: resumir_notas(notas)),
+                            ("resumir_calificaciones (columnas)", lambda: resumir_calificaciones(calificaciones,
+                                                                                                 pesos))):
+        tiempos[nombre] = min(timeit.repeat(funcion, number=1, repeat=5))
+        referencia = next(iter(tiempos.values()))
+        print(f"{nombre:45} {tiempos[nombre] * 1000:8.1f} ms  x{referencia / tiempos[nombre]:.1f}")
+    print(f"NumPy: {'sí' if np is not None else 'no'}, {len(notas)} notas")
@@ -1,7 +1,11 @@
+import sys
+
 class Estudiante:
     """Clase que representa un estudiante"""
+    __slots__ = ('codigo', 'nombre', 'programa', 'email', 'telefono')
+
     def __init__(self, codigo, nombre, programa, email="", telefono=""):
-        self.codigo = codigo
+        self.codigo = sys.intern(codigo)
         self.nombre = nombre
         self.programa = programa
         self.email = email
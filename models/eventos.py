@@ -0,0 +1,50 @@
+# Tipos de cambio que SistemaNotas notifica a sus suscriptores
+NOTAS_AGREGADAS = 'notas_agregadas'
+NOTAS_EDITADAS = 'notas_editadas'
+NOTAS_ELIMINADAS = 'notas_eliminadas'
+ESTUDIANTE_AGREGADO = 'estudiante_agregado'
+ESTUDIANTE_EDITADO = 'estudiante_editado'
+ESTUDIANTE_ELIMINADO = 'estudiante_eliminado'
+ASIGNATURA_AGREGADA = 'asignatura_agregada'
+ASIGNATURA_EDITADA = 'asignatura_editada'
+ASIGNATURA_ELIMINADA = 'asignatura_eliminada'
+PROFESOR_AGREGADO = 'profesor_agregado'
+PROFESOR_EDITADO = 'profesor_editado'
+PROFESOR_ELIMINADO = 'profesor_eliminado'
+PERIODO_AGREGADO = 'periodo_agregado'
+PERIODO_EDITADO = 'periodo_editado'
+PERIODO_ELIMINADO = 'periodo_eliminado'
+DATOS_RECARGADOS = 'datos_recargados'  # cualquier dato pudo cambiar: hay que refrescarlo todo
+
+# Catálogo al que se refieren las claves de cada tipo de cambio
+CATALOGO_DE_CAMBIO = {
+    NOTAS_AGREGADAS: 'notas', NOTAS_EDITADAS: 'notas', NOTAS_ELIMINADAS: 'notas',
+    ESTUDIANTE_AGREGADO: 'estudiantes', ESTUDIANTE_EDITADO: 'estudiantes', ESTUDIANTE_ELIMINADO: 'estudiantes',
+    ASIGNATURA_AGREGADA: 'asignaturas', ASIGNATURA_EDITADA: 'asignaturas', ASIGNATURA_ELIMINADA: 'asignaturas',
+    PROFESOR_AGREGADO: 'profesores', PROFESOR_EDITADO: 'profesores', PROFESOR_ELIMINADO: 'profesores',
+    PERIODO_AGREGADO: 'periodos', PERIODO_EDITADO: 'periodos', PERIODO_ELIMINADO: 'periodos',
+}
+
+
+class Cambio:
+    """Un cambio en los datos del sistema y las claves que afecta.
+
+    claves son las del catálogo del tipo (ids de nota, códigos de estudiante...);
+    en los cambios de notas, estudiantes y asignaturas son además los códigos
+    cuyos promedios cambiaron (en una edición, tanto los anteriores como los nuevos).
+    """
+    __slots__ = ('tipo', 'claves', 'estudiantes', 'asignaturas')
+
+    def __init__(self, tipo, claves=(), estudiantes=(), asignaturas=()):
+        self.tipo = tipo
+        self.claves = tuple(claves)
+        self.estudiantes = frozenset(estudiantes)
+        self.asignaturas = frozenset(asignaturas)
+
+    @property
+    def catalogo(self):
+        """'notas', 'estudiantes', 'asignaturas', 'profesores', 'periodos' o None si se recargó todo"""
+        return CATALOGO_DE_CAMBIO.get(self.tipo)
+
+    def __repr__(self):
+        return f"Cambio({self.tipo}, {len(self.claves)} claves)"
@@ -0,0 +1,114 @@
+import heapq
+
+class HeapIndexado:
+    """Min-heap de notas por calificación con posición indexada por id_nota.
+
+    Permite eliminar o reemplazar cualquier nota en O(log n) manteniendo el
+    invariante del heap, y consultar las n más bajas sin copiar el arreglo.
+    """
+    def __init__(self, notas=()):
+        self._construir(notas)
+
+    def _construir(self, notas):
+        self._elementos = list(notas)
+        # heapify (Floyd) en O(n) en C; compara con Nota.__lt__, es decir, por calificación
+        heapq.heapify(self._elementos)
+        self._posiciones = {nota.id_nota: i for i, nota in enumerate(self._elementos)}
+
+    def __len__(self):
+        return len(self._elementos)
+
+    def __iter__(self):
+        return iter(self._elementos)
+
+    def __contains__(self, id_nota):
+        return id_nota in self._posiciones
+
+    def _colocar(self, i, nota):
+        self._elementos[i] = nota
+        self._posiciones[nota.id_nota] = i
+
+    def _subir(self, i):
+        elementos = self._elementos
+        nota = elementos[i]
+        while i > 0:
+            padre = (i - 1) >> 1
+            if nota.calificacion >= elementos[padre].calificacion:
+                break
+            self._colocar(i, elementos[padre])
+            i = padre
+        self._colocar(i, nota)
+
+    def _bajar(self, i):
+        elementos = self._elementos
+        total = len(elementos)
+        nota = elementos[i]
+        while True:
+            hijo = 2 * i + 1
+            if hijo >= total:
+                break
+            derecho = hijo + 1
+            if derecho < total and elementos[derecho].calificacion < elementos[hijo].calificacion:
+                hijo = derecho
+            if elementos[hijo].calificacion >= nota.calificacion:
+                break
+            elementos[i] = elementos[hijo]
+            self._posiciones[elementos[i].id_nota] = i
+            i = hijo
+        elementos[i] = nota
+        self._posiciones[nota.id_nota] = i
+
+    def agregar(self, nota):
+        self._elementos.append(nota)
+        self._posiciones[nota.id_nota] = len(self._elementos) - 1
+        self._subir(len(self._elementos) - 1)
+
+    def eliminar(self, id_nota):
+        """Quita la nota con ese id y la devuelve"""
+        i = self._posiciones.pop(id_nota)
+        nota = self._elementos[i]
+        ultima = self._elementos.pop()
+        if i < len(self._elementos):
+            # Rellenar el hueco con la última hoja y restaurar el invariante
+            self._colocar(i, ultima)
+            self._subir(i)
+            self._bajar(self._posiciones[ultima.id_nota])
+        return nota
+
+    def eliminar_varios(self, ids_notas):
+        """Quita varias notas: una a una si son pocas, o reconstruyendo el heap en O(n) si son muchas"""
+        ids_notas = set(ids_notas)
+        total = len(self._elementos)
+        if len(ids_notas) * max(total.bit_length(), 1) < total:
+            for id_nota in ids_notas:
+                self.eliminar(id_nota)
+        else:
+            self._construir(nota for nota in self._elementos if nota.id_nota not in ids_notas)
+
+    def reemplazar(self, id_nota, nueva_nota):
+        """Sustituye una nota (misma o distinta prioridad) en O(log n)"""
+        i = self._posiciones.pop(id_nota)
+        self._colocar(i, nueva_nota)
+        self._subir(i)
+        self._bajar(self._posiciones[nueva_nota.id_nota])
+
+    def minimo(self):
+        return self._elementos[0] if self._elementos else None
+
+    def n_menores(self, n):
+        """Las n notas más bajas en orden ascendente, en O(n log n) y sin copiar el heap"""
+        elementos = self._elementos
+        resultado = []
+        if n <= 0 or not elementos:
+            return resultado
+
+        # Frontera de candidatos: los hijos de un nodo solo pueden ser menores
+        # que el resto una vez extraído su padre
+        frontera = [(elementos[0].calificacion, 0)]
+        while frontera and len(resultado) < n:
+            _, i = heapq.heappop(frontera)
+            resultado.append(elementos[i])
+            for hijo in (2 * i + 1, 2 * i + 2):
+                if hijo < len(elementos):
+                    heapq.heappush(frontera, (elementos[hijo].calificacion, hijo))
+        return resultado
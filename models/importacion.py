@@ -0,0 +1,257 @@
+import csv
+import datetime
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from .nota import Nota
+
+TAMANO_LOTE_IMPORTACION = 5000
+MAX_RECHAZOS_DETALLADOS = 1000
+MAX_FECHAS_EN_CACHE = 10000
+BYTES_MINIMOS_POR_RANGO = 8 * 1024 * 1024
+
+_PATRON_FECHA = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})$')
+
+class ReporteImportacion:
+    """Resultado de una importación: filas aceptadas y rechazadas con su motivo"""
+    def __init__(self):
+        self.aceptadas = 0
+        self.rechazadas = 0
+        self.motivos = Counter()  # {motivo: cantidad}
+        self.rechazos = []  # [(numero_fila, fila, detalle)], limitado a MAX_RECHAZOS_DETALLADOS
+        self.error = None  # error que impidió completar la importación
+
+    def rechazar(self, numero_fila, fila, motivo, detalle=""):
+        self.rechazadas += 1
+        self.motivos[motivo] += 1
+        if len(self.rechazos) < MAX_RECHAZOS_DETALLADOS:
+            self.rechazos.append((numero_fila, fila, f"{motivo}: {detalle}" if detalle else motivo))
+
+    def combinar(self, otro, desplazamiento_filas=0):
+        """Suma al reporte los resultados de otro (por ejemplo, de un proceso trabajador)"""
+        self.aceptadas += otro.aceptadas
+        self.rechazadas += otro.rechazadas
+        self.motivos.update(otro.motivos)
+        espacio = MAX_RECHAZOS_DETALLADOS - len(self.rechazos)
+        for numero_fila, fila, detalle in otro.rechazos[:max(espacio, 0)]:
+            self.rechazos.append((numero_fila + desplazamiento_filas, fila, detalle))
+        if otro.error and not self.error:
+            self.error = otro.error
+
+    def resumen(self):
+        texto = f"Se importaron {self.aceptadas} notas"
+        if self.rechazadas:
+            texto += f" ({self.rechazadas} filas rechazadas)"
+            for motivo, cantidad in self.motivos.most_common():
+                texto += f"\n• {motivo}: {cantidad}"
+        return texto
+
+
+class ParserNotas:
+    """Convierte filas del CSV en tuplas de nota, validando contra los catálogos"""
+    def __init__(self, estudiantes_validos, asignaturas_validas):
+        self.estudiantes_validos = estudiantes_validos  # set de códigos
+        self.asignaturas_validas = asignaturas_validas  # set de códigos
+        self._fechas = {}  # {texto: datetime}; las fechas se repiten mucho en un mismo archivo
+
+    def parsear_fecha(self, texto):
+        fecha = self._fechas.get(texto)
+        if fecha is None:
+            coincidencia = _PATRON_FECHA.match(texto)
+            if coincidencia is None:
+                raise ValueError(texto)
+            dia, mes, anio = coincidencia.groups()
+            fecha = datetime.datetime(int(anio), int(mes), int(dia))
+            if len(self._fechas) >= MAX_FECHAS_EN_CACHE:
+                self._fechas.clear()
+            self._fechas[texto] = fecha
+        return fecha
+
+    def parsear(self, fila):
+        """Devuelve (tupla_nota, None) si la fila es válida o (None, (motivo, detalle)) si no"""
+        if len(fila) < 6:
+            return None, ("Fila incompleta", f"{len(fila)} columnas")
+        estudiante, asignatura, calificacion, fecha_str, peso, descripcion = fila[:6]
+
+        if estudiante not in self.estudiantes_validos:
+            return None, ("Estudiante inexistente", estudiante)
+        if asignatura not in self.asignaturas_validas:
+            return None, ("Asignatura inexistente", asignatura)
+        try:
+            calificacion = float(calificacion)
+        except ValueError:
+            return None, ("Calificación inválida", calificacion)
+        if not 0.0 <= calificacion <= 5.0:
+            return None, ("Calificación fuera de rango (0-5)", str(calificacion))
+        try:
+            peso = float(peso)
+        except ValueError:
+            return None, ("Peso inválido", peso)
+        if peso <= 0:
+            return None, ("Peso inválido", str(peso))
+        try:
+            fecha = self.parsear_fecha(fecha_str)
+        except ValueError:
+            return None, ("Fecha inválida (dd/mm/aaaa)", fecha_str)
+
+        return (estudiante, asignatura, calificacion, fecha, peso, descripcion), None
+
+
+def importar_notas_csv(sistema, nombre_archivo, tamano_lote=TAMANO_LOTE_IMPORTACION):
+    """Lee el CSV en lotes de tamano_lote filas y agrega cada lote con un solo registro en el diario.
+
+    La memoria usada por el lector no depende del tamaño del archivo: solo se
+    mantiene un lote a la vez y el detalle de los rechazos está acotado. Si la
+    importación falla a medias se eliminan las notas ya agregadas, que son las
+    del rango de ids asignados desde la primera, así que no queda ninguna.
+    """
+    reporte = ReporteImportacion()
+    parser = ParserNotas(set(sistema.estudiantes), set(sistema.asignaturas))
+    agregados = None  # (primer id, último id) de las notas agregadas
+    notas = []
+    try:
+        with open(nombre_archivo, 'r', newline='', encoding='utf-8') as f:
+            lector = csv.reader(f)
+            next(lector, None)  # Saltar encabezado
+
+            numero_fila = 0  # filas de datos, sin contar el encabezado
+            while True:
+                filas = list(islice(lector, tamano_lote))
+                if not filas:
+                    break
+
+                notas = []
+                for fila in filas:
+                    numero_fila += 1
+                    valores, rechazo = parser.parsear(fila)
+                    if rechazo:
+                        reporte.rechazar(numero_fila, fila, *rechazo)
+                    else:
+                        notas.append(Nota.from_fila(valores))
+
+                reporte.aceptadas += sistema.agregar_notas(notas)
+                agregados = _rango_ids(agregados, notas)
+    except Exception as e:
+        # El lote que falló pudo agregar parte de sus notas antes del error
+        agregados = _rango_ids(agregados, notas)
+        if agregados is not None:
+            sistema.eliminar_notas(range(agregados[0], agregados[1] + 1))
+        reporte = ReporteImportacion()
+        reporte.error = str(e)
+    return reporte
+
+
+def _rango_ids(rango, notas):
+    """Amplía (primero, último) con los ids que el sistema asignó a las notas agregadas del lote"""
+    ids = [nota.id_nota for nota in notas if nota.id_nota is not None]
+    if not ids:
+        return rango
+    if rango is None:
+        return min(ids), max(ids)
+    return min(rango[0], min(ids)), max(rango[1], max(ids))
+
+
+# Importación paralela
+_parser_trabajador = None
+
+def _inicializar_trabajador(estudiantes_validos, asignaturas_validas):
+    """Cada proceso recibe los catálogos una sola vez, no con cada rango"""
+    global _parser_trabajador
+    _parser_trabajador = ParserNotas(estudiantes_validos, asignaturas_validas)
+
+
+def _dividir_en_rangos(nombre_archivo, partes):
+    """Divide el archivo en rangos de bytes que empiezan y terminan en un salto de línea"""
+    tamano = os.path.getsize(nombre_archivo)
+    with open(nombre_archivo, 'rb') as f:
+        f.readline()  # Saltar encabezado
+        inicio = f.tell()
+        cortes = [inicio]
+        for i in range(1, partes):
+            objetivo = inicio + (tamano - inicio) * i // partes
+            if objetivo <= cortes[-1]:
+                continue
+            f.seek(objetivo)
+            f.readline()  # Avanzar hasta el inicio de la siguiente línea
+            if f.tell() >= tamano:
+                break
+            cortes.append(f.tell())
+    cortes.append(tamano)
+    return [(cortes[i], cortes[i + 1]) for i in range(len(cortes) - 1) if cortes[i] < cortes[i + 1]]
+
+
+def _lineas_en_rango(f, inicio, fin):
+    f.seek(inicio)
+    posicion = inicio
+    while posicion < fin:
+        linea = f.readline()
+        if not linea:
+            break
+        posicion += len(linea)
+        yield linea.decode('utf-8')
+
+
+def _procesar_rango(nombre_archivo, inicio, fin):
+    """Trabajo de cada proceso: parsea y valida un rango, devuelve (filas_validas, reporte, filas_leidas)"""
+    reporte = ReporteImportacion()
+    filas_validas = []
+    numero_fila = 0
+    with open(nombre_archivo, 'rb') as f:
+        for fila in csv.reader(_lineas_en_rango(f, inicio, fin)):
+            numero_fila += 1
+            valores, rechazo = _parser_trabajador.parsear(fila)
+            if rechazo:
+                reporte.rechazar(numero_fila, fila, *rechazo)
+            else:
+                filas_validas.append(valores)
+    return filas_validas, reporte, numero_fila
+
+
+def importar_csv_paralelo(sistema, nombres_archivos, procesos=None):
+    """Parsea uno o varios CSV en un ProcessPoolExecutor y aplica el resultado en una sola transacción.
+
+    Cada archivo se reparte en rangos de bytes alineados a líneas, por lo que
+    en este modo los campos no pueden contener saltos de línea. Los procesos
+    solo parsean y validan; la inserción en SistemaNotas ocurre en este proceso.
+    """
+    if isinstance(nombres_archivos, str):
+        nombres_archivos = [nombres_archivos]
+    procesos = procesos or os.cpu_count() or 1
+    reporte = ReporteImportacion()
+
+    try:
+        tareas = []
+        for nombre_archivo in nombres_archivos:
+            if not os.path.exists(nombre_archivo):
+                reporte.error = f"El archivo no existe: {nombre_archivo}"
+                return reporte
+            partes = max(1, min(procesos, os.path.getsize(nombre_archivo) // BYTES_MINIMOS_POR_RANGO))
+            for inicio, fin in _dividir_en_rangos(nombre_archivo, partes):
+                tareas.append((nombre_archivo, inicio, fin))
+
+        with ProcessPoolExecutor(max_workers=procesos,
+                                 initializer=_inicializar_trabajador,
+                                 initargs=(set(sistema.estudiantes), set(sistema.asignaturas))) as ejecutor:
+            futuros = [ejecutor.submit(_procesar_rango, *tarea) for tarea in tareas]
+
+            # Los resultados pasan al reporte solo si la transacción se confirma
+            parcial = ReporteImportacion()
+            with sistema.transaccion():
+                # Se combinan en el orden de los archivos para que la numeración de filas sea global
+                archivo_actual = None
+                filas_previas = 0
+                for tarea, futuro in zip(tareas, futuros):
+                    if tarea[0] != archivo_actual:
+                        archivo_actual = tarea[0]
+                        filas_previas = 0
+                    filas_validas, reporte_rango, filas_leidas = futuro.result()
+                    parcial.combinar(reporte_rango, filas_previas)
+                    parcial.aceptadas += sistema.agregar_notas([Nota.from_fila(valores)
+                                                                 for valores in filas_validas])
+                    filas_previas += filas_leidas
+            reporte.combinar(parcial)
+    except Exception as e:
+        reporte.error = str(e)
+    return reporte
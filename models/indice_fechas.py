@@ -0,0 +1,131 @@
+import datetime
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from .ranking import ListaSaltosIndexada
+
+class IndiceFechas:
+    """Notas ordenadas por fecha: inserción, borrado y consultas por rango de fechas en O(log n)
+
+    Las claves son (fecha_ordinal, id_nota), de modo que notas con la misma
+    fecha conviven en el índice y un rango [desde, hasta) se ubica con dos
+    búsquedas en la skip list.
+    """
+    def __init__(self, notas=()):
+        self._claves = ListaSaltosIndexada()
+        self._notas = {}  # {id_nota: Nota}
+        for nota in notas:
+            self.agregar(nota)
+
+    def __len__(self):
+        return len(self._claves)
+
+    def agregar(self, nota):
+        self._claves.insertar((nota.fecha_ordinal, nota.id_nota))
+        self._notas[nota.id_nota] = nota
+
+    def quitar(self, nota):
+        self._claves.eliminar((nota.fecha_ordinal, nota.id_nota))
+        del self._notas[nota.id_nota]
+
+    def _posiciones(self, desde, hasta):
+        inicio = 0 if desde is None else self._claves.contar_menores((desde,))
+        fin = len(self._claves) if hasta is None else self._claves.contar_menores((hasta,))
+        return inicio, fin
+
+    def contar_entre(self, desde=None, hasta=None):
+        """Cantidad de notas con fecha_ordinal en [desde, hasta)"""
+        inicio, fin = self._posiciones(desde, hasta)
+        return max(fin - inicio, 0)
+
+    def entre(self, desde=None, hasta=None):
+        """Notas con fecha_ordinal en [desde, hasta), ordenadas por fecha"""
+        inicio, fin = self._posiciones(desde, hasta)
+        return [self._notas[id_nota] for _, id_nota in self._claves.rango(inicio, fin)]
+
+
+@lru_cache(maxsize=4096)
+def _mes_de_dia(dia):
+    fecha = datetime.date.fromordinal(dia)
+    return (fecha.year, fecha.month)
+
+
+def mes_de_ordinal(fecha_ordinal):
+    """(año, mes) de una fecha en la escala de Nota.fecha_ordinal"""
+    return _mes_de_dia(fecha_ordinal // 86400)
+
+
+class ListaFechasOrdenada:
+    """Índice de fechas de todas las notas: dos arrays paralelos ordenados por fecha y búsquedas con bisect
+
+    A diferencia de IndiceFechas no crea un nodo por nota, por lo que sirve
+    para millones de notas. Las altas y bajas se acumulan y se aplican en la
+    siguiente consulta, todas en una sola pasada que copia enteros los tramos
+    sin cambios (una o miles, por ejemplo tras importar un CSV).
+    """
+    def __init__(self, fechas=(), ids=()):
+        self._altas = set()  # {(fecha_ordinal, id_nota)} pendientes de insertar
+        self._bajas = set()  # {(fecha_ordinal, id_nota)} pendientes de borrar
+        # Se ordenan las posiciones por fecha: evita crear una tupla por nota
+        orden = sorted(range(len(fechas)), key=fechas.__getitem__)
+        self.fechas = array('q', [fechas[i] for i in orden])
+        self.ids = array('q', [ids[i] for i in orden])
+
+    def __len__(self):
+        return len(self.fechas) + len(self._altas) - len(self._bajas)
+
+    def agregar(self, fecha_ordinal, id_nota):
+        clave = (fecha_ordinal, id_nota)
+        if clave in self._bajas:
+            self._bajas.remove(clave)  # Sigue en los arrays: basta con no borrarla
+        else:
+            self._altas.add(clave)
+
+    def quitar(self, fecha_ordinal, id_nota):
+        clave = (fecha_ordinal, id_nota)
+        if clave in self._altas:
+            self._altas.remove(clave)
+        else:
+            self._bajas.add(clave)
+
+    def _consolidar(self):
+        """Mezcla las altas y bajas pendientes con los arrays en una sola pasada hacia arrays nuevos"""
+        if not self._altas and not self._bajas:
+            return
+        fechas, ids = self.fechas, self.ids
+        # Cortes por posición en los arrays actuales: una alta entra al final del tramo de su fecha
+        # (dentro de una misma fecha el orden no importa) y una baja salta su fila
+        cortes = [(bisect_right(fechas, fecha), False, fecha, id_nota) for fecha, id_nota in self._altas]
+        cortes.extend((ids.index(id_nota, bisect_left(fechas, fecha), bisect_right(fechas, fecha)),
+                       True, fecha, id_nota) for fecha, id_nota in self._bajas)
+        cortes.sort()
+        nuevas_fechas, nuevos_ids = array('q'), array('q')
+        anterior = 0
+        for posicion, es_baja, fecha, id_nota in cortes:
+            # Los tramos entre cortes se copian enteros, sin recorrerlos elemento a elemento
+            nuevas_fechas += fechas[anterior:posicion]
+            nuevos_ids += ids[anterior:posicion]
+            if es_baja:
+                anterior = posicion + 1
+            else:
+                nuevas_fechas.append(fecha)
+                nuevos_ids.append(id_nota)
+                anterior = posicion
+        nuevas_fechas += fechas[anterior:]
+        nuevos_ids += ids[anterior:]
+        self.fechas, self.ids = nuevas_fechas, nuevos_ids
+        self._altas = set()
+        self._bajas = set()
+
+    def ids_entre(self, desde=None, hasta=None):
+        """ids de las notas con fecha_ordinal en [desde, hasta), ordenados por fecha"""
+        self._consolidar()
+        inicio = 0 if desde is None else bisect_left(self.fechas, desde)
+        fin = len(self.fechas) if hasta is None else bisect_left(self.fechas, hasta)
+        return self.ids[inicio:fin] if inicio < fin else array('q')
+
+    def contar_entre(self, desde=None, hasta=None):
+        self._consolidar()
+        inicio = 0 if desde is None else bisect_left(self.fechas, desde)
+        fin = len(self.fechas) if hasta is None else bisect_left(self.fechas, hasta)
+        return max(fin - inicio, 0)
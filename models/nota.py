@@ -1,14 +1,44 @@
 import datetime
+import sys
+
+_SEGUNDOS_DIA = 86400
+
+def fecha_a_ordinal(fecha):
+    """Convierte una fecha (datetime o date) en segundos desde 0001-01-01"""
+    if isinstance(fecha, int):
+        return fecha
+    ordinal = fecha.toordinal() * _SEGUNDOS_DIA
+    if isinstance(fecha, datetime.datetime):
+        ordinal += fecha.hour * 3600 + fecha.minute * 60 + fecha.second
+    return ordinal
+
+def ordinal_a_fecha(ordinal):
+    dias, segundos = divmod(ordinal, _SEGUNDOS_DIA)
+    return datetime.datetime.fromordinal(dias) + datetime.timedelta(seconds=segundos)
+
 
 class Nota:
     """Clase que representa una nota académica"""
-    def __init__(self, estudiante, asignatura, calificacion, fecha=None, peso=1.0, descripcion=""):
-        self.estudiante = estudiante
-        self.asignatura = asignatura
+    # Sin __dict__ por instancia: con millones de notas en memoria el ahorro es importante
+    __slots__ = ('estudiante', 'asignatura', 'calificacion', 'fecha_ordinal', 'peso', 'descripcion', 'id_nota')
+
+    def __init__(self, estudiante, asignatura, calificacion, fecha=None, peso=1.0, descripcion="", id_nota=None):
+        # Los códigos se repiten en miles de notas: se internan para compartir una sola cadena
+        self.estudiante = sys.intern(estudiante)
+        self.asignatura = sys.intern(asignatura)
         self.calificacion = float(calificacion)
         self.fecha = fecha if fecha else datetime.datetime.now()
         self.peso = float(peso)
-        self.descripcion = descripcion
+        self.descripcion = sys.intern(descripcion)
+        self.id_nota = id_nota  # Asignado por SistemaNotas al registrar la nota
+
+    @property
+    def fecha(self):
+        return ordinal_a_fecha(self.fecha_ordinal)
+
+    @fecha.setter
+    def fecha(self, valor):
+        self.fecha_ordinal = fecha_a_ordinal(valor)
     
     def __lt__(self, other):
         return self.calificacion < other.calificacion
@@ -20,7 +50,8 @@ class Nota:
             'calificacion': self.calificacion,
             'fecha': self.fecha.strftime('%Y-%m-%d %H:%M:%S'),
             'peso': self.peso,
-            'descripcion': self.descripcion
+            'descripcion': self.descripcion,
+            'id_nota': self.id_nota
         }
 
     @classmethod
@@ -31,5 +62,15 @@ class Nota:
             data['calificacion'],
             datetime.datetime.strptime(data['fecha'], '%Y-%m-%d %H:%M:%S'),
             data['peso'],
-            data['descripcion']
-        )
\ No newline at end of file
+            data['descripcion'],
+            data.get('id_nota')
+        )
+
+    def to_fila(self):
+        """Representación compacta usada en el snapshot (la fecha va como ordinal)"""
+        return (self.estudiante, self.asignatura, self.calificacion,
+                self.fecha_ordinal, self.peso, self.descripcion, self.id_nota)
+
+    @classmethod
+    def from_fila(cls, fila):
+        return cls(*fila)
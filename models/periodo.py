@@ -0,0 +1,42 @@
+import datetime
+import sys
+
+class Periodo:
+    """Clase que representa un periodo académico (de fecha_inicio a fecha_fin, ambas incluidas)"""
+    __slots__ = ('codigo', 'nombre', 'fecha_inicio', 'fecha_fin')
+
+    def __init__(self, codigo, nombre, fecha_inicio, fecha_fin):
+        self.codigo = sys.intern(codigo)
+        self.nombre = nombre
+        self.fecha_inicio = fecha_inicio.date() if isinstance(fecha_inicio, datetime.datetime) else fecha_inicio
+        self.fecha_fin = fecha_fin.date() if isinstance(fecha_fin, datetime.datetime) else fecha_fin
+
+    @property
+    def inicio_ordinal(self):
+        """Primer segundo del periodo, en la escala de Nota.fecha_ordinal"""
+        return self.fecha_inicio.toordinal() * 86400
+
+    @property
+    def fin_ordinal(self):
+        """Primer segundo posterior al periodo (límite exclusivo)"""
+        return (self.fecha_fin.toordinal() + 1) * 86400
+
+    def se_solapa(self, otro):
+        return self.fecha_inicio <= otro.fecha_fin and otro.fecha_inicio <= self.fecha_fin
+    
+    def to_dict(self):
+        return {
+            'codigo': self.codigo,
+            'nombre': self.nombre,
+            'fecha_inicio': self.fecha_inicio.strftime('%Y-%m-%d'),
+            'fecha_fin': self.fecha_fin.strftime('%Y-%m-%d')
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['codigo'],
+            data['nombre'],
+            datetime.datetime.strptime(data['fecha_inicio'], '%Y-%m-%d').date(),
+            datetime.datetime.strptime(data['fecha_fin'], '%Y-%m-%d').date()
+        )
@@ -1,7 +1,11 @@
+import sys
+
 class Profesor:
     """Clase que representa un profesor"""
+    __slots__ = ('id_profesor', 'nombre', 'email', 'telefono', 'especialidad')
+
     def __init__(self, id_profesor, nombre, email="", telefono="", especialidad=""):
-        self.id_profesor = id_profesor
+        self.id_profesor = sys.intern(id_profesor)
         self.nombre = nombre
         self.email = email
         self.telefono = telefono
@@ -0,0 +1,127 @@
+import random
+
+NIVEL_MAXIMO = 32
+
+class _Nodo:
+    __slots__ = ('clave', 'siguientes', 'anchos')
+
+    def __init__(self, clave, niveles):
+        self.clave = clave
+        self.siguientes = [None] * niveles
+        self.anchos = [1] * niveles
+
+
+class ListaSaltosIndexada:
+    """Skip list con anchos de enlace: inserción, borrado, posición y acceso por índice en O(log n)"""
+    def __init__(self):
+        self._fin = _Nodo(None, 0)
+        self._cabeza = _Nodo(None, NIVEL_MAXIMO)
+        self._cabeza.siguientes = [self._fin] * NIVEL_MAXIMO
+        self._tamano = 0
+        self._niveles = 1  # niveles en uso; los superiores solo tienen el enlace cabeza -> fin
+        self._azar = random.Random()  # generador propio: no altera la secuencia del módulo random
+
+    def __len__(self):
+        return self._tamano
+
+    def __iter__(self):
+        nodo = self._cabeza.siguientes[0]
+        while nodo is not self._fin:
+            yield nodo.clave
+            nodo = nodo.siguientes[0]
+
+    def _buscar(self, clave):
+        """Último nodo con clave < clave en cada nivel, y su posición"""
+        cadena = [None] * self._niveles
+        pasos = [0] * self._niveles
+        nodo = self._cabeza
+        for nivel in reversed(range(self._niveles)):
+            siguiente = nodo.siguientes[nivel]
+            while siguiente is not self._fin and siguiente.clave < clave:
+                pasos[nivel] += nodo.anchos[nivel]
+                nodo = siguiente
+                siguiente = nodo.siguientes[nivel]
+            cadena[nivel] = nodo
+        return cadena, pasos
+
+    def insertar(self, clave):
+        niveles = 1
+        while niveles < NIVEL_MAXIMO and self._azar.random() < 0.5:
+            niveles += 1
+        if niveles > self._niveles:
+            # Activar niveles nuevos: su único enlace salta de la cabeza al fin
+            for nivel in range(self._niveles, niveles):
+                self._cabeza.siguientes[nivel] = self._fin
+                self._cabeza.anchos[nivel] = self._tamano + 1
+            self._niveles = niveles
+
+        cadena, pasos_por_nivel = self._buscar(clave)
+        nuevo = _Nodo(clave, niveles)
+
+        pasos = 0
+        for nivel in range(niveles):
+            anterior = cadena[nivel]
+            nuevo.siguientes[nivel] = anterior.siguientes[nivel]
+            anterior.siguientes[nivel] = nuevo
+            nuevo.anchos[nivel] = anterior.anchos[nivel] - pasos
+            anterior.anchos[nivel] = pasos + 1
+            pasos += pasos_por_nivel[nivel]
+        for nivel in range(niveles, self._niveles):
+            cadena[nivel].anchos[nivel] += 1
+        self._tamano += 1
+
+    def eliminar(self, clave):
+        cadena, _ = self._buscar(clave)
+        nodo = cadena[0].siguientes[0]
+        if nodo is self._fin or nodo.clave != clave:
+            raise KeyError(clave)
+
+        niveles = len(nodo.siguientes)
+        for nivel in range(niveles):
+            anterior = cadena[nivel]
+            anterior.anchos[nivel] += nodo.anchos[nivel] - 1
+            anterior.siguientes[nivel] = nodo.siguientes[nivel]
+        for nivel in range(niveles, self._niveles):
+            cadena[nivel].anchos[nivel] -= 1
+        self._tamano -= 1
+
+    def contar_menores(self, clave):
+        """Cantidad de claves estrictamente menores que clave"""
+        _, pasos = self._buscar(clave)
+        return sum(pasos)
+
+    def posicion(self, clave):
+        """Índice (desde 0) de una clave presente en la lista"""
+        cadena, pasos = self._buscar(clave)
+        nodo = cadena[0].siguientes[0]
+        if nodo is self._fin or nodo.clave != clave:
+            raise KeyError(clave)
+        return sum(pasos)
+
+    def rango(self, inicio, fin):
+        """Claves con índice en [inicio, fin) sin recorrer las anteriores"""
+        inicio = max(inicio, 0)
+        fin = min(fin, self._tamano)
+        if inicio >= fin:
+            return []
+
+        # Descender por los niveles hasta el nodo de índice 'inicio'
+        nodo = self._cabeza
+        restante = inicio + 1
+        for nivel in reversed(range(self._niveles)):
+            while nodo.anchos[nivel] <= restante:
+                restante -= nodo.anchos[nivel]
+                nodo = nodo.siguientes[nivel]
+
+        claves = []
+        for _ in range(fin - inicio):
+            claves.append(nodo.clave)
+            nodo = nodo.siguientes[0]
+        return claves
+
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += self._tamano
+        if not 0 <= indice < self._tamano:
+            raise IndexError(indice)
+        return self.rango(indice, indice + 1)[0]
@@ -1,58 +1,155 @@
-import heapq
-import datetime
+import bisect
+import math
 import os
 import pickle
 import csv
+import threading
+import time
+from array import array
+from contextlib import contextmanager
 from .estudiante import Estudiante
 from .asignatura import Asignatura
-from .nota import Nota
+from .nota import Nota, fecha_a_ordinal
 from .profesor import Profesor
+from .periodo import Periodo
+from .diario import DiarioCambios, OPERACION_LOTE, contar_mutaciones
+from .agregados import Acumulador
+from .ranking import ListaSaltosIndexada
+from .heap_indexado import HeapIndexado
+from .indice_fechas import IndiceFechas, ListaFechasOrdenada, mes_de_ordinal
+from .columnas import AlmacenColumnar
+from .busqueda import IndiceBusqueda
+from . import eventos
+from .eventos import Cambio
+from .estadisticas import resumir_calificaciones, resumir_notas
+from .snapshot_binario import SnapshotBinario, escribir_snapshot, es_snapshot_binario
+from .escritor import EscritorSegundoPlano, ESPERA_ESCRITURA, LATENCIA_MAXIMA_ESCRITURA
+from .importacion import (ReporteImportacion, importar_notas_csv, importar_csv_paralelo,
+                          TAMANO_LOTE_IMPORTACION)
+
+VERSION_SNAPSHOT = 4  # binario (ver snapshot_binario.py); las versiones 1 a 3 eran pickle
+ULTIMA_VERSION_PICKLE = 3
+FILAS_POR_BLOQUE_PRECARGA = 20000
+NOTAS_POR_AVISO_PROGRESO = 2000  # cada cuántas notas se informa el avance de una eliminación en cascada
+
+
+class TransaccionRevertida(Exception):
+    """Una transacción anidada se revirtió, así que la externa no puede confirmarse"""
+
+# Entidades cuyos datos cambia cada operación del diario (para invalidar la caché de estadísticas)
+ENTIDADES = ('estudiantes', 'asignaturas', 'profesores', 'periodos', 'notas')
+_ENTIDADES_POR_OPERACION = {
+    'agregar_estudiante': ('estudiantes',),
+    'editar_estudiante': ('estudiantes',),
+    'eliminar_estudiante': ('estudiantes', 'notas'),
+    'agregar_asignatura': ('asignaturas',),
+    'editar_asignatura': ('asignaturas',),
+    'eliminar_asignatura': ('asignaturas', 'notas'),
+    'agregar_nota': ('notas',),
+    'agregar_notas': ('notas',),
+    'editar_nota': ('notas',),
+    'eliminar_nota': ('notas',),
+    'eliminar_notas': ('notas',),
+    'agregar_profesor': ('profesores',),
+    'editar_profesor': ('profesores',),
+    'eliminar_profesor': ('profesores',),
+    'agregar_periodo': ('periodos',),
+    'editar_periodo': ('periodos',),
+    'eliminar_periodo': ('periodos',),
+}
+
+# Campos de texto que se indexan para la búsqueda en cada catálogo, además del código
+_CAMPOS_BUSQUEDA = {'estudiantes': ('nombre', 'programa', 'email'),
+                    'asignaturas': ('nombre',),
+                    'profesores': ('nombre', 'especialidad', 'email')}
+
+# Columna del AlmacenColumnar que guarda cada campo filtrable de las notas
+_COLUMNAS_CAMPO = {'estudiante': 'estudiantes', 'asignatura': 'asignaturas', 'descripcion': 'descripciones',
+                   'calificacion': 'calificaciones', 'peso': 'pesos', 'fecha': 'fechas', 'dia': 'dias'}
 
 class SistemaNotas:
     """Sistema de gestión de notas, estudiantes y asignaturas"""
-    def __init__(self):
-        self.notas_heap = []
-        self.notas_por_estudiante = {}
-        self.notas_por_asignatura = {}
+    def __init__(self, carga_perezosa=True, cargar=True):
+        # Con carga perezosa las notas del snapshot se crean por estudiante/asignatura al
+        # consultarlas, o todas de una vez cuando una operación necesita los índices completos.
+        # cargar=False no lee el snapshot ni el diario (para subclases que guardan los datos en otro lugar)
+        self.carga_perezosa = carga_perezosa
+        self._snapshot = None  # SnapshotBinario cuyas notas aún no se han materializado
+        self._bloqueo_carga = threading.RLock()  # compartido con el hilo de precarga
+        self._hilo_precarga = None
+        self._inicio_carga = time.perf_counter()
+        self.eventos_carga = []  # [(segundos desde el inicio, evento, detalle, notas, milisegundos)]
+        self.version_datos = 0  # crece con cada mutación; nunca retrocede, ni en un rollback
+        self._versiones = dict.fromkeys(ENTIDADES, 0)  # {entidad: version_datos de su último cambio}
+        self._cache_estadisticas = {}  # {clave: (versiones de las dependencias, valor)}
+        self._indices_busqueda = {}  # {catálogo: IndiceBusqueda}, construidos en la primera búsqueda
+        self._bloqueo_busqueda = threading.Lock()  # las búsquedas pueden correr fuera del hilo de la interfaz
+        self._suscriptores = []  # funciones(Cambio) avisadas tras cada mutación
+        self._avisos_agrupados = None  # [(tipo, claves, estudiantes, asignaturas)] dentro de agrupar_avisos
+        self._reiniciar_notas()
+        self._siguiente_id_nota = 1
         self.estudiantes = {}  # {codigo: Estudiante}
         self.asignaturas = {}   # {codigo: Asignatura}
         self.profesores = {}
+        self.periodos = {}  # {codigo: Periodo}, sin solapamientos entre ellos
+        self._orden_periodos = []  # códigos en orden cronológico
+        self._inicios_periodos = []  # inicio_ordinal de cada periodo de _orden_periodos, para bisect
         self.archivo_datos = "sistema_notas.dat"
-        self.cargar_datos()
+        self.diario = DiarioCambios("sistema_notas.diario")
+        self.intervalo_checkpoint = 1000  # registros mínimos del diario antes de consolidar
+        self._mutaciones_diario = 0  # mutaciones enviadas al diario desde el último checkpoint
+        self.escritor = None  # EscritorSegundoPlano; sin él cada mutación se escribe en el acto
+        self._secuencia = 0
+        self._secuencia_guardada = 0  # secuencia incluida en el snapshot en disco
+        self._registro_suspendido = False  # durante la reproducción del diario o un rollback
+        self._nivel_transaccion = 0
+        self._transaccion_fallida = False  # una anidada se revirtió: la externa solo puede revertirse
+        self._registros_transaccion = []  # [(operacion, datos)] pendientes de confirmar
+        self._deshacer_transaccion = []  # funciones que revierten cada mutación aplicada
+        if cargar:
+            self.cargar_datos()
     
     # Métodos para estudiantes
     def agregar_estudiante(self, estudiante):
         if estudiante.codigo in self.estudiantes:
             return False
         self.estudiantes[estudiante.codigo] = estudiante
-        self.guardar_datos()
+        self._actualizar_ranking(estudiante.codigo)
+        self._actualizar_busqueda('estudiantes', estudiante.codigo)
+        self._registrar('agregar_estudiante', estudiante.to_dict(),
+                        lambda: self.eliminar_estudiante(estudiante.codigo))
+        self._notificar(eventos.ESTUDIANTE_AGREGADO, (estudiante.codigo,), estudiantes=(estudiante.codigo,))
         return True
     
     def editar_estudiante(self, codigo, nuevo_estudiante):
         if codigo not in self.estudiantes:
             return False
+        anterior = self.estudiantes[codigo]
         self.estudiantes[codigo] = nuevo_estudiante
-        self.guardar_datos()
+        self._actualizar_busqueda('estudiantes', codigo)
+        self._registrar('editar_estudiante', {'codigo': codigo, 'estudiante': nuevo_estudiante.to_dict()},
+                        lambda: self.editar_estudiante(codigo, anterior))
+        self._notificar(eventos.ESTUDIANTE_EDITADO, (codigo,), estudiantes=(codigo,))
         return True
     
-    def eliminar_estudiante(self, codigo):
+    def eliminar_estudiante(self, codigo, progreso=None):
+        """Elimina al estudiante y sus notas; progreso(hechas, total) informa el avance de la cascada"""
         if codigo not in self.estudiantes:
             return False
-        del self.estudiantes[codigo]
+        notas = self.obtener_notas_estudiante(codigo)
+        self._adoptar_notas(notas)
+        estudiante = self.estudiantes.pop(codigo)
+        self._actualizar_busqueda('estudiantes', codigo)
+        self._indices_fechas_estudiante.pop(codigo, None)
+        self._agregados_periodo.pop(codigo, None)
         
         # Eliminar notas asociadas al estudiante
-        notas_a_eliminar = [n for n in self.notas_heap if n.estudiante == codigo]
-        for nota in notas_a_eliminar:
-            self.notas_heap.remove(nota)
-            if codigo in self.notas_por_estudiante:
-                self.notas_por_estudiante[codigo].remove(nota)
-            if nota.asignatura in self.notas_por_asignatura:
-                self.notas_por_asignatura[nota.asignatura].remove(nota)
-        
-        if codigo in self.notas_por_estudiante:
-            del self.notas_por_estudiante[codigo]
-        
-        self.guardar_datos()
+        self._quitar_en_cascada(notas, progreso)
+        self._actualizar_ranking(codigo)
+        
+        self._registrar('eliminar_estudiante', {'codigo': codigo},
+                        lambda: self._restaurar(self.agregar_estudiante, estudiante, notas))
+        self._notificar(eventos.ESTUDIANTE_ELIMINADO, (codigo,), estudiantes=(codigo,))
         return True
     
     def obtener_estudiantes(self):
@@ -63,108 +160,411 @@ class SistemaNotas:
         if asignatura.codigo in self.asignaturas:
             return False
         self.asignaturas[asignatura.codigo] = asignatura
-        self.guardar_datos()
+        self._actualizar_busqueda('asignaturas', asignatura.codigo)
+        self._registrar('agregar_asignatura', asignatura.to_dict(),
+                        lambda: self.eliminar_asignatura(asignatura.codigo))
+        self._notificar(eventos.ASIGNATURA_AGREGADA, (asignatura.codigo,), asignaturas=(asignatura.codigo,))
         return True
     
     def editar_asignatura(self, codigo, nueva_asignatura):
         if codigo not in self.asignaturas:
             return False
+        anterior = self.asignaturas[codigo]
         self.asignaturas[codigo] = nueva_asignatura
-        self.guardar_datos()
+        self._actualizar_busqueda('asignaturas', codigo)
+        self._registrar('editar_asignatura', {'codigo': codigo, 'asignatura': nueva_asignatura.to_dict()},
+                        lambda: self.editar_asignatura(codigo, anterior))
+        self._notificar(eventos.ASIGNATURA_EDITADA, (codigo,), asignaturas=(codigo,))
         return True
     
-    def eliminar_asignatura(self, codigo):
+    def eliminar_asignatura(self, codigo, progreso=None):
+        """Elimina la asignatura y sus notas; progreso(hechas, total) informa el avance de la cascada"""
         if codigo not in self.asignaturas:
             return False
-        del self.asignaturas[codigo]
+        notas = self.obtener_notas_asignatura(codigo)
+        self._adoptar_notas(notas)
+        asignatura = self.asignaturas.pop(codigo)
+        self._actualizar_busqueda('asignaturas', codigo)
         
         # Eliminar notas asociadas a la asignatura
-        notas_a_eliminar = [n for n in self.notas_heap if n.asignatura == codigo]
-        for nota in notas_a_eliminar:
-            self.notas_heap.remove(nota)
-            if nota.estudiante in self.notas_por_estudiante:
-                self.notas_por_estudiante[nota.estudiante].remove(nota)
-            if codigo in self.notas_por_asignatura:
-                self.notas_por_asignatura[codigo].remove(nota)
-        
-        if codigo in self.notas_por_asignatura:
-            del self.notas_por_asignatura[codigo]
-        
-        self.guardar_datos()
+        self._quitar_en_cascada(notas, progreso)
+        
+        self._registrar('eliminar_asignatura', {'codigo': codigo},
+                        lambda: self._restaurar(self.agregar_asignatura, asignatura, notas))
+        self._notificar(eventos.ASIGNATURA_ELIMINADA, (codigo,), asignaturas=(codigo,))
         return True
     
     def obtener_asignaturas(self):
         return list(self.asignaturas.values())
     
     # Métodos para notas
-    def agregar_nota(self, nota):
+    def _reiniciar_notas(self):
+        """Deja vacías todas las estructuras de notas"""
+        if self._snapshot is not None:
+            self._snapshot.cerrar()
+            self._snapshot = None
+        self._notas_por_fila = {}  # {fila del snapshot: Nota} ya creadas mientras la carga es parcial
+        self._ids_adoptados = set()  # ids del snapshot que ya pasaron a los índices (ver _adoptar_notas)
+        self.notas_heap = HeapIndexado()
+        self.notas_por_id = {}  # {id_nota: Nota}
+        self.notas_por_estudiante = {}  # {codigo: {id_nota: Nota}}
+        self.notas_por_asignatura = {}  # {codigo: {id_nota: Nota}}
+        
+        # Sumas acumuladas para que los promedios sean lecturas O(1)
+        self._agregado_general = Acumulador()
+        self._agregados_estudiante = {}  # {codigo: Acumulador}
+        self._agregados_asignatura = {}  # {codigo: Acumulador}
+        
+        # Ranking ordenado por promedio; se construye completo al terminar la carga
+        self._ranking = ListaSaltosIndexada()  # claves (-promedio, codigo)
+        self._claves_ranking = {}  # {codigo: clave en el ranking}
+        
+        # Columnas numéricas contiguas para estadísticas sobre todas las notas
+        self.columnas = AlmacenColumnar()
+        
+        # Árbol de notas por fecha y acumulados por periodo de cada estudiante; se construyen al consultarlos
+        self._indices_fechas_estudiante = {}  # {codigo: IndiceFechas}
+        self._agregados_periodo = {}  # {codigo: {codigo_periodo: Acumulador}}
+        
+        # Índice de fechas de todas las notas y acumulados por mes y por periodo; None hasta la primera consulta
+        self._fechas_ordenadas = None  # ListaFechasOrdenada
+        self._agregados_mes = None  # {(año, mes): Acumulador}
+        self._agregados_periodo_general = None  # {codigo_periodo: Acumulador}
+    
+    def _actualizar_ranking(self, codigo):
+        """Reubica al estudiante en el ranking tras un cambio en su promedio"""
+        clave = self._claves_ranking.pop(codigo, None)
+        if clave is not None:
+            self._ranking.eliminar(clave)
+        if codigo in self.estudiantes:
+            clave = (-self.calcular_promedio_estudiante(codigo), codigo)
+            self._ranking.insertar(clave)
+            self._claves_ranking[codigo] = clave
+    
+    def _reconstruir_ranking(self):
+        self._ranking = ListaSaltosIndexada()
+        self._claves_ranking = {}
+        for codigo in self.estudiantes:
+            self._actualizar_ranking(codigo)
+    
+    def _indexar_nota(self, nota, actualizar_ranking=True):
+        """Registra la nota en los índices secundarios"""
+        self.notas_por_id[nota.id_nota] = nota
+        self.notas_por_estudiante.setdefault(nota.estudiante, {})[nota.id_nota] = nota
+        self.notas_por_asignatura.setdefault(nota.asignatura, {})[nota.id_nota] = nota
+        self.columnas.agregar(nota)
+        
+        self._agregado_general.agregar(nota)
+        if nota.estudiante not in self._agregados_estudiante:
+            self._agregados_estudiante[nota.estudiante] = Acumulador()
+        self._agregados_estudiante[nota.estudiante].agregar(nota)
+        if nota.asignatura not in self._agregados_asignatura:
+            self._agregados_asignatura[nota.asignatura] = Acumulador()
+        self._agregados_asignatura[nota.asignatura].agregar(nota)
+        
+        indice_fechas = self._indices_fechas_estudiante.get(nota.estudiante)
+        if indice_fechas is not None:
+            indice_fechas.agregar(nota)
+        self._acumular_en_periodo(nota, Acumulador.agregar)
+        self._acumular_por_fecha(nota, Acumulador.agregar)
+        if self._fechas_ordenadas is not None:
+            self._fechas_ordenadas.agregar(nota.fecha_ordinal, nota.id_nota)
+        
+        if actualizar_ranking and nota.estudiante in self._claves_ranking:
+            self._actualizar_ranking(nota.estudiante)
+    
+    def _desindexar_nota(self, nota, en_cascada=False):
+        """Retira la nota de los índices secundarios (en cascada, el ranking y las columnas los actualiza quien llama)"""
+        del self.notas_por_id[nota.id_nota]
+        
+        notas_estudiante = self.notas_por_estudiante[nota.estudiante]
+        del notas_estudiante[nota.id_nota]
+        if not notas_estudiante:
+            del self.notas_por_estudiante[nota.estudiante]
+        
+        notas_asignatura = self.notas_por_asignatura[nota.asignatura]
+        del notas_asignatura[nota.id_nota]
+        if not notas_asignatura:
+            del self.notas_por_asignatura[nota.asignatura]
+        if not en_cascada:
+            self.columnas.eliminar(nota.id_nota)
+        
+        self._agregado_general.quitar(nota)
+        self._agregados_estudiante[nota.estudiante].quitar(nota)
+        self._agregados_asignatura[nota.asignatura].quitar(nota)
+        
+        indice_fechas = self._indices_fechas_estudiante.get(nota.estudiante)
+        if indice_fechas is not None:
+            indice_fechas.quitar(nota)
+        self._acumular_en_periodo(nota, Acumulador.quitar)
+        self._acumular_por_fecha(nota, Acumulador.quitar)
+        if self._fechas_ordenadas is not None:
+            self._fechas_ordenadas.quitar(nota.fecha_ordinal, nota.id_nota)
+        
+        if not en_cascada and nota.estudiante in self._claves_ranking:
+            self._actualizar_ranking(nota.estudiante)
+    
+    # Carga perezosa desde el snapshot binario
+    def _anotar_carga(self, evento, detalle, notas, inicio):
+        ahora = time.perf_counter()
+        self.eventos_carga.append((ahora - self._inicio_carga, evento, detalle, notas, (ahora - inicio) * 1000))
+    
+    def resumen_carga(self):
+        """Texto con lo que se cargó y cuándo, para diagnosticar el arranque"""
+        return "\n".join(f"{segundos:8.3f}s  {evento:<12} {detalle:<20} {notas:>8} notas  {ms:8.1f} ms"
+                         for segundos, evento, detalle, notas, ms in self.eventos_carga)
+    
+    def _notas_de_rango(self, inicio, fin):
+        """Notas de las filas [inicio, fin) del snapshot, creando solo las que faltan"""
+        cache = self._notas_por_fila
+        if all(fila in cache for fila in range(inicio, fin)):
+            return [cache[fila] for fila in range(inicio, fin)]
+        notas = []
+        for fila, valores in enumerate(self._snapshot.leer_filas(inicio, fin), start=inicio):
+            nota = cache.get(fila)
+            if nota is None:
+                nota = cache[fila] = Nota.from_fila(valores)
+            notas.append(nota)
+        return notas
+    
+    def _notas_parciales_estudiante(self, codigo):
+        """Notas de un estudiante sin materializar el resto; None si la carga ya terminó"""
+        with self._bloqueo_carga:
+            if self._snapshot is None:
+                return None
+            inicio_carga = time.perf_counter()
+            inicio, fin = self._snapshot.rango_estudiante(codigo)
+            notas = self._sin_adoptadas(self._notas_de_rango(inicio, fin), self.notas_por_estudiante.get(codigo))
+            self._anotar_carga('estudiante', codigo, len(notas), inicio_carga)
+            return notas
+    
+    def _notas_parciales_asignatura(self, codigo):
+        """Notas de una asignatura sin materializar el resto; None si la carga ya terminó"""
+        with self._bloqueo_carga:
+            if self._snapshot is None:
+                return None
+            inicio_carga = time.perf_counter()
+            cache = self._notas_por_fila
+            notas = []
+            for fila in self._snapshot.filas_asignatura(codigo):
+                nota = cache.get(fila)
+                if nota is None:
+                    nota = cache[fila] = Nota.from_fila(self._snapshot.fila(fila))
+                notas.append(nota)
+            notas = self._sin_adoptadas(notas, self.notas_por_asignatura.get(codigo))
+            self._anotar_carga('asignatura', codigo, len(notas), inicio_carga)
+            return notas
+    
+    def _sin_adoptadas(self, notas_snapshot, indexadas):
+        """Notas del snapshot que no han pasado a los índices, seguidas de las que ya están en ellos"""
+        if self._ids_adoptados:
+            notas_snapshot = [nota for nota in notas_snapshot if nota.id_nota not in self._ids_adoptados]
+        return notas_snapshot + list(indexadas.values()) if indexadas else notas_snapshot
+    
+    def _adoptar_notas(self, notas):
+        """Pasa a los índices notas ya creadas del snapshot sin materializar el resto, para que las
+        mutaciones con la carga parcial (incluida la reproducción del diario) las modifiquen en ellos"""
+        with self._bloqueo_carga:
+            if self._snapshot is None:
+                return  # Con la carga completa ya están todas en los índices
+            for nota in notas:
+                if nota.id_nota in self.notas_por_id:
+                    continue
+                self._ids_adoptados.add(nota.id_nota)
+                self.notas_por_id[nota.id_nota] = nota
+                self.notas_por_estudiante.setdefault(nota.estudiante, {})[nota.id_nota] = nota
+                self.notas_por_asignatura.setdefault(nota.asignatura, {})[nota.id_nota] = nota
+                self.notas_heap.agregar(nota)
+    
+    def _nota_indexada(self, id_nota):
+        """La nota con ese id en los índices; con la carga parcial, si aún está en el snapshot se adopta"""
+        nota = self.obtener_nota(id_nota)
+        if nota is not None:
+            self._adoptar_notas((nota,))
+        return nota
+    
+    def _asegurar_notas(self):
+        """Crea los objetos Nota que falten y construye los índices completos"""
+        if self._snapshot is None:
+            return
+        with self._bloqueo_carga:
+            snapshot = self._snapshot
+            if snapshot is None:
+                return  # La precarga terminó mientras se esperaba el bloqueo
+            inicio_carga = time.perf_counter()
+            if len(self._notas_por_fila) < snapshot.total_notas:
+                notas = self._notas_de_rango(0, snapshot.total_notas)
+            else:
+                notas = [self._notas_por_fila[fila] for fila in range(snapshot.total_notas)]
+            if self._ids_adoptados:
+                notas = [nota for nota in notas if nota.id_nota not in self._ids_adoptados]
+            
+            # Los acumulados, el ranking y las columnas ya vienen del snapshot: solo faltan los índices
+            for nota in notas:
+                self.notas_por_id[nota.id_nota] = nota
+                self.notas_por_estudiante.setdefault(nota.estudiante, {})[nota.id_nota] = nota
+                self.notas_por_asignatura.setdefault(nota.asignatura, {})[nota.id_nota] = nota
+            notas.extend(self.notas_heap)  # las adoptadas y las agregadas con la carga parcial
+            self.notas_heap = HeapIndexado(notas)
+            
+            self._notas_por_fila = {}
+            self._ids_adoptados = set()
+            self._snapshot = None
+            snapshot.cerrar()
+            self._anotar_carga('completa', '', len(notas), inicio_carga)
+    
+    def iniciar_precarga(self):
+        """Materializa en segundo plano las notas que nadie ha pedido todavía"""
+        if self._snapshot is None or self._hilo_precarga is not None:
+            return
+        self._hilo_precarga = threading.Thread(target=self._precargar, name="precarga-notas", daemon=True)
+        self._hilo_precarga.start()
+    
+    def _precargar(self):
+        fila = 0
+        while True:
+            # El bloqueo se suelta entre bloques para que las consultas de la interfaz no esperen
+            with self._bloqueo_carga:
+                if self._snapshot is None:
+                    return
+                total = self._snapshot.total_notas
+                if fila >= total:
+                    break
+                inicio_carga = time.perf_counter()
+                fin = min(fila + FILAS_POR_BLOQUE_PRECARGA, total)
+                self._notas_de_rango(fila, fin)
+                self._anotar_carga('precarga', f"filas {fila}-{fin}", fin - fila, inicio_carga)
+                fila = fin
+            time.sleep(0)
+        self._asegurar_notas()
+    
+    def _insertar_nota(self, nota, actualizar_ranking=True):
         # Verificar que existan el estudiante y la asignatura
         if nota.estudiante not in self.estudiantes or nota.asignatura not in self.asignaturas:
             return False
         
-        # Agregar al heap
-        heapq.heappush(self.notas_heap, nota)
+        # Asignar un identificador estable (las notas reproducidas ya lo traen)
+        if nota.id_nota is None:
+            nota.id_nota = self._siguiente_id_nota
+        elif self._nota_indexada(nota.id_nota) is not None:
+            return False
+        self._siguiente_id_nota = max(self._siguiente_id_nota, nota.id_nota + 1)
         
-        # Agregar al diccionario de estudiantes
-        if nota.estudiante not in self.notas_por_estudiante:
-            self.notas_por_estudiante[nota.estudiante] = []
-        self.notas_por_estudiante[nota.estudiante].append(nota)
+        # Agregar al heap
+        self.notas_heap.agregar(nota)
+        self._indexar_nota(nota, actualizar_ranking)
+        return True
+    
+    def agregar_nota(self, nota):
+        if not self._insertar_nota(nota):
+            return False
+        self._registrar('agregar_nota', nota.to_dict(),
+                        lambda: self.eliminar_nota(nota.id_nota))
+        self._notificar_notas(eventos.NOTAS_AGREGADAS, [nota])
+        return True
+    
+    def agregar_notas(self, notas):
+        """Agrega un lote de notas con un único registro en el diario; devuelve cuántas se agregaron"""
+        agregadas = [nota for nota in notas if self._insertar_nota(nota, actualizar_ranking=False)]
         
-        # Agregar al diccionario de asignaturas
-        if nota.asignatura not in self.notas_por_asignatura:
-            self.notas_por_asignatura[nota.asignatura] = []
-        self.notas_por_asignatura[nota.asignatura].append(nota)
+        # Reubicar en el ranking una sola vez a cada estudiante afectado
+        for codigo in {nota.estudiante for nota in agregadas}:
+            if codigo in self._claves_ranking:
+                self._actualizar_ranking(codigo)
         
-        self.guardar_datos()
-        return True
+        if agregadas:
+            self._registrar('agregar_notas', [nota.to_dict() for nota in agregadas],
+                            lambda: self._quitar_notas(agregadas))
+            self._notificar_notas(eventos.NOTAS_AGREGADAS, agregadas)
+        return len(agregadas)
+    
+    def _quitar_en_cascada(self, notas, progreso=None):
+        """Quita las notas de una entidad eliminada: el heap y las columnas se compactan una sola vez
+        y cada estudiante afectado se reubica en el ranking una sola vez"""
+        total = len(notas)
+        ids_notas = {nota.id_nota for nota in notas}
+        self.notas_heap.eliminar_varios(ids_notas)
+        self.columnas.eliminar_varios(ids_notas)
+        afectados = set()
+        for hechas, nota in enumerate(notas, start=1):
+            self._desindexar_nota(nota, en_cascada=True)
+            afectados.add(nota.estudiante)
+            if progreso is not None and hechas % NOTAS_POR_AVISO_PROGRESO == 0:
+                progreso(hechas, total)
+        for codigo in afectados:
+            self._actualizar_ranking(codigo)
+        if progreso is not None:
+            progreso(total, total)
+        if notas:
+            self._notificar_notas(eventos.NOTAS_ELIMINADAS, notas)
     
-    def editar_nota(self, indice, nueva_nota):
-        if indice < 0 or indice >= len(self.notas_heap):
+    def _quitar_notas(self, notas):
+        for nota in reversed(notas):
+            self.eliminar_nota(nota.id_nota)
+    
+    def editar_nota(self, id_nota, nueva_nota):
+        nota_original = self._nota_indexada(id_nota)
+        if nota_original is None:
+            return False
+        if nueva_nota.estudiante not in self.estudiantes or nueva_nota.asignatura not in self.asignaturas:
             return False
         
-        # Obtener la nota original
-        nota_original = self.notas_heap[indice]
+        # La nota editada conserva el identificador de la original
+        nueva_nota.id_nota = id_nota
         
         # Actualizar en todas las estructuras
-        self.notas_heap[indice] = nueva_nota
-        if nota_original.estudiante in self.notas_por_estudiante:
-            idx = self.notas_por_estudiante[nota_original.estudiante].index(nota_original)
-            self.notas_por_estudiante[nota_original.estudiante][idx] = nueva_nota
+        self.notas_heap.reemplazar(id_nota, nueva_nota)
+        self._desindexar_nota(nota_original)
+        self._indexar_nota(nueva_nota)
         
-        if nota_original.asignatura in self.notas_por_asignatura:
-            idx = self.notas_por_asignatura[nota_original.asignatura].index(nota_original)
-            self.notas_por_asignatura[nota_original.asignatura][idx] = nueva_nota
-        
-        self.guardar_datos()
+        self._registrar('editar_nota', {'id_nota': id_nota, 'nota': nueva_nota.to_dict()},
+                        lambda: self.editar_nota(id_nota, nota_original))
+        self._notificar_notas(eventos.NOTAS_EDITADAS, [nota_original, nueva_nota])
         return True
     
-    def eliminar_nota(self, indice):
-        if indice < 0 or indice >= len(self.notas_heap):
+    def eliminar_nota(self, id_nota):
+        nota = self._nota_indexada(id_nota)
+        if nota is None:
             return False
         
-        nota = self.notas_heap.pop(indice)
-        if nota.estudiante in self.notas_por_estudiante and nota in self.notas_por_estudiante[nota.estudiante]:
-            self.notas_por_estudiante[nota.estudiante].remove(nota)
-        
-        if nota.asignatura in self.notas_por_asignatura and nota in self.notas_por_asignatura[nota.asignatura]:
-            self.notas_por_asignatura[nota.asignatura].remove(nota)
+        self.notas_heap.eliminar(id_nota)
+        self._desindexar_nota(nota)
         
-        self.guardar_datos()
+        self._registrar('eliminar_nota', {'id_nota': id_nota},
+                        lambda: self.agregar_nota(nota))
+        self._notificar_notas(eventos.NOTAS_ELIMINADAS, [nota])
         return True
     
+    def eliminar_notas(self, ids_notas):
+        """Elimina las notas existentes de ids_notas con un único registro en el diario; devuelve cuántas eran"""
+        notas = [nota for nota in map(self._nota_indexada, ids_notas) if nota is not None]
+        if not notas:
+            return 0
+        self._quitar_en_cascada(notas)
+        self._registrar('eliminar_notas', [nota.id_nota for nota in notas],
+                        lambda: self.agregar_notas(notas))
+        return len(notas)
+    
     # Métodos para profesores
     def agregar_profesor(self, profesor):
         if profesor.id_profesor in self.profesores:
             return False
         self.profesores[profesor.id_profesor] = profesor
-        self.guardar_datos()
+        self._actualizar_busqueda('profesores', profesor.id_profesor)
+        self._registrar('agregar_profesor', profesor.to_dict(),
+                        lambda: self.eliminar_profesor(profesor.id_profesor))
+        self._notificar(eventos.PROFESOR_AGREGADO, (profesor.id_profesor,))
         return True
     
     def editar_profesor(self, id_profesor, nuevo_profesor):
         if id_profesor not in self.profesores:
             return False
+        anterior = self.profesores[id_profesor]
         self.profesores[id_profesor] = nuevo_profesor
-        self.guardar_datos()
+        self._actualizar_busqueda('profesores', id_profesor)
+        self._registrar('editar_profesor', {'id_profesor': id_profesor, 'profesor': nuevo_profesor.to_dict()},
+                        lambda: self.editar_profesor(id_profesor, anterior))
+        self._notificar(eventos.PROFESOR_EDITADO, (id_profesor,))
         return True
     
     def eliminar_profesor(self, id_profesor):
@@ -176,81 +576,462 @@ class SistemaNotas:
             if asignatura.profesor == id_profesor:
                 return False  # No se puede eliminar si está asignado
         
-        del self.profesores[id_profesor]
-        self.guardar_datos()
+        profesor = self.profesores.pop(id_profesor)
+        self._actualizar_busqueda('profesores', id_profesor)
+        self._registrar('eliminar_profesor', {'id_profesor': id_profesor},
+                        lambda: self.agregar_profesor(profesor))
+        self._notificar(eventos.PROFESOR_ELIMINADO, (id_profesor,))
         return True
     
     def obtener_profesores(self):
         return list(self.profesores.values())
     
+    # Métodos para periodos
+    def _periodo_valido(self, periodo, excluir=None):
+        if periodo.fecha_fin < periodo.fecha_inicio:
+            return False
+        return not any(otro.se_solapa(periodo) for codigo, otro in self.periodos.items() if codigo != excluir)
+    
+    def _reordenar_periodos(self):
+        """Tras un cambio en los periodos: los acumulados por periodo se recalculan al consultarlos"""
+        self._orden_periodos = sorted(self.periodos, key=lambda codigo: self.periodos[codigo].fecha_inicio)
+        self._inicios_periodos = [self.periodos[codigo].inicio_ordinal for codigo in self._orden_periodos]
+        self._agregados_periodo = {}
+        self._agregados_periodo_general = None
+    
+    def agregar_periodo(self, periodo):
+        if periodo.codigo in self.periodos or not self._periodo_valido(periodo):
+            return False
+        self.periodos[periodo.codigo] = periodo
+        self._reordenar_periodos()
+        self._registrar('agregar_periodo', periodo.to_dict(),
+                        lambda: self.eliminar_periodo(periodo.codigo))
+        self._notificar(eventos.PERIODO_AGREGADO, (periodo.codigo,))
+        return True
+    
+    def editar_periodo(self, codigo, nuevo_periodo):
+        if codigo not in self.periodos or not self._periodo_valido(nuevo_periodo, excluir=codigo):
+            return False
+        anterior = self.periodos[codigo]
+        self.periodos[codigo] = nuevo_periodo
+        self._reordenar_periodos()
+        self._registrar('editar_periodo', {'codigo': codigo, 'periodo': nuevo_periodo.to_dict()},
+                        lambda: self.editar_periodo(codigo, anterior))
+        self._notificar(eventos.PERIODO_EDITADO, (codigo,))
+        return True
+    
+    def eliminar_periodo(self, codigo):
+        """Elimina el periodo; sus notas se conservan, solo dejan de pertenecer a un periodo"""
+        if codigo not in self.periodos:
+            return False
+        periodo = self.periodos.pop(codigo)
+        self._reordenar_periodos()
+        self._registrar('eliminar_periodo', {'codigo': codigo},
+                        lambda: self.agregar_periodo(periodo))
+        self._notificar(eventos.PERIODO_ELIMINADO, (codigo,))
+        return True
+    
+    def obtener_periodos(self):
+        """Periodos en orden cronológico"""
+        return [self.periodos[codigo] for codigo in self._orden_periodos]
+    
+    def _codigo_periodo(self, fecha_ordinal):
+        i = bisect.bisect_right(self._inicios_periodos, fecha_ordinal) - 1
+        if i < 0:
+            return None
+        codigo = self._orden_periodos[i]
+        return codigo if fecha_ordinal < self.periodos[codigo].fin_ordinal else None
+    
+    def periodo_de_fecha(self, fecha):
+        """Periodo al que pertenece la fecha, o None si cae fuera de todos"""
+        codigo = self._codigo_periodo(fecha_a_ordinal(fecha))
+        return self.periodos[codigo] if codigo is not None else None
+    
+    def _indice_fechas(self, codigo_estudiante):
+        indice = self._indices_fechas_estudiante.get(codigo_estudiante)
+        if indice is None:
+            indice = IndiceFechas(self.obtener_notas_estudiante(codigo_estudiante))
+            self._indices_fechas_estudiante[codigo_estudiante] = indice
+        return indice
+    
+    def _acumular_en_periodo(self, nota, operacion):
+        agregados = self._agregados_periodo.get(nota.estudiante)
+        if agregados is None:
+            return  # Aún no se han consultado los periodos de este estudiante
+        codigo = self._codigo_periodo(nota.fecha_ordinal)
+        if codigo is not None:
+            operacion(agregados.setdefault(codigo, Acumulador()), nota)
+    
+    def _agregados_periodos_estudiante(self, codigo_estudiante):
+        agregados = self._agregados_periodo.get(codigo_estudiante)
+        if agregados is None:
+            indice = self._indice_fechas(codigo_estudiante)
+            agregados = {}
+            for codigo, periodo in self.periodos.items():
+                acumulador = agregados[codigo] = Acumulador()
+                for nota in indice.entre(periodo.inicio_ordinal, periodo.fin_ordinal):
+                    acumulador.agregar(nota)
+            self._agregados_periodo[codigo_estudiante] = agregados
+        return agregados
+    
+    def obtener_notas_periodo(self, codigo_estudiante, codigo_periodo):
+        """Notas del estudiante en el periodo, en orden cronológico"""
+        periodo = self.periodos.get(codigo_periodo)
+        if periodo is None:
+            return []
+        return self._indice_fechas(codigo_estudiante).entre(periodo.inicio_ordinal, periodo.fin_ordinal)
+    
+    def calcular_promedio_periodo(self, codigo_estudiante, codigo_periodo):
+        agregado = self._agregados_periodos_estudiante(codigo_estudiante).get(codigo_periodo)
+        return agregado.promedio() if agregado else 0
+    
+    def calcular_promedio_acumulado(self, codigo_estudiante, codigo_periodo):
+        """Promedio de las notas del estudiante en todos los periodos hasta codigo_periodo inclusive"""
+        periodo = self.periodos.get(codigo_periodo)
+        if periodo is None:
+            return 0
+        agregados = self._agregados_periodos_estudiante(codigo_estudiante)
+        suma = conteo = 0
+        for codigo in self._orden_periodos:
+            if self.periodos[codigo].fecha_inicio > periodo.fecha_inicio:
+                break
+            agregado = agregados.get(codigo)
+            if agregado:
+                suma += agregado.suma
+                conteo += agregado.conteo
+        return suma / conteo if conteo else 0
+    
+    def promedios_por_periodo(self, codigo_estudiante):
+        """[(Periodo, promedio del periodo, promedio acumulado, cantidad de notas)] en orden cronológico"""
+        agregados = self._agregados_periodos_estudiante(codigo_estudiante)
+        resultado = []
+        suma = conteo = 0
+        for periodo in self.obtener_periodos():
+            agregado = agregados.get(periodo.codigo) or Acumulador()
+            suma += agregado.suma
+            conteo += agregado.conteo
+            resultado.append((periodo, agregado.promedio(), suma / conteo if conteo else 0, agregado.conteo))
+        return resultado
+    
+    # Consultas por fecha sobre todas las notas
+    def _acumular_por_fecha(self, nota, operacion):
+        if self._agregados_mes is not None:
+            operacion(self._agregados_mes.setdefault(mes_de_ordinal(nota.fecha_ordinal), Acumulador()), nota)
+        if self._agregados_periodo_general is not None:
+            codigo = self._codigo_periodo(nota.fecha_ordinal)
+            if codigo is not None:
+                operacion(self._agregados_periodo_general.setdefault(codigo, Acumulador()), nota)
+    
+    def _indice_fechas_general(self):
+        if self._fechas_ordenadas is None:
+            self._fechas_ordenadas = ListaFechasOrdenada(self.columnas.fechas, self.columnas.ids)
+        return self._fechas_ordenadas
+    
+    def notas_entre(self, desde=None, hasta=None):
+        """Notas con fecha en [desde, hasta), en orden cronológico; None deja el extremo abierto"""
+        ids = self._indice_fechas_general().ids_entre(
+            None if desde is None else fecha_a_ordinal(desde), None if hasta is None else fecha_a_ordinal(hasta))
+        self._asegurar_notas()
+        return [self.notas_por_id[id_nota] for id_nota in ids]
+    
+    def contar_notas_entre(self, desde=None, hasta=None):
+        return self._indice_fechas_general().contar_entre(
+            None if desde is None else fecha_a_ordinal(desde), None if hasta is None else fecha_a_ordinal(hasta))
+    
+    def obtener_notas_de_periodo(self, codigo_periodo):
+        """Todas las notas del periodo, de cualquier estudiante"""
+        periodo = self.periodos.get(codigo_periodo)
+        if periodo is None:
+            return []
+        return self.notas_entre(periodo.inicio_ordinal, periodo.fin_ordinal)
+    
+    def _agregados_por_fecha(self):
+        """Construye en una pasada por las columnas los acumulados por mes y por periodo que falten"""
+        if self._agregados_mes is not None and self._agregados_periodo_general is not None:
+            return
+        por_mes = {} if self._agregados_mes is None else None
+        por_periodo = {} if self._agregados_periodo_general is None else None
+        columnas = self.columnas
+        for fecha, calificacion, peso in zip(columnas.fechas, columnas.calificaciones, columnas.pesos):
+            if por_mes is not None:
+                mes = mes_de_ordinal(fecha)
+                acumulador = por_mes.get(mes)
+                if acumulador is None:
+                    acumulador = por_mes[mes] = Acumulador()
+                acumulador.agregar_valores(calificacion, peso)
+            if por_periodo is not None:
+                codigo = self._codigo_periodo(fecha)
+                if codigo is not None:
+                    por_periodo.setdefault(codigo, Acumulador()).agregar_valores(calificacion, peso)
+        if por_mes is not None:
+            self._agregados_mes = por_mes
+        if por_periodo is not None:
+            self._agregados_periodo_general = por_periodo
+    
+    def promedios_por_mes(self):
+        """[((año, mes), promedio, cantidad de notas)] en orden cronológico"""
+        self._agregados_por_fecha()
+        return [(mes, agregado.promedio(), agregado.conteo)
+                for mes, agregado in sorted(self._agregados_mes.items()) if agregado.conteo]
+    
+    def promedios_periodos(self):
+        """[(Periodo, promedio, cantidad de notas)] de todas las notas, en orden cronológico"""
+        self._agregados_por_fecha()
+        resultado = []
+        for periodo in self.obtener_periodos():
+            agregado = self._agregados_periodo_general.get(periodo.codigo)
+            resultado.append((periodo, agregado.promedio() if agregado else 0, agregado.conteo if agregado else 0))
+        return resultado
+    
     # Métodos de consulta
+    def obtener_nota(self, id_nota):
+        """La nota con ese id; con la carga parcial solo se crean las de su estudiante"""
+        nota = self.notas_por_id.get(id_nota)
+        if nota is not None or self._snapshot is None:
+            return nota
+        valores = self.columnas.fila(id_nota)
+        if valores is None:
+            return None
+        return next((nota for nota in self.obtener_notas_estudiante(valores[0]) if nota.id_nota == id_nota), None)
+    
+    def fila_nota(self, id_nota):
+        """Valores de la nota en el orden de Nota.to_fila(), leídos de las columnas sin crear objetos Nota;
+        None si no existe"""
+        return self.columnas.fila(id_nota)
+    
     def obtener_notas_estudiante(self, codigo_estudiante):
-        return self.notas_por_estudiante.get(codigo_estudiante, [])
+        if self._snapshot is not None:
+            notas = self._notas_parciales_estudiante(codigo_estudiante)
+            if notas is not None:
+                return notas
+        return list(self.notas_por_estudiante.get(codigo_estudiante, {}).values())
     
     def obtener_notas_asignatura(self, codigo_asignatura):
-        return self.notas_por_asignatura.get(codigo_asignatura, [])
+        if self._snapshot is not None:
+            notas = self._notas_parciales_asignatura(codigo_asignatura)
+            if notas is not None:
+                return notas
+        return list(self.notas_por_asignatura.get(codigo_asignatura, {}).values())
+    
+    def contar_notas_estudiante(self, codigo_estudiante):
+        agregado = self._agregados_estudiante.get(codigo_estudiante)
+        return agregado.conteo if agregado else 0
+    
+    def contar_notas_asignatura(self, codigo_asignatura):
+        agregado = self._agregados_asignatura.get(codigo_asignatura)
+        return agregado.conteo if agregado else 0
     
     def obtener_notas_mas_bajas(self, n=5):
-        if not self.notas_heap:
-            return []
-        
-        heap_temp = self.notas_heap.copy()
-        notas_bajas = []
+        self._asegurar_notas()
+        return self.notas_heap.n_menores(n)
+    
+    def iterar_notas(self):
+        """Recorre todas las notas sin un orden particular"""
+        self._asegurar_notas()
+        return iter(self.notas_heap)
+    
+    def ids_notas(self):
+        """Identificadores de todas las notas en orden creciente, leídos de las columnas sin crear objetos Nota"""
+        return self.columnas.ids_ordenados(self.columnas.ids)
+    
+    def total_notas(self):
+        return self._agregado_general.conteo
+    
+    def valores_notas(self, campo):
+        """{id_nota: valor} de un campo de las notas (los de valores_distintos_notas, 'estudiante',
+        'asignatura' o 'fecha', el ordinal completo), leído de las columnas sin crear objetos Nota"""
+        return self.columnas.valores_por_id(_COLUMNAS_CAMPO[campo])
+    
+    def valores_distintos_notas(self, campo):
+        """Valores distintos de un campo de las notas ('descripcion', 'calificacion', 'peso' o 'dia',
+        el ordinal del día de la fecha), sin crear objetos Nota"""
+        def calcular():
+            if campo == 'descripcion':
+                codigos = self.columnas.codigos_descripcion.codigos
+                return sorted({codigos[entero] for entero in self.columnas.valores_distintos('descripciones')})
+            return self.columnas.valores_distintos(_COLUMNAS_CAMPO[campo])
+        return list(self._memorizar(('distintos', campo), ('notas',), calcular))
+    
+    def filtrar_notas(self, estudiantes=None, asignaturas=None, minimo=None, maximo=None, alguna=None):
+        """Ids de las notas, en orden creciente como ids_notas, que cumplen todos los filtros.
         
-        for _ in range(min(n, len(heap_temp))):
-            if heap_temp:
-                notas_bajas.append(heapq.heappop(heap_temp))
-                
-        return notas_bajas
+        estudiantes y asignaturas son los códigos aceptados (None: todos); [minimo, maximo)
+        acota la calificación; alguna es {campo: valores} de los que basta que la nota
+        cumpla uno (así se resuelve una búsqueda de texto sobre varias columnas).
+        """
+        todas = []
+        for campo, codigos in (('estudiante', estudiantes), ('asignatura', asignaturas)):
+            if codigos is not None:
+                todas.append(self._condicion_columna(campo, codigos))
+        if minimo is not None or maximo is not None:
+            todas.append(('calificaciones', minimo, maximo))
+        condiciones_alguna = []
+        if alguna is not None:
+            condiciones_alguna = [self._condicion_columna(campo, valores)
+                                  for campo, valores in alguna.items() if valores]
+            if not condiciones_alguna:
+                return array('q')
+        return self.columnas.filtrar(todas, condiciones_alguna)
+    
+    def _condicion_columna(self, campo, valores):
+        # Los campos de texto se guardan codificados: se traducen los valores a sus enteros
+        nombre = _COLUMNAS_CAMPO[campo]
+        codificador = {'estudiante': self.columnas.codigos_estudiante,
+                       'asignatura': self.columnas.codigos_asignatura,
+                       'descripcion': self.columnas.codigos_descripcion}.get(campo)
+        if codificador is not None:
+            valores = {codificador.enteros[valor] for valor in valores if valor in codificador.enteros}
+        return (nombre, set(valores))
+    
+    # Búsqueda por código y nombre
+    def buscar(self, catalogo, texto, limite=None):
+        """Claves de 'estudiantes', 'asignaturas' o 'profesores' cuyo código empieza por el texto o
+        cuyo nombre (o programa, especialidad, email) lo contiene, sin distinguir tildes ni mayúsculas"""
+        with self._bloqueo_busqueda:
+            return self._indice_busqueda(catalogo).buscar(texto, limite)
+    
+    def coincide(self, catalogo, clave, texto):
+        """Si buscar(catalogo, texto) incluiría la clave, sin buscar en todo el catálogo"""
+        with self._bloqueo_busqueda:
+            return self._indice_busqueda(catalogo).coincide(clave, texto)
+    
+    def _indice_busqueda(self, catalogo):
+        indice = self._indices_busqueda.get(catalogo)
+        if indice is None:
+            indice = self._indices_busqueda[catalogo] = IndiceBusqueda()
+            campos = _CAMPOS_BUSQUEDA[catalogo]
+            indice.agregar_varios((clave, clave, *(getattr(entidad, campo) for campo in campos))
+                                  for clave, entidad in list(getattr(self, catalogo).items()))
+        return indice
+    
+    def _actualizar_busqueda(self, catalogo, clave):
+        """Refleja en el índice de búsqueda (si ya se construyó) el alta, edición o baja de una entidad"""
+        with self._bloqueo_busqueda:
+            indice = self._indices_busqueda.get(catalogo)
+            if indice is None:
+                return
+            entidad = getattr(self, catalogo).get(clave)
+            if entidad is None:
+                indice.eliminar(clave)
+            else:
+                indice.agregar(clave, clave, *(getattr(entidad, campo) for campo in _CAMPOS_BUSQUEDA[catalogo]))
+    
+    def _reiniciar_busqueda(self):
+        # Tras recargar los catálogos completos los índices se reconstruyen en la próxima búsqueda
+        with self._bloqueo_busqueda:
+            self._indices_busqueda = {}
+    
+    def calificaciones(self):
+        """Copia de todas las calificaciones como columna contigua (NumPy si está disponible)"""
+        return self.columnas.columna('calificaciones')
+    
+    def histograma_calificaciones(self, intervalos=10):
+        """(conteos, bordes) listos para ax.hist(bordes[:-1], bordes, weights=conteos)"""
+        conteos, bordes = self._memorizar(('histograma', intervalos), ('notas',),
+                                          lambda: self.columnas.histograma(intervalos))
+        return list(conteos), list(bordes)
+    
+    def contar_calificaciones(self, minimo=None, maximo=None):
+        """Cantidad de notas con calificación en [minimo, maximo)"""
+        return self.columnas.contar_entre(minimo, maximo)
     
-    # Métodos de cálculo
+    def resumen_general(self):
+        """ResumenCalificaciones de todas las notas, calculado sobre las columnas contiguas"""
+        return self._memorizar('resumen_general', ('notas',),
+                               lambda: resumir_calificaciones(self.columnas.columna('calificaciones'),
+                                                              self.columnas.columna('pesos')))
+    
+    def resumen_notas_estudiante(self, codigo_estudiante):
+        return self._memorizar(('resumen_estudiante', codigo_estudiante), ('notas',),
+                               lambda: resumir_notas(self.obtener_notas_estudiante(codigo_estudiante)))
+    
+    def resumen_notas_asignatura(self, codigo_asignatura):
+        return self._memorizar(('resumen_asignatura', codigo_asignatura), ('notas',),
+                               lambda: resumir_notas(self.obtener_notas_asignatura(codigo_asignatura)))
+    
+    def calificacion_maxima(self):
+        return self.columnas.maximo()
+    
+    def calificacion_minima(self):
+        return self.columnas.minimo()
+    
+    # Caché de estadísticas, invalidada por versión de entidad
+    def _invalidar(self, *entidades):
+        self.version_datos += 1
+        for entidad in entidades:
+            self._versiones[entidad] = self.version_datos
+    
+    def _memorizar(self, clave, dependencias, calcular):
+        """Devuelve el valor guardado para clave mientras no cambie ninguna de las entidades de las que depende"""
+        firma = tuple(self._versiones[entidad] for entidad in dependencias)
+        guardado = self._cache_estadisticas.get(clave)
+        if guardado is not None and guardado[0] == firma:
+            return guardado[1]
+        valor = calcular()
+        self._cache_estadisticas[clave] = (firma, valor)
+        return valor
+    
+    # Métodos de cálculo (lecturas de los acumulados mantenidos por _indexar_nota)
     def calcular_promedio_estudiante(self, codigo_estudiante):
-        notas = self.obtener_notas_estudiante(codigo_estudiante)
-        if not notas:
-            return 0
-        return sum(n.calificacion for n in notas) / len(notas)
+        agregado = self._agregados_estudiante.get(codigo_estudiante)
+        return agregado.promedio() if agregado else 0
     
     def calcular_promedio_ponderado_estudiante(self, codigo_estudiante):
-        notas = self.obtener_notas_estudiante(codigo_estudiante)
-        if not notas:
-            return 0
-        
-        suma_ponderada = sum(n.calificacion * n.peso for n in notas)
-        suma_pesos = sum(n.peso for n in notas)
-        
-        return suma_ponderada / suma_pesos if suma_pesos != 0 else 0
+        agregado = self._agregados_estudiante.get(codigo_estudiante)
+        return agregado.promedio_ponderado() if agregado else 0
     
     def calcular_promedio_asignatura(self, codigo_asignatura):
-        notas = self.obtener_notas_asignatura(codigo_asignatura)
-        if not notas:
-            return 0
-        return sum(n.calificacion for n in notas) / len(notas)
+        agregado = self._agregados_asignatura.get(codigo_asignatura)
+        return agregado.promedio() if agregado else 0
     
     def calcular_promedio_general(self):
-        if not self.notas_heap:
-            return 0
-        return sum(n.calificacion for n in self.notas_heap) / len(self.notas_heap)
+        return self._agregado_general.promedio()
     
     def estudiantes_en_riesgo(self, umbral=3.0):
-        estudiantes_riesgo = []
-        for codigo in self.estudiantes:
-            promedio = self.calcular_promedio_estudiante(codigo)
-            if promedio < umbral:
-                estudiantes_riesgo.append((codigo, promedio))
-        return sorted(estudiantes_riesgo, key=lambda x: x[1])
+        return list(self._memorizar(('estudiantes_en_riesgo', umbral), ('estudiantes', 'notas'),
+                                    lambda: self._calcular_estudiantes_en_riesgo(umbral)))
+    
+    def _calcular_estudiantes_en_riesgo(self, umbral):
+        # En el ranking (descendente) los estudiantes en riesgo forman el tramo final
+        desde = self._ranking.contar_menores((math.nextafter(-umbral, math.inf),))
+        en_riesgo = self.ranking_pagina(desde, len(self._ranking) - desde)
+        en_riesgo.reverse()
+        return en_riesgo
     
     def ranking_estudiantes(self):
-        ranking = []
-        for codigo in self.estudiantes:
-            promedio = self.calcular_promedio_estudiante(codigo)
-            ranking.append((codigo, promedio))
-        return sorted(ranking, key=lambda x: x[1], reverse=True)
+        return list(self._memorizar('ranking_estudiantes', ('estudiantes', 'notas'),
+                                    lambda: [(codigo, -negativo) for negativo, codigo in self._ranking]))
+    
+    def ranking_pagina(self, inicio, cantidad):
+        """Tramo del ranking [inicio, inicio + cantidad) sin ordenar a todos los estudiantes"""
+        return [(codigo, -negativo) for negativo, codigo in self._ranking.rango(inicio, inicio + cantidad)]
+    
+    def top_estudiantes(self, k):
+        return self.ranking_pagina(0, k)
+    
+    def peores_estudiantes(self, k):
+        """Los k promedios más bajos, del peor hacia arriba"""
+        total = len(self._ranking)
+        peores = self.ranking_pagina(max(total - k, 0), k)
+        peores.reverse()
+        return peores
+    
+    def posicion_estudiante(self, codigo):
+        """Puesto (desde 1) del estudiante en el ranking, o None si no existe"""
+        clave = self._claves_ranking.get(codigo)
+        if clave is None:
+            return None
+        return self._ranking.posicion(clave) + 1
     
     def obtener_estadisticas_generales(self):
+        return dict(self._memorizar('estadisticas_generales', ('estudiantes', 'asignaturas', 'notas'),
+                                    self._calcular_estadisticas_generales))
+    
+    def _calcular_estadisticas_generales(self):
         stats = {
             'total_estudiantes': len(self.estudiantes),
             'total_asignaturas': len(self.asignaturas),
-            'total_notas': len(self.notas_heap),
+            'total_notas': self.total_notas(),
             'promedio_general': self.calcular_promedio_general(),
             'estudiantes_riesgo': len(self.estudiantes_en_riesgo()),
             'mejor_estudiante': self.obtener_mejor_estudiante(),
@@ -261,7 +1042,7 @@ class SistemaNotas:
         return stats
     
     def obtener_mejor_estudiante(self):
-        ranking = self.ranking_estudiantes()
+        ranking = self.top_estudiantes(1)
         if not ranking:
             return ("N/A", 0)
         mejor_codigo, mejor_prom = ranking[0]
@@ -269,16 +1050,20 @@ class SistemaNotas:
         return (nombre, mejor_prom)
     
     def obtener_peor_estudiante(self):
-        ranking = self.ranking_estudiantes()
+        ranking = self.peores_estudiantes(1)
         if not ranking:
             return ("N/A", 0)
-        peor_codigo, peor_prom = ranking[-1]
+        peor_codigo, peor_prom = ranking[0]
         nombre = self.estudiantes[peor_codigo].nombre if peor_codigo in self.estudiantes else "N/A"
         return (nombre, peor_prom)
     
+    def _promedios_asignaturas(self):
+        return self._memorizar('promedios_asignaturas', ('asignaturas', 'notas'),
+                               lambda: [(asig.codigo, self.calcular_promedio_asignatura(asig.codigo)) 
+                                        for asig in self.asignaturas.values()])
+    
     def obtener_mejor_asignatura(self):
-        asignaturas = [(asig.codigo, self.calcular_promedio_asignatura(asig.codigo)) 
-                      for asig in self.asignaturas.values()]
+        asignaturas = self._promedios_asignaturas()
         if not asignaturas:
             return ("N/A", 0)
         mejor_codigo, mejor_prom = max(asignaturas, key=lambda x: x[1])
@@ -286,77 +1071,411 @@ class SistemaNotas:
         return (nombre, mejor_prom)
     
     def obtener_peor_asignatura(self):
-        asignaturas = [(asig.codigo, self.calcular_promedio_asignatura(asig.codigo)) 
-                      for asig in self.asignaturas.values()]
+        asignaturas = self._promedios_asignaturas()
         if not asignaturas:
             return ("N/A", 0)
         peor_codigo, peor_prom = min(asignaturas, key=lambda x: x[1])
         nombre = self.asignaturas[peor_codigo].nombre if peor_codigo in self.asignaturas else "N/A"
         return (nombre, peor_prom)
     
+    # Avisos de cambios
+    def suscribir(self, funcion):
+        """Llama a funcion(Cambio) tras cada mutación (ver models/eventos.py); devuelve la función
+        que cancela la suscripción"""
+        self._suscriptores.append(funcion)
+        return lambda: self._suscriptores.remove(funcion) if funcion in self._suscriptores else None
+    
+    @contextmanager
+    def agrupar_avisos(self):
+        """Dentro del bloque los avisos se acumulan y al salir se envía uno por cada racha de cambios
+        del mismo tipo (por ejemplo, un solo NOTAS_AGREGADAS para todos los lotes de una importación)"""
+        if self._avisos_agrupados is not None:
+            yield self
+            return
+        self._avisos_agrupados = []
+        try:
+            yield self
+        finally:
+            avisos, self._avisos_agrupados = self._avisos_agrupados, None
+            for tipo, claves, estudiantes, asignaturas in avisos:
+                self._notificar(tipo, claves, estudiantes, asignaturas)
+    
+    def _notificar(self, tipo, claves=(), estudiantes=(), asignaturas=()):
+        if not self._suscriptores:
+            return
+        if self._avisos_agrupados is not None:
+            if self._avisos_agrupados and self._avisos_agrupados[-1][0] == tipo:
+                _, claves_racha, estudiantes_racha, asignaturas_racha = self._avisos_agrupados[-1]
+                claves_racha.extend(claves)
+                estudiantes_racha.update(estudiantes)
+                asignaturas_racha.update(asignaturas)
+            else:
+                self._avisos_agrupados.append((tipo, list(claves), set(estudiantes), set(asignaturas)))
+            return
+        cambio = Cambio(tipo, claves, estudiantes, asignaturas)
+        for funcion in list(self._suscriptores):
+            try:
+                funcion(cambio)
+            except Exception as e:
+                # Un suscriptor con errores no debe impedir que se avise a los demás
+                print(f"Error al notificar el cambio {tipo}: {e}")
+    
+    def _notificar_notas(self, tipo, notas):
+        if self._suscriptores:
+            self._notificar(tipo, dict.fromkeys(nota.id_nota for nota in notas),
+                            {nota.estudiante for nota in notas}, {nota.asignatura for nota in notas})
+    
+    # Transacciones
+    @contextmanager
+    def transaccion(self):
+        """Agrupa varias mutaciones: se persisten juntas al salir o se revierten si hay una excepción"""
+        self.iniciar_transaccion()
+        try:
+            yield self
+        except BaseException:
+            self.revertir_transaccion()
+            raise
+        self.confirmar_transaccion()
+    
+    def iniciar_transaccion(self):
+        # Las transacciones anidadas se integran en la más externa
+        self._nivel_transaccion += 1
+    
+    def confirmar_transaccion(self):
+        if self._nivel_transaccion == 0:
+            return False
+        if self._transaccion_fallida:
+            self.revertir_transaccion()
+            raise TransaccionRevertida("Se revirtió una transacción anidada; se deshace la transacción completa")
+        self._nivel_transaccion -= 1
+        if self._nivel_transaccion > 0:
+            return True
+        
+        registros = self._registros_transaccion
+        self._registros_transaccion = []
+        self._deshacer_transaccion = []
+        if not registros:
+            return True
+        
+        mutaciones = sum(contar_mutaciones(operacion, datos) for operacion, datos in registros)
+        if self._mutaciones_diario + mutaciones >= self._umbral_checkpoint():
+            # Una transacción masiva se consolida directamente en el snapshot
+            self._secuencia += 1
+            if self.guardar_datos():
+                return True
+            # Sin snapshot nuevo la transacción solo sobrevive a un reinicio si queda en el diario
+            print("Error al consolidar la transacción en el snapshot: se anota en el diario")
+        self._escribir_diario(OPERACION_LOTE, [[operacion, datos] for operacion, datos in registros])
+        return True
+    
+    def revertir_transaccion(self):
+        if self._nivel_transaccion == 0:
+            return False
+        if self._nivel_transaccion > 1:
+            # Solo la más externa deshace los cambios; hasta entonces ya no puede confirmarse
+            self._nivel_transaccion -= 1
+            self._transaccion_fallida = True
+            return True
+        self._nivel_transaccion = 0
+        self._transaccion_fallida = False
+        deshacer = self._deshacer_transaccion
+        self._registros_transaccion = []
+        self._deshacer_transaccion = []
+        
+        self._registro_suspendido = True
+        try:
+            for funcion in reversed(deshacer):
+                funcion()
+        finally:
+            self._registro_suspendido = False
+        return True
+    
+    def _restaurar(self, agregar_entidad, entidad, notas):
+        """Deshace una eliminación en cascada"""
+        agregar_entidad(entidad)
+        self.agregar_notas(notas)
+    
     # Persistencia de datos
-    def guardar_datos(self):
-        data = {
-            'estudiantes': {codigo: est.to_dict() for codigo, est in self.estudiantes.items()},
-            'asignaturas': {codigo: asig.to_dict() for codigo, asig in self.asignaturas.items()},
-            'profesores': {id: prof.to_dict() for id, prof in self.profesores.items()},
-            'notas': [nota.to_dict() for nota in self.notas_heap],
-            'notas_por_estudiante': {codigo: [nota.to_dict() for nota in notas] 
-                                    for codigo, notas in self.notas_por_estudiante.items()},
-            'notas_por_asignatura': {codigo: [nota.to_dict() for nota in notas] 
-                                    for codigo, notas in self.notas_por_asignatura.items()}
+    def _registrar(self, operacion, datos, deshacer=None):
+        """Anexa la mutación al diario y consolida cuando el diario crece demasiado"""
+        # También durante la reproducción o un rollback: los datos cambian aunque no se registren
+        self._invalidar(*_ENTIDADES_POR_OPERACION.get(operacion, ENTIDADES))
+        if self._registro_suspendido:
+            return
+        if self._nivel_transaccion:
+            self._registros_transaccion.append((operacion, datos))
+            self._deshacer_transaccion.append(deshacer)
+            return
+        self._escribir_diario(operacion, datos)
+    
+    def _escribir_diario(self, operacion, datos):
+        self._secuencia += 1
+        self._mutaciones_diario += contar_mutaciones(operacion, datos)
+        if self.escritor is not None:
+            self.escritor.anexar(self._secuencia, operacion, datos)
+        else:
+            try:
+                self.diario.registrar(self._secuencia, operacion, datos)
+            except Exception as e:
+                print(f"Error al escribir el diario: {e}")
+                self.guardar_datos()
+                return
+        if self._mutaciones_diario >= self._umbral_checkpoint():
+            self.guardar_datos()
+    
+    def _umbral_checkpoint(self):
+        # El umbral crece con los datos para que el costo de los checkpoints se amortice
+        return max(self.intervalo_checkpoint, self.total_notas() // 2)
+    
+    def _reproducir_registro(self, operacion, datos):
+        if operacion == 'agregar_estudiante':
+            self.agregar_estudiante(Estudiante.from_dict(datos))
+        elif operacion == 'editar_estudiante':
+            self.editar_estudiante(datos['codigo'], Estudiante.from_dict(datos['estudiante']))
+        elif operacion == 'eliminar_estudiante':
+            self.eliminar_estudiante(datos['codigo'])
+        elif operacion == 'agregar_asignatura':
+            self.agregar_asignatura(Asignatura.from_dict(datos))
+        elif operacion == 'editar_asignatura':
+            self.editar_asignatura(datos['codigo'], Asignatura.from_dict(datos['asignatura']))
+        elif operacion == 'eliminar_asignatura':
+            self.eliminar_asignatura(datos['codigo'])
+        elif operacion == 'agregar_nota':
+            self.agregar_nota(Nota.from_dict(datos))
+        elif operacion == 'agregar_notas':
+            self.agregar_notas([Nota.from_dict(nota_data) for nota_data in datos])
+        elif operacion == 'editar_nota':
+            self.editar_nota(datos['id_nota'], Nota.from_dict(datos['nota']))
+        elif operacion == 'eliminar_nota':
+            self.eliminar_nota(datos['id_nota'])
+        elif operacion == 'eliminar_notas':
+            self.eliminar_notas(datos)
+        elif operacion == 'agregar_profesor':
+            self.agregar_profesor(Profesor.from_dict(datos))
+        elif operacion == 'editar_profesor':
+            self.editar_profesor(datos['id_profesor'], Profesor.from_dict(datos['profesor']))
+        elif operacion == 'eliminar_profesor':
+            self.eliminar_profesor(datos['id_profesor'])
+        elif operacion == 'agregar_periodo':
+            self.agregar_periodo(Periodo.from_dict(datos))
+        elif operacion == 'editar_periodo':
+            self.editar_periodo(datos['codigo'], Periodo.from_dict(datos['periodo']))
+        elif operacion == 'eliminar_periodo':
+            self.eliminar_periodo(datos['codigo'])
+        elif operacion == OPERACION_LOTE:
+            for operacion_lote, datos_lote in datos:
+                self._reproducir_registro(operacion_lote, datos_lote)
+        else:
+            print(f"Operación desconocida en el diario: {operacion}")
+    
+    def _reproducir_diario(self):
+        """Aplica sobre el snapshot cargado los registros del diario posteriores a él"""
+        # Los suscriptores reciben un único DATOS_RECARGADOS al terminar la carga, no un aviso por registro
+        suscriptores, self._suscriptores = self._suscriptores, []
+        self._registro_suspendido = True
+        try:
+            for secuencia, operacion, datos in self.diario.leer():
+                if secuencia <= self._secuencia:
+                    continue  # Ya incluido en el snapshot
+                self._reproducir_registro(operacion, datos)
+                self._secuencia = secuencia
+        finally:
+            self._registro_suspendido = False
+            self._suscriptores = suscriptores
+        self._mutaciones_diario = self.diario.total_registros
+    
+    def _metadatos_snapshot(self):
+        """Parte del snapshot que no son notas: catálogos y contadores"""
+        return {
+            'version': VERSION_SNAPSHOT,
+            'secuencia': self._secuencia,
+            'siguiente_id_nota': self._siguiente_id_nota,
+            'estudiantes': [est.to_dict() for est in self.estudiantes.values()],
+            'asignaturas': [asig.to_dict() for asig in self.asignaturas.values()],
+            'profesores': [prof.to_dict() for prof in self.profesores.values()],
+            'periodos': [periodo.to_dict() for periodo in self.periodos.values()]
         }
+    
+    def _migrar_snapshot(self, data):
+        """Convierte un snapshot pickle de una versión anterior al último formato pickle"""
+        version = data.get('version', 1)
+        if version == 1:
+            # Formato original: diccionarios por código y las notas repetidas en
+            # 'notas_por_estudiante'/'notas_por_asignatura' (se descartan)
+            data = {
+                'version': 2,
+                'secuencia': data.get('secuencia', 0),
+                'estudiantes': list(data.get('estudiantes', {}).values()),
+                'asignaturas': list(data.get('asignaturas', {}).values()),
+                'profesores': list(data.get('profesores', {}).values()),
+                'notas': [Nota.from_dict(nota_data).to_fila() for nota_data in data.get('notas', [])]
+            }
+        if data['version'] == 2:
+            # Las notas pasan a tener un identificador estable
+            data['notas'] = [fila[:6] + (i,) for i, fila in enumerate(data['notas'], start=1)]
+            data['siguiente_id_nota'] = len(data['notas']) + 1
+            data['version'] = 3
+        if data['version'] != ULTIMA_VERSION_PICKLE:
+            raise ValueError(f"Versión de snapshot no soportada: {data['version']}")
+        return data
+    
+    def guardar_datos(self):
+        """Checkpoint: escribe el snapshot completo y vacía el diario.
+        
+        Con el escritor en segundo plano solo se captura el estado y se encola;
+        el snapshot se escribe fuera del hilo de la interfaz (ver vaciar).
+        """
+        if self._snapshot is not None and self._secuencia == self._secuencia_guardada:
+            return True  # Nada cambió desde que se cargó el snapshot
+        
+        captura = self._capturar_snapshot()
+        self._mutaciones_diario = 0
+        if self.escritor is not None:
+            self.escritor.solicitar_checkpoint(captura)
+            return True
         try:
-            with open(self.archivo_datos, 'wb') as f:
-                pickle.dump(data, f)
+            self._escribir_checkpoint(captura)
             return True
         except Exception as e:
             print(f"Error al guardar datos: {e}")
             return False
     
+    def _capturar_snapshot(self):
+        """Copia del estado a guardar: basta copiar las listas, porque las notas no se modifican
+        después de agregarse (editar una nota la reemplaza por otra)"""
+        # El snapshot anterior queda cerrado antes de reemplazar el archivo
+        self._asegurar_notas()
+        return (self._secuencia,
+                self._metadatos_snapshot(),
+                {codigo: list(notas.values()) for codigo, notas in self.notas_por_estudiante.items()},
+                {codigo: agregado.valores() for codigo, agregado in self._agregados_estudiante.items()},
+                {codigo: agregado.valores() for codigo, agregado in self._agregados_asignatura.items()},
+                self._agregado_general.valores())
+    
+    def _escribir_checkpoint(self, captura):
+        """Escribe una captura de _capturar_snapshot; con el escritor activo corre en su hilo"""
+        secuencia, metadatos, notas_por_estudiante, acumulados_estudiante, acumulados_asignatura, \
+            acumulado_general = captura
+        escribir_snapshot(self.archivo_datos, metadatos, notas_por_estudiante, acumulados_estudiante,
+                          acumulados_asignatura, acumulado_general)
+        self._secuencia_guardada = secuencia
+        self.diario.truncar()
+    
+    def iniciar_escritor(self, espera=ESPERA_ESCRITURA, latencia_maxima=LATENCIA_MAXIMA_ESCRITURA,
+                         al_cambiar_estado=None):
+        """Pasa la persistencia a un hilo que agrupa cada ráfaga de mutaciones en una sola escritura"""
+        if self.escritor is None:
+            self.escritor = EscritorSegundoPlano(self.diario, self._escribir_checkpoint, espera,
+                                                 latencia_maxima, al_cambiar_estado)
+        return self.escritor
+    
+    def guardado_pendiente(self):
+        """True si hay mutaciones que el escritor aún no ha llevado al disco"""
+        return self.escritor is not None and self.escritor.pendiente()
+    
+    def vaciar(self, timeout=None):
+        """Espera a que todo lo pendiente quede escrito; False si se agotó el tiempo"""
+        if self.escritor is None:
+            return True
+        return self.escritor.vaciar(timeout)
+    
+    def detener_escritor(self, timeout=None):
+        """Vacía lo pendiente y vuelve a la escritura inmediata; False si no se pudo escribir todo a tiempo"""
+        if self.escritor is None:
+            return True
+        escrito = self.escritor.detener(timeout)
+        self.escritor = None
+        return escrito
+    
+    def _cargar_catalogos(self, data):
+        self._secuencia = self._secuencia_guardada = data['secuencia']
+        self._siguiente_id_nota = data['siguiente_id_nota']
+        
+        self.estudiantes = {}
+        for est_data in data['estudiantes']:
+            estudiante = Estudiante.from_dict(est_data)
+            self.estudiantes[estudiante.codigo] = estudiante
+        
+        self.asignaturas = {}
+        for asig_data in data['asignaturas']:
+            asignatura = Asignatura.from_dict(asig_data)
+            self.asignaturas[asignatura.codigo] = asignatura
+        
+        self.profesores = {}
+        for prof_data in data['profesores']:
+            profesor = Profesor.from_dict(prof_data)
+            self.profesores[profesor.id_profesor] = profesor
+        
+        # Los snapshots anteriores a los periodos no los incluyen
+        self.periodos = {}
+        for periodo_data in data.get('periodos', []):
+            periodo = Periodo.from_dict(periodo_data)
+            self.periodos[periodo.codigo] = periodo
+        self._reordenar_periodos()
+    
+    def _cargar_snapshot_binario(self, snapshot):
+        """Carga catálogos, acumulados y columnas; las notas se crean al primer uso (_asegurar_notas)"""
+        metadatos = snapshot.metadatos
+        self._cargar_catalogos(metadatos)
+        self._reiniciar_notas()
+        
+        self._agregado_general = Acumulador.desde_valores(*metadatos['agregado_general'])
+        self._agregados_estudiante = {codigo: Acumulador.desde_valores(*valores)
+                                      for codigo, valores in metadatos['agregados_estudiante'].items()}
+        self._agregados_asignatura = {codigo: Acumulador.desde_valores(*valores)
+                                      for codigo, valores in metadatos['agregados_asignatura'].items()}
+        self.columnas = AlmacenColumnar.desde_snapshot(snapshot)
+        self._snapshot = snapshot
+    
+    def _cargar_snapshot_pickle(self, data):
+        self._cargar_catalogos(data)
+        
+        # Cargar notas y reconstruir los índices en una sola pasada
+        self._reiniciar_notas()
+        notas = [Nota.from_fila(fila) for fila in data['notas']]
+        for nota in notas:
+            self._indexar_nota(nota, actualizar_ranking=False)
+        self.notas_heap = HeapIndexado(notas)
+    
     def cargar_datos(self):
+        self._invalidar(*ENTIDADES)
+        self._reiniciar_busqueda()
         try:
+            migrado = False
             if os.path.exists(self.archivo_datos):
-                with open(self.archivo_datos, 'rb') as f:
-                    data = pickle.load(f)
-                    
-                    # Cargar estudiantes
-                    self.estudiantes = {codigo: Estudiante.from_dict(est_data) 
-                                      for codigo, est_data in data.get('estudiantes', {}).items()}
-                    
-                    # Cargar asignaturas
-                    self.asignaturas = {codigo: Asignatura.from_dict(asig_data) 
-                                     for codigo, asig_data in data.get('asignaturas', {}).items()}
-                    
-                    # Cargar profesores
-                    self.profesores = {id: Profesor.from_dict(prof_data) 
-                                    for id, prof_data in data.get('profesores', {}).items()}
-                    
-                    # Cargar notas
-                    self.notas_heap = [Nota.from_dict(nota_data) for nota_data in data.get('notas', [])]
-                    
-                    # Reconstruir diccionarios de notas por estudiante y asignatura
-                    self.notas_por_estudiante = {}
-                    for nota in self.notas_heap:
-                        if nota.estudiante not in self.notas_por_estudiante:
-                            self.notas_por_estudiante[nota.estudiante] = []
-                        self.notas_por_estudiante[nota.estudiante].append(nota)
-                    
-                    self.notas_por_asignatura = {}
-                    for nota in self.notas_heap:
-                        if nota.asignatura not in self.notas_por_asignatura:
-                            self.notas_por_asignatura[nota.asignatura] = []
-                        self.notas_por_asignatura[nota.asignatura].append(nota)
-                    
+                if es_snapshot_binario(self.archivo_datos):
+                    inicio_carga = time.perf_counter()
+                    self._cargar_snapshot_binario(SnapshotBinario(self.archivo_datos))
+                    self._anotar_carga('catalogos', self.archivo_datos, 0, inicio_carga)
+                    if not self.carga_perezosa:
+                        self._asegurar_notas()
+                else:
+                    with open(self.archivo_datos, 'rb') as f:
+                        data = pickle.load(f)
+                    self._cargar_snapshot_pickle(self._migrar_snapshot(data))
+                    migrado = True
+            
+            self._reconstruir_ranking()
+            
+            # Aplicar las mutaciones registradas después del último checkpoint
+            self._reproducir_diario()
+            
+            # Reescribir el archivo migrado en el formato actual
+            if migrado:
+                self.guardar_datos()
+            self._notificar(eventos.DATOS_RECARGADOS)
             return True
         except Exception as e:
             print(f"Error al cargar datos: {e}")
             # Si hay error, inicializar estructuras vacías
-            self.notas_heap = []
-            self.notas_por_estudiante = {}
-            self.notas_por_asignatura = {}
+            self._reiniciar_notas()
             self.estudiantes = {}
             self.asignaturas = {}
+            self.periodos = {}
+            self._reordenar_periodos()
+            self._invalidar(*ENTIDADES)
+            self._reiniciar_busqueda()
+            self._notificar(eventos.DATOS_RECARGADOS)
             return False
     
     def exportar_csv(self, nombre_archivo="notas_exportadas.csv"):
@@ -364,7 +1483,7 @@ class SistemaNotas:
             with open(nombre_archivo, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
                 writer.writerow(['Estudiante', 'Asignatura', 'Calificación', 'Fecha', 'Peso', 'Descripción'])
-                for nota in self.notas_heap:
+                for nota in self.iterar_notas():
                     writer.writerow([
                         nota.estudiante,
                         nota.asignatura,
@@ -378,35 +1497,22 @@ class SistemaNotas:
             print(f"Error al exportar datos: {e}")
             return False
     
-    def importar_csv(self, nombre_archivo):
-        try:
-            if not os.path.exists(nombre_archivo):
-                return False, "El archivo no existe"
-            
-            with open(nombre_archivo, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                next(reader)  # Saltar encabezado
-                
-                contador = 0
-                for fila in reader:
-                    if len(fila) >= 6:
-                        estudiante, asignatura, calificacion, fecha_str, peso, descripcion = fila
-                        try:
-                            fecha = datetime.datetime.strptime(fecha_str, '%d/%m/%Y')
-                            nota = Nota(
-                                estudiante=estudiante,
-                                asignatura=asignatura,
-                                calificacion=float(calificacion),
-                                fecha=fecha,
-                                peso=float(peso),
-                                descripcion=descripcion
-                            )
-                            if self.agregar_nota(nota):
-                                contador += 1
-                        except Exception as e:
-                            print(f"Error al procesar fila {fila}: {e}")
-                
-            return True, f"Se importaron {contador} notas"
-        except Exception as e:
-            print(f"Error al importar datos: {e}")
-            return False, str(e)
\ No newline at end of file
+    def importar_csv(self, nombre_archivo, tamano_lote=TAMANO_LOTE_IMPORTACION):
+        reporte = self.importar_csv_con_reporte(nombre_archivo, tamano_lote)
+        if reporte.error:
+            return False, reporte.error
+        return True, reporte.resumen()
+    
+    def importar_csv_con_reporte(self, nombre_archivo, tamano_lote=TAMANO_LOTE_IMPORTACION):
+        """Importa notas por lotes y devuelve el ReporteImportacion con filas aceptadas y rechazadas"""
+        if not os.path.exists(nombre_archivo):
+            reporte = ReporteImportacion()
+            reporte.error = "El archivo no existe"
+            return reporte
+        with self.agrupar_avisos():
+            return importar_notas_csv(self, nombre_archivo, tamano_lote)
+    
+    def importar_csv_paralelo(self, nombres_archivos, procesos=None):
+        """Importa uno o varios CSV grandes repartiendo el parseo entre procesos"""
+        with self.agrupar_avisos():
+            return importar_csv_paralelo(self, nombres_archivos, procesos)
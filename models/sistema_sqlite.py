@@ -0,0 +1,693 @@
+import json
+import os
+import sqlite3
+import threading
+from array import array
+from .estudiante import Estudiante
+from .asignatura import Asignatura
+from .nota import Nota, fecha_a_ordinal
+from .profesor import Profesor
+from .periodo import Periodo
+from .agregados import Acumulador
+from .estadisticas import resumir_calificaciones
+from . import eventos
+from .sistema_notas import SistemaNotas, ENTIDADES, TransaccionRevertida
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS estudiantes (
+    codigo TEXT PRIMARY KEY, nombre TEXT, programa TEXT, email TEXT, telefono TEXT);
+CREATE TABLE IF NOT EXISTS asignaturas (
+    codigo TEXT PRIMARY KEY, nombre TEXT, creditos INTEGER, profesor TEXT);
+CREATE TABLE IF NOT EXISTS profesores (
+    id_profesor TEXT PRIMARY KEY, nombre TEXT, email TEXT, telefono TEXT, especialidad TEXT);
+CREATE TABLE IF NOT EXISTS periodos (
+    codigo TEXT PRIMARY KEY, nombre TEXT, fecha_inicio TEXT, fecha_fin TEXT);
+CREATE TABLE IF NOT EXISTS notas (
+    id_nota INTEGER PRIMARY KEY AUTOINCREMENT,  -- los ids no se reutilizan, como en SistemaNotas
+    estudiante TEXT NOT NULL REFERENCES estudiantes(codigo) ON DELETE CASCADE,
+    asignatura TEXT NOT NULL REFERENCES asignaturas(codigo) ON DELETE CASCADE,
+    calificacion REAL NOT NULL,
+    fecha INTEGER NOT NULL,
+    peso REAL NOT NULL,
+    descripcion TEXT NOT NULL);
+
+-- Los índices por entidad incluyen calificación y peso para resolver promedios sin leer la tabla
+CREATE INDEX IF NOT EXISTS idx_notas_estudiante ON notas(estudiante, calificacion, peso);
+CREATE INDEX IF NOT EXISTS idx_notas_asignatura ON notas(asignatura, calificacion, peso);
+CREATE INDEX IF NOT EXISTS idx_notas_fecha ON notas(fecha);
+CREATE INDEX IF NOT EXISTS idx_notas_estudiante_fecha ON notas(estudiante, fecha);
+CREATE INDEX IF NOT EXISTS idx_notas_calificacion ON notas(calificacion);
+
+-- Acumulados por entidad mantenidos por triggers (equivalentes a Acumulador)
+CREATE TABLE IF NOT EXISTS resumen_estudiantes (
+    codigo TEXT PRIMARY KEY REFERENCES estudiantes(codigo) ON DELETE CASCADE,
+    suma REAL NOT NULL DEFAULT 0, suma_ponderada REAL NOT NULL DEFAULT 0,
+    suma_pesos REAL NOT NULL DEFAULT 0, conteo INTEGER NOT NULL DEFAULT 0,
+    promedio REAL NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS resumen_asignaturas (
+    codigo TEXT PRIMARY KEY REFERENCES asignaturas(codigo) ON DELETE CASCADE,
+    suma REAL NOT NULL DEFAULT 0, suma_ponderada REAL NOT NULL DEFAULT 0,
+    suma_pesos REAL NOT NULL DEFAULT 0, conteo INTEGER NOT NULL DEFAULT 0,
+    promedio REAL NOT NULL DEFAULT 0);
+CREATE INDEX IF NOT EXISTS idx_ranking ON resumen_estudiantes(promedio DESC, codigo);
+CREATE INDEX IF NOT EXISTS idx_ranking_asignaturas ON resumen_asignaturas(promedio DESC, codigo);
+
+CREATE TRIGGER IF NOT EXISTS estudiante_agregado AFTER INSERT ON estudiantes BEGIN
+    INSERT INTO resumen_estudiantes(codigo) VALUES (NEW.codigo);
+END;
+CREATE TRIGGER IF NOT EXISTS asignatura_agregada AFTER INSERT ON asignaturas BEGIN
+    INSERT INTO resumen_asignaturas(codigo) VALUES (NEW.codigo);
+END;
+"""
+
+# Un trigger por evento y tabla de resumen; {tabla} y {columna} se completan abajo
+_SUMAR = """
+    UPDATE {tabla} SET suma = suma + NEW.calificacion,
+        suma_ponderada = suma_ponderada + NEW.calificacion * NEW.peso,
+        suma_pesos = suma_pesos + NEW.peso,
+        conteo = conteo + 1,
+        promedio = (suma + NEW.calificacion) / (conteo + 1)
+    WHERE codigo = NEW.{columna};"""
+_RESTAR = """
+    UPDATE {tabla} SET
+        suma = CASE WHEN conteo > 1 THEN suma - OLD.calificacion ELSE 0 END,
+        suma_ponderada = CASE WHEN conteo > 1 THEN suma_ponderada - OLD.calificacion * OLD.peso ELSE 0 END,
+        suma_pesos = CASE WHEN conteo > 1 THEN suma_pesos - OLD.peso ELSE 0 END,
+        conteo = conteo - 1,
+        promedio = CASE WHEN conteo > 1 THEN (suma - OLD.calificacion) / (conteo - 1) ELSE 0 END
+    WHERE codigo = OLD.{columna};"""
+
+def _triggers_resumen():
+    sentencias = []
+    for tabla, columna in (('resumen_estudiantes', 'estudiante'), ('resumen_asignaturas', 'asignatura')):
+        sumar = _SUMAR.format(tabla=tabla, columna=columna)
+        restar = _RESTAR.format(tabla=tabla, columna=columna)
+        sentencias.append(f"CREATE TRIGGER IF NOT EXISTS {tabla}_insertar AFTER INSERT ON notas BEGIN{sumar}\nEND;")
+        sentencias.append(f"CREATE TRIGGER IF NOT EXISTS {tabla}_borrar AFTER DELETE ON notas BEGIN{restar}\nEND;")
+        sentencias.append(f"CREATE TRIGGER IF NOT EXISTS {tabla}_editar AFTER UPDATE ON notas BEGIN{restar}{sumar}\nEND;")
+    return "\n".join(sentencias)
+
+# Sentencias fijas con parámetros: sqlite3 las compila una vez y las reutiliza desde su caché
+_COLUMNAS_NOTA = "estudiante, asignatura, calificacion, fecha, peso, descripcion, id_nota"
+SQL_INSERTAR_NOTA = f"INSERT INTO notas ({_COLUMNAS_NOTA}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+SQL_EDITAR_NOTA = ("UPDATE notas SET estudiante = ?, asignatura = ?, calificacion = ?, fecha = ?, "
+                   "peso = ?, descripcion = ? WHERE id_nota = ?")
+SQL_NOTA = f"SELECT {_COLUMNAS_NOTA} FROM notas WHERE id_nota = ?"
+SQL_NOTAS = f"SELECT {_COLUMNAS_NOTA} FROM notas"
+SQL_NOTAS_ESTUDIANTE = f"SELECT {_COLUMNAS_NOTA} FROM notas WHERE estudiante = ? ORDER BY id_nota"
+SQL_NOTAS_ASIGNATURA = f"SELECT {_COLUMNAS_NOTA} FROM notas WHERE asignatura = ? ORDER BY id_nota"
+SQL_NOTAS_PERIODO = (f"SELECT {_COLUMNAS_NOTA} FROM notas WHERE estudiante = ? AND fecha >= ? AND fecha < ? "
+                     "ORDER BY fecha, id_nota")
+SQL_ACUMULADO_PERIODO = ("SELECT COALESCE(SUM(calificacion), 0), COALESCE(SUM(calificacion * peso), 0), "
+                         "COALESCE(SUM(peso), 0), COUNT(*) FROM notas WHERE estudiante = ? AND fecha >= ? AND fecha < ?")
+SQL_NOTAS_ENTRE = f"SELECT {_COLUMNAS_NOTA} FROM notas WHERE fecha >= ? AND fecha < ? ORDER BY fecha, id_nota"
+# fecha es un ordinal en segundos desde 0001-01-01; el día 1 de ese calendario es el día juliano 1721425.5
+SQL_PROMEDIOS_MES = ("SELECT strftime('%Y-%m', fecha / 86400 + 1721424.5) AS mes, AVG(calificacion), COUNT(*) "
+                     "FROM notas GROUP BY mes ORDER BY mes")
+# Expresión de cada campo filtrable de las notas (ver SistemaNotas.filtrar_notas)
+_EXPRESIONES_CAMPO = {'estudiante': 'estudiante', 'asignatura': 'asignatura', 'descripcion': 'descripcion',
+                      'calificacion': 'calificacion', 'peso': 'peso', 'fecha': 'fecha', 'dia': 'fecha / 86400'}
+SQL_NOTAS_MAS_BAJAS = f"SELECT {_COLUMNAS_NOTA} FROM notas ORDER BY calificacion LIMIT ?"
+SQL_RANKING = "SELECT codigo, promedio FROM resumen_estudiantes ORDER BY promedio DESC, codigo LIMIT ? OFFSET ?"
+SQL_PEORES = "SELECT codigo, promedio FROM resumen_estudiantes ORDER BY promedio, codigo DESC LIMIT ?"
+SQL_EN_RIESGO = ("SELECT codigo, promedio FROM resumen_estudiantes WHERE promedio < ? "
+                 "ORDER BY promedio, codigo DESC")
+SQL_POSICION = ("SELECT COUNT(*) FROM resumen_estudiantes "
+                "WHERE promedio > ? OR (promedio = ? AND codigo < ?)")
+
+
+class SistemaNotasSQLite(SistemaNotas):
+    """SistemaNotas sobre una base SQLite: las notas viven en disco y las consultas se resuelven en SQL.
+
+    Los catálogos (estudiantes, asignaturas, profesores) se mantienen también en
+    memoria porque las vistas los recorren directamente; las notas nunca se cargan
+    completas salvo que se pidan con iterar_notas.
+    """
+    def __init__(self, archivo_bd="sistema_notas.db"):
+        # El estado compartido (catálogos, caché, búsqueda, avisos, transacciones) lo crea SistemaNotas
+        super().__init__(carga_perezosa=False, cargar=False)
+        self.archivo_bd = archivo_bd
+
+        # isolation_level=None: las transacciones se abren y cierran explícitamente
+        self.conexion = sqlite3.connect(archivo_bd, isolation_level=None, cached_statements=256)
+        self.conexion.execute("PRAGMA journal_mode=WAL")  # los lectores no bloquean al escritor
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.execute("PRAGMA foreign_keys=ON")
+        self.conexion.executescript(ESQUEMA + _triggers_resumen())
+        self._hilo_principal = threading.get_ident()
+        self._lecturas = threading.local()  # conexión propia de cada hilo de consultas
+        self.cargar_datos()
+
+    def _conexion_consultas(self):
+        """Conexión para las lecturas: fuera del hilo que creó el sistema (p. ej. en las búsquedas diferidas)
+        cada hilo abre la suya (con WAL, los lectores no bloquean al escritor y solo ven cambios confirmados)"""
+        if threading.get_ident() == self._hilo_principal:
+            return self.conexion
+        conexion = getattr(self._lecturas, 'conexion', None)
+        if conexion is None:
+            conexion = self._lecturas.conexion = sqlite3.connect(self.archivo_bd, isolation_level=None)
+        return conexion
+
+    def _valor(self, sql, parametros=()):
+        fila = self._conexion_consultas().execute(sql, parametros).fetchone()
+        return fila[0] if fila else None
+
+    # Métodos para estudiantes
+    def agregar_estudiante(self, estudiante):
+        if estudiante.codigo in self.estudiantes:
+            return False
+        with self.transaccion():
+            self.conexion.execute("INSERT INTO estudiantes VALUES (:codigo, :nombre, :programa, :email, :telefono)",
+                                  estudiante.to_dict())
+            self.estudiantes[estudiante.codigo] = estudiante
+            self._invalidar('estudiantes')
+            self._actualizar_busqueda('estudiantes', estudiante.codigo)
+        self._notificar(eventos.ESTUDIANTE_AGREGADO, (estudiante.codigo,), estudiantes=(estudiante.codigo,))
+        return True
+
+    def editar_estudiante(self, codigo, nuevo_estudiante):
+        if codigo not in self.estudiantes:
+            return False
+        with self.transaccion():
+            datos = dict(nuevo_estudiante.to_dict(), codigo=codigo)
+            self.conexion.execute("UPDATE estudiantes SET nombre = :nombre, programa = :programa, "
+                                  "email = :email, telefono = :telefono WHERE codigo = :codigo", datos)
+            self.estudiantes[codigo] = nuevo_estudiante
+            self._invalidar('estudiantes')
+            self._actualizar_busqueda('estudiantes', codigo)
+        self._notificar(eventos.ESTUDIANTE_EDITADO, (codigo,), estudiantes=(codigo,))
+        return True
+
+    def eliminar_estudiante(self, codigo, progreso=None):
+        if codigo not in self.estudiantes:
+            return False
+        with self.transaccion():
+            # Las notas se eliminan en cascada (FOREIGN KEY ... ON DELETE CASCADE)
+            notas = self._notas_en_cascada("estudiante", codigo)
+            self.conexion.execute("DELETE FROM estudiantes WHERE codigo = ?", (codigo,))
+            del self.estudiantes[codigo]
+            self._invalidar('estudiantes', 'notas')
+            self._actualizar_busqueda('estudiantes', codigo)
+        if progreso is not None:
+            progreso(len(notas), len(notas))
+        self._notificar_cascada(notas)
+        self._notificar(eventos.ESTUDIANTE_ELIMINADO, (codigo,), estudiantes=(codigo,))
+        return True
+
+    # Métodos para asignaturas
+    def agregar_asignatura(self, asignatura):
+        if asignatura.codigo in self.asignaturas:
+            return False
+        with self.transaccion():
+            self.conexion.execute("INSERT INTO asignaturas VALUES (:codigo, :nombre, :creditos, :profesor)",
+                                  asignatura.to_dict())
+            self.asignaturas[asignatura.codigo] = asignatura
+            self._invalidar('asignaturas')
+            self._actualizar_busqueda('asignaturas', asignatura.codigo)
+        self._notificar(eventos.ASIGNATURA_AGREGADA, (asignatura.codigo,), asignaturas=(asignatura.codigo,))
+        return True
+
+    def editar_asignatura(self, codigo, nueva_asignatura):
+        if codigo not in self.asignaturas:
+            return False
+        with self.transaccion():
+            datos = dict(nueva_asignatura.to_dict(), codigo=codigo)
+            self.conexion.execute("UPDATE asignaturas SET nombre = :nombre, creditos = :creditos, "
+                                  "profesor = :profesor WHERE codigo = :codigo", datos)
+            self.asignaturas[codigo] = nueva_asignatura
+            self._invalidar('asignaturas')
+            self._actualizar_busqueda('asignaturas', codigo)
+        self._notificar(eventos.ASIGNATURA_EDITADA, (codigo,), asignaturas=(codigo,))
+        return True
+
+    def eliminar_asignatura(self, codigo, progreso=None):
+        if codigo not in self.asignaturas:
+            return False
+        with self.transaccion():
+            notas = self._notas_en_cascada("asignatura", codigo)
+            self.conexion.execute("DELETE FROM asignaturas WHERE codigo = ?", (codigo,))
+            del self.asignaturas[codigo]
+            self._invalidar('asignaturas', 'notas')
+            self._actualizar_busqueda('asignaturas', codigo)
+        if progreso is not None:
+            progreso(len(notas), len(notas))
+        self._notificar_cascada(notas)
+        self._notificar(eventos.ASIGNATURA_ELIMINADA, (codigo,), asignaturas=(codigo,))
+        return True
+
+    def _notas_en_cascada(self, columna, codigo):
+        """(id_nota, estudiante, asignatura) de las notas que arrastrará la eliminación de la entidad"""
+        return self.conexion.execute(f"SELECT id_nota, estudiante, asignatura FROM notas WHERE {columna} = ?",
+                                     (codigo,)).fetchall()
+
+    def _notificar_cascada(self, notas):
+        if notas and self._suscriptores:
+            self._notificar(eventos.NOTAS_ELIMINADAS, [fila[0] for fila in notas],
+                            {fila[1] for fila in notas}, {fila[2] for fila in notas})
+
+    # Métodos para notas
+    def _siguiente_id(self):
+        ultimo = self._valor("SELECT seq FROM sqlite_sequence WHERE name = 'notas'") or 0
+        return max(ultimo, self._valor("SELECT MAX(id_nota) FROM notas") or 0) + 1
+
+    def agregar_nota(self, nota):
+        return self.agregar_notas([nota]) == 1
+
+    def agregar_notas(self, notas):
+        """Agrega un lote de notas con un solo executemany; devuelve cuántas se agregaron"""
+        notas = list(notas)
+        with self.transaccion():
+            siguiente = self._siguiente_id()
+            # Los ids que ya traen las notas (p. ej. al migrar) se comprueban con una sola consulta
+            con_id = [nota.id_nota for nota in notas if nota.id_nota is not None]
+            ocupados = {fila[0] for fila in self.conexion.execute(
+                "SELECT id_nota FROM notas WHERE id_nota IN (SELECT value FROM json_each(?))",
+                (json.dumps(con_id),))} if con_id else set()
+            agregadas = []
+            for nota in notas:
+                if nota.estudiante not in self.estudiantes or nota.asignatura not in self.asignaturas:
+                    continue
+                if nota.id_nota is not None:
+                    if nota.id_nota in ocupados:
+                        continue
+                    siguiente = max(siguiente, nota.id_nota + 1)
+                    ocupados.add(nota.id_nota)
+                agregadas.append(nota)
+            for nota in agregadas:
+                if nota.id_nota is None:
+                    nota.id_nota = siguiente
+                    siguiente += 1
+            self.conexion.executemany(SQL_INSERTAR_NOTA, (nota.to_fila() for nota in agregadas))
+        if agregadas:
+            self._invalidar('notas')
+            self._notificar_notas(eventos.NOTAS_AGREGADAS, agregadas)
+        return len(agregadas)
+
+    def editar_nota(self, id_nota, nueva_nota):
+        if nueva_nota.estudiante not in self.estudiantes or nueva_nota.asignatura not in self.asignaturas:
+            return False
+        with self.transaccion():
+            anterior = self.obtener_nota(id_nota)
+            cursor = self.conexion.execute(SQL_EDITAR_NOTA, nueva_nota.to_fila()[:-1] + (id_nota,))
+        if cursor.rowcount != 1:
+            return False
+        # Solo una edición que se aplicó cambia la nota recibida y los datos memorizados
+        nueva_nota.id_nota = id_nota
+        self._invalidar('notas')
+        self._notificar_notas(eventos.NOTAS_EDITADAS, [anterior, nueva_nota])
+        return True
+
+    def eliminar_nota(self, id_nota):
+        with self.transaccion():
+            nota = self.obtener_nota(id_nota)
+            cursor = self.conexion.execute("DELETE FROM notas WHERE id_nota = ?", (id_nota,))
+        if cursor.rowcount != 1:
+            return False
+        self._invalidar('notas')
+        self._notificar_notas(eventos.NOTAS_ELIMINADAS, [nota])
+        return True
+
+    def eliminar_notas(self, ids_notas):
+        parametro = json.dumps(list(ids_notas))
+        with self.transaccion():
+            notas = self.conexion.execute("SELECT id_nota, estudiante, asignatura FROM notas "
+                                          "WHERE id_nota IN (SELECT value FROM json_each(?))", (parametro,)).fetchall()
+            if notas:
+                self.conexion.execute("DELETE FROM notas WHERE id_nota IN (SELECT value FROM json_each(?))",
+                                      (parametro,))
+        if notas:
+            self._invalidar('notas')
+        self._notificar_cascada(notas)
+        return len(notas)
+
+    # Métodos para profesores
+    def agregar_profesor(self, profesor):
+        if profesor.id_profesor in self.profesores:
+            return False
+        with self.transaccion():
+            self.conexion.execute("INSERT INTO profesores VALUES (:id_profesor, :nombre, :email, :telefono, "
+                                  ":especialidad)", profesor.to_dict())
+            self.profesores[profesor.id_profesor] = profesor
+            self._invalidar('profesores')
+            self._actualizar_busqueda('profesores', profesor.id_profesor)
+        self._notificar(eventos.PROFESOR_AGREGADO, (profesor.id_profesor,))
+        return True
+
+    def editar_profesor(self, id_profesor, nuevo_profesor):
+        if id_profesor not in self.profesores:
+            return False
+        with self.transaccion():
+            datos = dict(nuevo_profesor.to_dict(), id_profesor=id_profesor)
+            self.conexion.execute("UPDATE profesores SET nombre = :nombre, email = :email, telefono = :telefono, "
+                                  "especialidad = :especialidad WHERE id_profesor = :id_profesor", datos)
+            self.profesores[id_profesor] = nuevo_profesor
+            self._invalidar('profesores')
+            self._actualizar_busqueda('profesores', id_profesor)
+        self._notificar(eventos.PROFESOR_EDITADO, (id_profesor,))
+        return True
+
+    def eliminar_profesor(self, id_profesor):
+        if id_profesor not in self.profesores:
+            return False
+
+        # Verificar si el profesor está asignado a alguna asignatura
+        for asignatura in self.asignaturas.values():
+            if asignatura.profesor == id_profesor:
+                return False  # No se puede eliminar si está asignado
+
+        with self.transaccion():
+            self.conexion.execute("DELETE FROM profesores WHERE id_profesor = ?", (id_profesor,))
+            del self.profesores[id_profesor]
+            self._invalidar('profesores')
+            self._actualizar_busqueda('profesores', id_profesor)
+        self._notificar(eventos.PROFESOR_ELIMINADO, (id_profesor,))
+        return True
+
+    # Métodos para periodos
+    def agregar_periodo(self, periodo):
+        if periodo.codigo in self.periodos or not self._periodo_valido(periodo):
+            return False
+        with self.transaccion():
+            self.conexion.execute("INSERT INTO periodos VALUES (:codigo, :nombre, :fecha_inicio, :fecha_fin)",
+                                  periodo.to_dict())
+            self.periodos[periodo.codigo] = periodo
+            self._reordenar_periodos()
+            self._invalidar('periodos')
+        self._notificar(eventos.PERIODO_AGREGADO, (periodo.codigo,))
+        return True
+
+    def editar_periodo(self, codigo, nuevo_periodo):
+        if codigo not in self.periodos or not self._periodo_valido(nuevo_periodo, excluir=codigo):
+            return False
+        with self.transaccion():
+            datos = dict(nuevo_periodo.to_dict(), codigo=codigo)
+            self.conexion.execute("UPDATE periodos SET nombre = :nombre, fecha_inicio = :fecha_inicio, "
+                                  "fecha_fin = :fecha_fin WHERE codigo = :codigo", datos)
+            self.periodos[codigo] = nuevo_periodo
+            self._reordenar_periodos()
+            self._invalidar('periodos')
+        self._notificar(eventos.PERIODO_EDITADO, (codigo,))
+        return True
+
+    def eliminar_periodo(self, codigo):
+        if codigo not in self.periodos:
+            return False
+        with self.transaccion():
+            self.conexion.execute("DELETE FROM periodos WHERE codigo = ?", (codigo,))
+            del self.periodos[codigo]
+            self._reordenar_periodos()
+            self._invalidar('periodos')
+        self._notificar(eventos.PERIODO_ELIMINADO, (codigo,))
+        return True
+
+    def obtener_notas_periodo(self, codigo_estudiante, codigo_periodo):
+        periodo = self.periodos.get(codigo_periodo)
+        if periodo is None:
+            return []
+        return [Nota.from_fila(fila) for fila in self._conexion_consultas().execute(
+            SQL_NOTAS_PERIODO, (codigo_estudiante, periodo.inicio_ordinal, periodo.fin_ordinal))]
+
+    def _agregados_periodos_estudiante(self, codigo_estudiante):
+        # Sin caché: cada periodo se resuelve con el índice (estudiante, fecha)
+        return {codigo: Acumulador.desde_valores(*self._conexion_consultas().execute(
+                    SQL_ACUMULADO_PERIODO, (codigo_estudiante, periodo.inicio_ordinal, periodo.fin_ordinal)).fetchone())
+                for codigo, periodo in self.periodos.items()}
+
+    # Consultas por fecha (resueltas con idx_notas_fecha)
+    def _limites_fecha(self, desde, hasta):
+        return (-2 ** 63 if desde is None else fecha_a_ordinal(desde),
+                2 ** 63 - 1 if hasta is None else fecha_a_ordinal(hasta))
+
+    def notas_entre(self, desde=None, hasta=None):
+        return [Nota.from_fila(fila) for fila in self._conexion_consultas().execute(SQL_NOTAS_ENTRE,
+                                                                       self._limites_fecha(desde, hasta))]
+
+    def contar_notas_entre(self, desde=None, hasta=None):
+        return self._valor("SELECT COUNT(*) FROM notas WHERE fecha >= ? AND fecha < ?",
+                           self._limites_fecha(desde, hasta))
+
+    def promedios_por_mes(self):
+        return [((int(mes[:4]), int(mes[5:])), promedio, conteo)
+                for mes, promedio, conteo in self._conexion_consultas().execute(SQL_PROMEDIOS_MES)]
+
+    def promedios_periodos(self):
+        resultado = []
+        for periodo in self.obtener_periodos():
+            promedio, conteo = self._conexion_consultas().execute(
+                "SELECT COALESCE(AVG(calificacion), 0), COUNT(*) FROM notas WHERE fecha >= ? AND fecha < ?",
+                (periodo.inicio_ordinal, periodo.fin_ordinal)).fetchone()
+            resultado.append((periodo, promedio, conteo))
+        return resultado
+
+    # Métodos de consulta
+    def obtener_nota(self, id_nota):
+        fila = self.fila_nota(id_nota)
+        return Nota.from_fila(fila) if fila else None
+
+    def fila_nota(self, id_nota):
+        return self._conexion_consultas().execute(SQL_NOTA, (id_nota,)).fetchone()
+
+    def obtener_notas_estudiante(self, codigo_estudiante):
+        return [Nota.from_fila(fila) for fila in self._conexion_consultas().execute(SQL_NOTAS_ESTUDIANTE, (codigo_estudiante,))]
+
+    def obtener_notas_asignatura(self, codigo_asignatura):
+        return [Nota.from_fila(fila) for fila in self._conexion_consultas().execute(SQL_NOTAS_ASIGNATURA, (codigo_asignatura,))]
+
+    def contar_notas_estudiante(self, codigo_estudiante):
+        return self._valor("SELECT conteo FROM resumen_estudiantes WHERE codigo = ?", (codigo_estudiante,)) or 0
+
+    def contar_notas_asignatura(self, codigo_asignatura):
+        return self._valor("SELECT conteo FROM resumen_asignaturas WHERE codigo = ?", (codigo_asignatura,)) or 0
+
+    def obtener_notas_mas_bajas(self, n=5):
+        return [Nota.from_fila(fila) for fila in self._conexion_consultas().execute(SQL_NOTAS_MAS_BAJAS, (n,))]
+
+    def iterar_notas(self):
+        for fila in self._conexion_consultas().execute(SQL_NOTAS):
+            yield Nota.from_fila(fila)
+
+    def ids_notas(self):
+        return array('q', (fila[0] for fila in self._conexion_consultas().execute("SELECT id_nota FROM notas ORDER BY id_nota")))
+
+    def valores_notas(self, campo):
+        return dict(self._conexion_consultas().execute(f"SELECT id_nota, {_EXPRESIONES_CAMPO[campo]} FROM notas"))
+
+    def valores_distintos_notas(self, campo):
+        def calcular():
+            expresion = _EXPRESIONES_CAMPO[campo]
+            return [fila[0] for fila in self._conexion_consultas().execute(
+                f"SELECT DISTINCT {expresion} FROM notas ORDER BY 1")]
+        return list(self._memorizar(('distintos', campo), ('notas',), calcular))
+
+    def filtrar_notas(self, estudiantes=None, asignaturas=None, minimo=None, maximo=None, alguna=None):
+        # Cada conjunto de valores viaja como un solo parámetro JSON, sin límite de variables de SQLite
+        condiciones, parametros = [], []
+        for campo, valores in (('estudiante', estudiantes), ('asignatura', asignaturas)):
+            if valores is not None:
+                condiciones.append(f"{campo} IN (SELECT value FROM json_each(?))")
+                parametros.append(json.dumps(list(valores)))
+        if minimo is not None:
+            condiciones.append("calificacion >= ?")
+            parametros.append(minimo)
+        if maximo is not None:
+            condiciones.append("calificacion < ?")
+            parametros.append(maximo)
+        if alguna is not None:
+            alternativas = [campo for campo, valores in alguna.items() if valores]
+            if not alternativas:
+                return array('q')
+            condiciones.append("(" + " OR ".join(f"{_EXPRESIONES_CAMPO[campo]} IN (SELECT value FROM json_each(?))"
+                                                 for campo in alternativas) + ")")
+            parametros.extend(json.dumps(list(alguna[campo])) for campo in alternativas)
+        donde = " WHERE " + " AND ".join(condiciones) if condiciones else ""
+        return array('q', (fila[0] for fila in self._conexion_consultas().execute(
+            f"SELECT id_nota FROM notas{donde} ORDER BY id_nota", parametros)))
+
+    def total_notas(self):
+        # Suma de los acumulados por asignatura: evita un COUNT(*) sobre toda la tabla
+        return self._valor("SELECT COALESCE(SUM(conteo), 0) FROM resumen_asignaturas")
+
+    def calificaciones(self):
+        return array('d', (fila[0] for fila in self._conexion_consultas().execute("SELECT calificacion FROM notas")))
+
+    def resumen_general(self):
+        def calcular():
+            calificaciones, pesos = array('d'), array('d')
+            for calificacion, peso in self._conexion_consultas().execute("SELECT calificacion, peso FROM notas"):
+                calificaciones.append(calificacion)
+                pesos.append(peso)
+            return resumir_calificaciones(calificaciones, pesos)
+        return self._memorizar('resumen_general', ('notas',), calcular)
+
+    def histograma_calificaciones(self, intervalos=10):
+        inferior, superior = self._conexion_consultas().execute(
+            "SELECT MIN(calificacion), MAX(calificacion) FROM notas").fetchone()
+        if inferior is None:
+            inferior, superior = 0.0, 1.0
+        elif inferior == superior:
+            inferior, superior = inferior - 0.5, superior + 0.5
+        ancho = (superior - inferior) / intervalos
+        bordes = [inferior + i * ancho for i in range(intervalos)] + [superior]
+        conteos = [0] * intervalos
+        for intervalo, cantidad in self._conexion_consultas().execute(
+                "SELECT MIN(CAST((calificacion - ?) / ? AS INTEGER), ?) AS intervalo, COUNT(*) "
+                "FROM notas GROUP BY intervalo", (inferior, ancho, intervalos - 1)):
+            conteos[intervalo] = cantidad
+        return conteos, bordes
+
+    def contar_calificaciones(self, minimo=None, maximo=None):
+        return self._valor("SELECT COUNT(*) FROM notas WHERE (?1 IS NULL OR calificacion >= ?1) "
+                           "AND (?2 IS NULL OR calificacion < ?2)", (minimo, maximo))
+
+    def calificacion_maxima(self):
+        return self._valor("SELECT COALESCE(MAX(calificacion), 0) FROM notas")
+
+    def calificacion_minima(self):
+        return self._valor("SELECT COALESCE(MIN(calificacion), 0) FROM notas")
+
+    # Métodos de cálculo (lecturas de las tablas de resumen mantenidas por triggers)
+    def calcular_promedio_estudiante(self, codigo_estudiante):
+        return self._valor("SELECT promedio FROM resumen_estudiantes WHERE codigo = ?", (codigo_estudiante,)) or 0
+
+    def calcular_promedio_ponderado_estudiante(self, codigo_estudiante):
+        return self._valor("SELECT CASE WHEN suma_pesos > 0 THEN suma_ponderada / suma_pesos ELSE 0 END "
+                           "FROM resumen_estudiantes WHERE codigo = ?", (codigo_estudiante,)) or 0
+
+    def calcular_promedio_asignatura(self, codigo_asignatura):
+        return self._valor("SELECT promedio FROM resumen_asignaturas WHERE codigo = ?", (codigo_asignatura,)) or 0
+
+    def calcular_promedio_general(self):
+        return self._valor("SELECT CASE WHEN SUM(conteo) > 0 THEN SUM(suma) / SUM(conteo) ELSE 0 END "
+                           "FROM resumen_asignaturas") or 0
+
+    def estudiantes_en_riesgo(self, umbral=3.0):
+        return self._conexion_consultas().execute(SQL_EN_RIESGO, (umbral,)).fetchall()
+
+    def ranking_estudiantes(self):
+        return self.ranking_pagina(0, -1)
+
+    def ranking_pagina(self, inicio, cantidad):
+        return self._conexion_consultas().execute(SQL_RANKING, (cantidad, inicio)).fetchall()
+
+    def peores_estudiantes(self, k):
+        return self._conexion_consultas().execute(SQL_PEORES, (k,)).fetchall()
+
+    def posicion_estudiante(self, codigo):
+        promedio = self._valor("SELECT promedio FROM resumen_estudiantes WHERE codigo = ?", (codigo,))
+        if promedio is None:
+            return None
+        return self._valor(SQL_POSICION, (promedio, promedio, codigo)) + 1
+
+    def _asignatura_extrema(self, orden):
+        fila = self._conexion_consultas().execute(
+            f"SELECT codigo, promedio FROM resumen_asignaturas ORDER BY promedio {orden}, codigo LIMIT 1").fetchone()
+        if fila is None:
+            return ("N/A", 0)
+        codigo, promedio = fila
+        nombre = self.asignaturas[codigo].nombre if codigo in self.asignaturas else "N/A"
+        return (nombre, promedio)
+
+    def obtener_mejor_asignatura(self):
+        return self._asignatura_extrema("DESC")
+
+    def obtener_peor_asignatura(self):
+        return self._asignatura_extrema("ASC")
+
+    # Transacciones (transaccion() se hereda)
+    def iniciar_transaccion(self):
+        if self._nivel_transaccion == 0:
+            self.conexion.execute("BEGIN")
+        self._nivel_transaccion += 1
+
+    def confirmar_transaccion(self):
+        if self._nivel_transaccion == 0:
+            return False
+        if self._transaccion_fallida:
+            self.revertir_transaccion()
+            raise TransaccionRevertida("Se revirtió una transacción anidada; se deshace la transacción completa")
+        self._nivel_transaccion -= 1
+        if self._nivel_transaccion == 0:
+            self.conexion.execute("COMMIT")
+        return True
+
+    def revertir_transaccion(self):
+        if self._nivel_transaccion == 0:
+            return False
+        if self._nivel_transaccion > 1:
+            # Solo la más externa hace el ROLLBACK, como en SistemaNotas
+            self._nivel_transaccion -= 1
+            self._transaccion_fallida = True
+            return True
+        self._nivel_transaccion = 0
+        self._transaccion_fallida = False
+        self.conexion.execute("ROLLBACK")
+        # Los catálogos en memoria pudieron cambiar dentro de la transacción
+        self.cargar_datos()
+        return True
+
+    def iniciar_precarga(self):
+        """Sin efecto: las notas ya se leen de la base solo cuando se consultan"""
+
+    # Persistencia
+    def iniciar_escritor(self, espera=None, latencia_maxima=None, al_cambiar_estado=None):
+        """Sin efecto: SQLite confirma cada mutación en el WAL, que ya agrupa las escrituras"""
+        return None
+
+    def guardar_datos(self):
+        """Cada mutación ya está confirmada en la base; solo se vuelca el WAL al archivo principal"""
+        try:
+            self.conexion.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            return True
+        except sqlite3.Error as e:
+            print(f"Error al guardar datos: {e}")
+            return False
+
+    def cargar_datos(self):
+        """Carga solo los catálogos; las notas se consultan bajo demanda"""
+        self._invalidar(*ENTIDADES)  # también tras un ROLLBACK, que puede deshacer cambios en las notas
+        self._reiniciar_busqueda()
+        try:
+            self.estudiantes = {fila[0]: Estudiante(*fila) for fila in self.conexion.execute(
+                "SELECT codigo, nombre, programa, email, telefono FROM estudiantes")}
+            self.asignaturas = {fila[0]: Asignatura(*fila) for fila in self.conexion.execute(
+                "SELECT codigo, nombre, creditos, profesor FROM asignaturas")}
+            self.profesores = {fila[0]: Profesor(*fila) for fila in self.conexion.execute(
+                "SELECT id_profesor, nombre, email, telefono, especialidad FROM profesores")}
+            self.periodos = {}
+            for fila in self.conexion.execute("SELECT codigo, nombre, fecha_inicio, fecha_fin FROM periodos"):
+                periodo = Periodo.from_dict(dict(zip(('codigo', 'nombre', 'fecha_inicio', 'fecha_fin'), fila)))
+                self.periodos[periodo.codigo] = periodo
+            self._reordenar_periodos()
+            self._notificar(eventos.DATOS_RECARGADOS)
+            return True
+        except sqlite3.Error as e:
+            print(f"Error al cargar datos: {e}")
+            self.estudiantes = {}
+            self.asignaturas = {}
+            self.profesores = {}
+            self.periodos = {}
+            self._reordenar_periodos()
+            self._notificar(eventos.DATOS_RECARGADOS)
+            return False
+
+    def migrar_desde(self, sistema):
+        """Copia en una sola transacción los datos de otro SistemaNotas (por ejemplo, el archivo .dat)"""
+        with self.transaccion():
+            for estudiante in sistema.obtener_estudiantes():
+                self.agregar_estudiante(estudiante)
+            for asignatura in sistema.obtener_asignaturas():
+                self.agregar_asignatura(asignatura)
+            for profesor in sistema.obtener_profesores():
+                self.agregar_profesor(profesor)
+            for periodo in sistema.obtener_periodos():
+                self.agregar_periodo(periodo)
+            return self.agregar_notas(Nota.from_fila(nota.to_fila()) for nota in sistema.iterar_notas())
+
+    def cerrar(self):
+        self.conexion.close()
+
+
+def crear_sistema():
+    """SistemaNotas en memoria o, si la variable SISTEMA_NOTAS_BD indica un archivo, sobre SQLite"""
+    archivo_bd = os.environ.get('SISTEMA_NOTAS_BD')
+    return SistemaNotasSQLite(archivo_bd) if archivo_bd else SistemaNotas()
@@ -0,0 +1,205 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGIA = b'SNOTAS\x00\x04'
+_CABECERA = struct.Struct('<8sQQ')  # magia, bytes de metadatos, cantidad de notas
+
+# Columnas de ancho fijo, en el orden en que se escriben; todas tienen una entrada por nota
+COLUMNAS = (
+    ('ids', 'q'),
+    ('calificaciones', 'd'),
+    ('pesos', 'd'),
+    ('fechas', 'q'),  # ordinal en segundos (ver Nota.fecha_ordinal)
+    ('estudiantes', 'i'),  # índice en la tabla de códigos de estudiante
+    ('asignaturas', 'i'),  # índice en la tabla de códigos de asignatura
+    ('descripciones', 'i'),  # índice en la tabla de descripciones
+    ('orden_asignatura', 'i'),  # números de fila agrupados por asignatura
+)
+
+def es_snapshot_binario(archivo):
+    with open(archivo, 'rb') as f:
+        return f.read(len(MAGIA)) == MAGIA
+
+
+def _alinear(posicion):
+    return (posicion + 7) & ~7
+
+
+def escribir_snapshot(archivo, metadatos, notas_por_estudiante, acumulados_estudiante, acumulados_asignatura,
+                      acumulado_general):
+    """Escribe el snapshot binario: metadatos en JSON seguidos de las columnas de las notas.
+
+    Las notas se agrupan por estudiante, de modo que las de un estudiante
+    ocupan un rango contiguo de filas; para cada asignatura se guarda la
+    lista de sus filas en 'orden_asignatura'. Los acumulados son las tuplas
+    de Acumulador.valores().
+    """
+    columnas = {nombre: array(tipo) for nombre, tipo in COLUMNAS}
+    codigos_estudiante, codigos_asignatura, descripciones = {}, {}, {}
+    rangos_estudiante = []
+    filas_por_asignatura = {}
+
+    for codigo, notas in notas_por_estudiante.items():
+        indice_estudiante = codigos_estudiante.setdefault(codigo, len(codigos_estudiante))
+        inicio = len(columnas['ids'])
+        for nota in notas:
+            indice_asignatura = codigos_asignatura.setdefault(nota.asignatura, len(codigos_asignatura))
+            filas_por_asignatura.setdefault(indice_asignatura, []).append(len(columnas['ids']))
+            columnas['ids'].append(nota.id_nota)
+            columnas['calificaciones'].append(nota.calificacion)
+            columnas['pesos'].append(nota.peso)
+            columnas['fechas'].append(nota.fecha_ordinal)
+            columnas['estudiantes'].append(indice_estudiante)
+            columnas['asignaturas'].append(indice_asignatura)
+            columnas['descripciones'].append(descripciones.setdefault(nota.descripcion, len(descripciones)))
+        rangos_estudiante.append((inicio, len(columnas['ids'])))
+
+    rangos_asignatura = []
+    for indice in range(len(codigos_asignatura)):
+        inicio = len(columnas['orden_asignatura'])
+        columnas['orden_asignatura'].extend(filas_por_asignatura[indice])
+        rangos_asignatura.append((inicio, len(columnas['orden_asignatura'])))
+
+    metadatos = dict(metadatos,
+                     orden_bytes=sys.byteorder,
+                     codigos_estudiante=list(codigos_estudiante),
+                     codigos_asignatura=list(codigos_asignatura),
+                     descripciones=list(descripciones),
+                     rangos_estudiante=rangos_estudiante,
+                     rangos_asignatura=rangos_asignatura,
+                     agregados_estudiante=acumulados_estudiante,
+                     agregados_asignatura=acumulados_asignatura,
+                     agregado_general=acumulado_general)
+    texto = json.dumps(metadatos, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    # Escribir en un temporal, llevarlo al disco y solo entonces reemplazar: un corte de
+    # luz deja el snapshot anterior o el nuevo completo, nunca uno a medias
+    archivo_temporal = archivo + ".tmp"
+    with open(archivo_temporal, 'wb') as f:
+        f.write(_CABECERA.pack(MAGIA, len(texto), len(columnas['ids'])))
+        f.write(texto)
+        for nombre, _ in COLUMNAS:
+            f.write(b'\0' * (_alinear(f.tell()) - f.tell()))
+            columnas[nombre].tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(archivo_temporal, archivo)
+    _sincronizar_directorio(os.path.dirname(os.path.abspath(archivo)))
+
+
+def _sincronizar_directorio(directorio):
+    # El renombrado solo es definitivo cuando la entrada del directorio llega al disco
+    if not hasattr(os, 'O_DIRECTORY'):
+        return  # Windows no permite abrir directorios; NTFS registra el renombrado por su cuenta
+    descriptor = os.open(directorio, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class SnapshotBinario:
+    """Lectura perezosa de un snapshot binario mediante mmap.
+
+    Abrirlo solo decodifica los metadatos (catálogos, tablas de códigos y
+    acumulados); cada columna de notas es una vista sobre el archivo mapeado
+    que no se lee hasta que se accede a ella.
+    """
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self._archivo_abierto = open(archivo, 'rb')
+        try:
+            self._mapa = mmap.mmap(self._archivo_abierto.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # archivo vacío
+            self._archivo_abierto.close()
+            raise
+        magia, longitud, self.total_notas = _CABECERA.unpack_from(self._mapa, 0)
+        if magia != MAGIA:
+            raise ValueError("No es un snapshot binario")
+
+        inicio = _CABECERA.size
+        self.metadatos = json.loads(self._mapa[inicio:inicio + longitud].decode('utf-8'))
+        if self.metadatos['orden_bytes'] != sys.byteorder:
+            raise ValueError("El snapshot fue escrito en una arquitectura con otro orden de bytes")
+
+        self._vista = memoryview(self._mapa)
+        self._posiciones = {}
+        posicion = inicio + longitud
+        for nombre, tipo in COLUMNAS:
+            posicion = _alinear(posicion)
+            self._posiciones[nombre] = (posicion, tipo)
+            posicion += array(tipo).itemsize * self.total_notas
+        self._columnas = {}
+        self._indices = {}  # {tabla de códigos: {codigo: índice}}
+
+    def columna(self, nombre):
+        """Vista sin copia sobre la columna; se crea al primer acceso"""
+        vista = self._columnas.get(nombre)
+        if vista is None:
+            posicion, tipo = self._posiciones[nombre]
+            tamano = array(tipo).itemsize * self.total_notas
+            vista = self._columnas[nombre] = self._vista[posicion:posicion + tamano].cast(tipo)
+        return vista
+
+    def copiar_columna(self, nombre):
+        """Copia de la columna como array (una sola copia de memoria, sin objetos Python por fila)"""
+        posicion, tipo = self._posiciones[nombre]
+        copia = array(tipo)
+        copia.frombytes(self._vista[posicion:posicion + copia.itemsize * self.total_notas])
+        return copia
+
+    def fila(self, i):
+        """Valores de la nota en la fila i, en el orden de Nota.to_fila()"""
+        metadatos = self.metadatos
+        return (metadatos['codigos_estudiante'][self.columna('estudiantes')[i]],
+                metadatos['codigos_asignatura'][self.columna('asignaturas')[i]],
+                self.columna('calificaciones')[i],
+                self.columna('fechas')[i],
+                self.columna('pesos')[i],
+                metadatos['descripciones'][self.columna('descripciones')[i]],
+                self.columna('ids')[i])
+
+    def leer_filas(self, inicio, fin):
+        """Valores de las filas [inicio, fin) decodificados en bloque"""
+        metadatos = self.metadatos
+        codigos_estudiante = metadatos['codigos_estudiante']
+        codigos_asignatura = metadatos['codigos_asignatura']
+        descripciones = metadatos['descripciones']
+        columnas = [self.columna(nombre)[inicio:fin].tolist() for nombre in
+                    ('estudiantes', 'asignaturas', 'calificaciones', 'fechas', 'pesos', 'descripciones', 'ids')]
+        return [(codigos_estudiante[estudiante], codigos_asignatura[asignatura], calificacion, fecha, peso,
+                 descripciones[descripcion], id_nota)
+                for estudiante, asignatura, calificacion, fecha, peso, descripcion, id_nota in zip(*columnas)]
+
+    def _indice(self, tabla):
+        indice = self._indices.get(tabla)
+        if indice is None:
+            indice = self._indices[tabla] = {codigo: i for i, codigo in enumerate(self.metadatos[tabla])}
+        return indice
+
+    def rango_estudiante(self, codigo):
+        """Filas [inicio, fin) con las notas del estudiante (vacío si no tiene)"""
+        indice = self._indice('codigos_estudiante').get(codigo)
+        if indice is None:
+            return (0, 0)
+        inicio, fin = self.metadatos['rangos_estudiante'][indice]
+        return (inicio, fin)
+
+    def filas_asignatura(self, codigo):
+        """Números de fila de las notas de la asignatura"""
+        indice = self._indice('codigos_asignatura').get(codigo)
+        if indice is None:
+            return []
+        inicio, fin = self.metadatos['rangos_asignatura'][indice]
+        return self.columna('orden_asignatura')[inicio:fin].tolist()
+
+    def cerrar(self):
+        # Las vistas deben liberarse antes de cerrar el mmap
+        self._columnas = {}
+        self._vista.release()
+        self._mapa.close()
+        self._archivo_abierto.close()
@@ -0,0 +1,15 @@
+from PyQt5.QtWidgets import QApplication, QProgressDialog
+from PyQt5.QtCore import Qt
+
+def crear_dialogo_progreso(parent, texto, total):
+    """Diálogo de progreso modal y la función progreso(hechas, total) que lo actualiza"""
+    dialogo = QProgressDialog(texto, None, 0, max(total, 1), parent)
+    dialogo.setWindowModality(Qt.WindowModal)
+    dialogo.setMinimumDuration(400)  # Solo aparece si la operación tarda
+    
+    def progreso(hechas, total):
+        dialogo.setMaximum(max(total, 1))
+        dialogo.setValue(hechas)
+        QApplication.processEvents()
+    
+    return dialogo, progreso
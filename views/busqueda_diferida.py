@@ -0,0 +1,97 @@
+import threading
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+ESPERA_BUSQUEDA_MS = 250  # pausa de escritura tras la que se lanza la búsqueda
+
+class BusquedaCancelada(Exception):
+    """La consulta quedó obsoleta antes de terminar"""
+
+
+class BusquedaDiferida(QObject):
+    """Búsqueda mientras se escribe, compartida por los campos de búsqueda de las pestañas.
+
+    Cada solicitar() reinicia la espera; al cumplirse, la consulta corre en un
+    hilo propio y el resultado se aplica en el hilo de la interfaz. Una solicitud
+    nueva deja obsoletas las anteriores: la que aún no empezó se reemplaza, la
+    que está en curso puede abandonarse comprobando vigente() (o lanzando
+    BusquedaCancelada) y, si termina de todos modos, su resultado se descarta.
+    """
+    _resultado_listo = pyqtSignal(int, object)
+    _consulta_fallida = pyqtSignal(int)
+
+    def __init__(self, consultar, aplicar, espera=ESPERA_BUSQUEDA_MS, parent=None, capturar=None):
+        super().__init__(parent)
+        self._consultar = consultar  # función(*argumentos, vigente=..., **opciones) -> resultado, en el hilo de búsqueda
+        self._aplicar = aplicar  # función(resultado), en el hilo de la interfaz
+        # función() -> valor que consultar recibe como captura=...; corre en el hilo de la interfaz al lanzar
+        # la consulta, para copiar lo que la interfaz puede modificar mientras el hilo de búsqueda lo recorre
+        self._capturar = capturar
+        self._generacion = 0  # crece con cada solicitud; solo se aplica el resultado de la última
+        self._solicitud = ((), {})
+        self._reintentada = False  # una consulta fallida se repite una vez
+
+        self._condicion = threading.Condition()
+        self._pendiente = None  # (generacion, argumentos, opciones) aún no iniciada
+        self._hilo = None
+
+        self._temporizador = QTimer(self)
+        self._temporizador.setSingleShot(True)
+        self._temporizador.setInterval(espera)
+        self._temporizador.timeout.connect(self._lanzar)
+        self._resultado_listo.connect(self._recibir)
+        self._consulta_fallida.connect(self._reintentar)
+
+    def solicitar(self, *argumentos, **opciones):
+        """Programa una consulta con estos argumentos tras la pausa de escritura"""
+        self._generacion += 1
+        self._solicitud = (argumentos, opciones)
+        self._reintentada = False
+        self._temporizador.start()
+
+    def cancelar(self):
+        """Descarta la consulta programada y la que esté en curso"""
+        self._generacion += 1
+        self._temporizador.stop()
+        with self._condicion:
+            self._pendiente = None
+
+    def _lanzar(self):
+        argumentos, opciones = self._solicitud
+        if self._capturar is not None:
+            opciones = dict(opciones, captura=self._capturar())
+        with self._condicion:
+            self._pendiente = (self._generacion, argumentos, opciones)
+            self._condicion.notify()
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._ejecutar, name="busqueda", daemon=True)
+            self._hilo.start()
+
+    def _ejecutar(self):
+        while True:
+            with self._condicion:
+                while self._pendiente is None:
+                    self._condicion.wait()
+                generacion, argumentos, opciones = self._pendiente
+                self._pendiente = None
+
+            vigente = lambda: generacion == self._generacion
+            try:
+                resultado = self._consultar(*argumentos, vigente=vigente, **opciones)
+            except BusquedaCancelada:
+                continue
+            except Exception as e:
+                # Lo habitual es que los datos cambiaran durante la consulta: se repite una vez
+                print(f"Error en la búsqueda: {e}")
+                self._consulta_fallida.emit(generacion)
+                continue
+            if vigente():
+                self._resultado_listo.emit(generacion, resultado)
+
+    def _recibir(self, generacion, resultado):
+        if generacion == self._generacion:
+            self._aplicar(resultado)
+
+    def _reintentar(self, generacion):
+        if generacion == self._generacion and not self._reintentada:
+            self._reintentada = True
+            self._temporizador.start()
@@ -5,6 +5,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon, QColor, QBrush
 from PyQt5.QtCore import QSize
+from .refresco_diferido import RefrescoDiferido
 
 class DashboardWindow(QWidget):
     """Ventana de dashboard inicial"""
@@ -13,6 +14,18 @@ class DashboardWindow(QWidget):
         self.sistema = sistema
         self.setup_ui()
         self.update_stats()
+        
+        # Las estadísticas y los gráficos se recalculan una vez por ráfaga de cambios, y solo a la vista
+        self.refresco = RefrescoDiferido(self)
+        self.sistema.suscribir(self.on_data_changed)
+    
+    def on_data_changed(self, cambio):
+        """Aplicar un cambio del sistema (ver models/eventos.py)"""
+        if cambio.catalogo == 'profesores':
+            # Los profesores solo aparecen en su contador
+            self.update_stat_label(self.total_profesores_label, f"👨‍🏫 Profesores: {len(self.sistema.profesores)}")
+        elif cambio.catalogo != 'periodos':
+            self.refresco.pedir(self.update_stats)
     
     def setup_ui(self):
         # Crear scroll area principal
@@ -483,11 +496,12 @@ class DashboardWindow(QWidget):
         self.figure1.clear()
         ax1 = self.figure1.add_subplot(111)
         
-        notas = [n.calificacion for n in self.sistema.notas_heap]
-        if notas:
+        if self.sistema.total_notas():
             # Colores más atractivos
             colors = ['#ff6b6b', '#feca57', '#48dbfb', '#0abde3', '#00d2d3']
-            n, bins, patches = ax1.hist(notas, bins=10, edgecolor='white', linewidth=1.5)
+            # Los conteos se calculan sobre la columna de calificaciones; matplotlib solo dibuja
+            conteos, bordes = self.sistema.histograma_calificaciones(10)
+            n, bins, patches = ax1.hist(bordes[:-1], bordes, weights=conteos, edgecolor='white', linewidth=1.5)
             
             # Aplicar colores
             for i, patch in enumerate(patches):
@@ -510,18 +524,12 @@ class DashboardWindow(QWidget):
         self.figure2.clear()
         ax2 = self.figure2.add_subplot(111)
         
-        estudiantes = [e.codigo for e in self.sistema.obtener_estudiantes()]
-        aprobados = 0
-        riesgo = 0
-        
-        for codigo in estudiantes:
-            prom = self.sistema.calcular_promedio_estudiante(codigo)
-            if prom < 3.0:
-                riesgo += 1
-            else:
-                aprobados += 1
+        # La lista de estudiantes en riesgo sale de la caché de estadísticas del sistema
+        total_estudiantes = len(self.sistema.estudiantes)
+        riesgo = len(self.sistema.estudiantes_en_riesgo())
+        aprobados = total_estudiantes - riesgo
         
-        if estudiantes:
+        if total_estudiantes:
             labels = ['Aprobados', 'En Riesgo']
             sizes = [aprobados, riesgo]
             colors = ['#2ecc71', '#e74c3c']
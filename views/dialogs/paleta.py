@@ -0,0 +1,93 @@
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem, QLabel
+from PyQt5.QtCore import Qt
+from models.busqueda import normalizar
+from ..busqueda_diferida import BusquedaDiferida, BusquedaCancelada
+
+RESULTADOS_POR_CATALOGO = 20
+ESPERA_PALETA_MS = 100
+CATALOGOS_PALETA = (('estudiantes', "👤"), ('asignaturas', "📚"), ('profesores', "👨‍🏫"))
+
+class PaletaComandos(QDialog):
+    """Paleta "Ir a...": busca estudiantes, asignaturas, profesores y comandos por nombre o código"""
+    def __init__(self, sistema, comandos, parent=None):
+        super().__init__(parent)
+        self.sistema = sistema
+        self.comandos = comandos  # [(texto, función)]
+        self.seleccion = None  # ('comando', función) o (catálogo, clave) elegido
+        self.setWindowTitle("Ir a...")
+        self.setModal(True)
+        self.setMinimumWidth(520)
+        self.busqueda = BusquedaDiferida(self.buscar, self.mostrar, espera=ESPERA_PALETA_MS, parent=self)
+        self.setup_ui()
+        self.mostrar(self.buscar("", vigente=lambda: True))
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Buscar estudiante, asignatura, profesor o comando...")
+        self.search_input.textChanged.connect(self.busqueda.solicitar)
+        self.search_input.returnPressed.connect(self.elegir_actual)
+
+        self.results_list = QListWidget()
+        self.results_list.itemActivated.connect(self.elegir)
+
+        hint_label = QLabel("↑↓ para moverse, Enter para abrir, Esc para cerrar")
+        hint_label.setStyleSheet("color: #7f8c8d; font-style: italic;")
+
+        layout.addWidget(self.search_input)
+        layout.addWidget(self.results_list)
+        layout.addWidget(hint_label)
+        self.setLayout(layout)
+
+    def keyPressEvent(self, event):
+        # Las flechas mueven la selección sin sacar el foco del campo de búsqueda
+        if event.key() in (Qt.Key_Up, Qt.Key_Down) and self.results_list.count():
+            paso = -1 if event.key() == Qt.Key_Up else 1
+            fila = min(max(self.results_list.currentRow() + paso, 0), self.results_list.count() - 1)
+            self.results_list.setCurrentRow(fila)
+            return
+        super().keyPressEvent(event)
+
+    def buscar(self, texto, vigente):
+        """[(etiqueta, selección)] que coinciden con el texto; corre fuera del hilo de la interfaz"""
+        resultados = []
+        if texto.strip():
+            for catalogo, icono in CATALOGOS_PALETA:
+                if not vigente():
+                    raise BusquedaCancelada()
+                entidades = getattr(self.sistema, catalogo)
+                for clave in self.sistema.buscar(catalogo, texto, RESULTADOS_POR_CATALOGO):
+                    entidad = entidades.get(clave)
+                    if entidad is not None:
+                        resultados.append((f"{icono} {entidad.nombre} ({clave})", (catalogo, clave)))
+
+        texto = normalizar(texto.strip())
+        resultados.extend((etiqueta, ('comando', funcion)) for etiqueta, funcion in self.comandos
+                          if texto in normalizar(etiqueta))
+        return resultados
+
+    def mostrar(self, resultados):
+        self.results_list.clear()
+        for etiqueta, seleccion in resultados:
+            item = QListWidgetItem(etiqueta)
+            item.setData(Qt.UserRole, seleccion)
+            self.results_list.addItem(item)
+        if resultados:
+            self.results_list.setCurrentRow(0)
+        else:
+            item = QListWidgetItem("Sin resultados")
+            item.setFlags(Qt.NoItemFlags)
+            self.results_list.addItem(item)
+
+    def elegir_actual(self):
+        item = self.results_list.currentItem()
+        if item is not None:
+            self.elegir(item)
+
+    def elegir(self, item):
+        seleccion = item.data(Qt.UserRole)
+        if seleccion is None:
+            return
+        self.seleccion = seleccion
+        self.accept()
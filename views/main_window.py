@@ -2,8 +2,8 @@ from PyQt5.QtWidgets import (QMainWindow, QStackedWidget, QTabWidget, QToolBar,
                             QAction, QMessageBox, QMenuBar, QMenu, QStatusBar, QDialog,
                             QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame)
 from PyQt5.QtGui import QIcon, QPalette, QColor, QFont, QLinearGradient, QPainter
-from PyQt5.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve
-from models.sistema_notas import SistemaNotas
+from PyQt5.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve, pyqtSignal
+from models.sistema_sqlite import crear_sistema
 from .dashboard import DashboardWindow
 from .tabs.estudiantes import StudentsTab
 from .tabs.asignaturas import SubjectsTab
@@ -12,9 +12,12 @@ from .tabs.estadisticas import StatsTab
 from .tabs.profesores import ProfesoresTab
 
 class MainWindow(QMainWindow):
+    # Lo emite el hilo escritor; Qt lo entrega en el hilo de la interfaz
+    estado_guardado_cambiado = pyqtSignal(bool)
+    
     def __init__(self):
         super().__init__()
-        self.sistema = SistemaNotas()
+        self.sistema = crear_sistema()
         self.setWindowTitle("🎓 Sistema de Gestión Académica - Versión Profesional")
         self.setGeometry(100, 100, 1400, 900)  # Ventana más grande
         self.setMinimumSize(1200, 800)
@@ -25,8 +28,18 @@ class MainWindow(QMainWindow):
         self.create_modern_toolbar()
         self.setup_status_bar()
         
+        # Las pestañas y el dashboard se suscriben por su cuenta; aquí solo la barra de estado
+        self.sistema.suscribir(self.on_data_changed)
+        
         # Mensaje de bienvenida mejorado
         self.statusBar().showMessage("✅ Sistema listo - Bienvenido al Sistema de Gestión Académica")
+        
+        # Con la ventana ya construida, terminar de cargar las notas en segundo plano
+        self.sistema.iniciar_precarga()
+        
+        # Las mutaciones se guardan en un hilo aparte, agrupadas por ráfagas
+        self.estado_guardado_cambiado.connect(self.update_save_indicator)
+        self.sistema.iniciar_escritor(al_cambiar_estado=self.estado_guardado_cambiado.emit)
     
     def setup_ui(self):
         # Configurar ventana principal con stacked widget
@@ -361,6 +374,14 @@ class MainWindow(QMainWindow):
         view_stats_action.triggered.connect(lambda: self.show_main_tab(4))
         nav_menu.addAction(view_stats_action)
         
+        nav_menu.addSeparator()
+        
+        self.go_to_action = QAction("🔎 Ir a...", self)
+        self.go_to_action.setShortcut("Ctrl+K")
+        self.go_to_action.setStatusTip("Buscar un estudiante, asignatura, profesor o comando")
+        self.go_to_action.triggered.connect(self.show_command_palette)
+        nav_menu.addAction(self.go_to_action)
+        
         # Menú Ayuda
         help_menu = menu_bar.addMenu("❓ Ayuda")
         
@@ -432,13 +453,28 @@ class MainWindow(QMainWindow):
         self.system_info_label = QLabel()
         self.update_system_info()
         status_bar.addPermanentWidget(self.system_info_label)
+        
+        # Indicador de cambios aún no escritos en disco
+        self.save_indicator_label = QLabel("💾 Guardando...")
+        self.save_indicator_label.setToolTip("Hay cambios pendientes de escribir en disco")
+        self.save_indicator_label.setVisible(False)
+        status_bar.addPermanentWidget(self.save_indicator_label)
+    
+    def update_save_indicator(self, pendiente):
+        """Muestra u oculta el indicador de guardado pendiente"""
+        self.save_indicator_label.setVisible(pendiente)
+    
+    def on_data_changed(self, cambio):
+        """Tras cualquier cambio del sistema solo hay que poner al día los contadores de la barra de estado"""
+        if cambio.catalogo != 'periodos':
+            self.update_system_info()
     
     def update_system_info(self):
         """Actualiza la información del sistema en la barra de estado"""
         total_estudiantes = len(self.sistema.estudiantes)
         total_asignaturas = len(self.sistema.asignaturas)
         total_profesores = len(self.sistema.profesores)
-        total_notas = len(self.sistema.notas_heap)
+        total_notas = self.sistema.total_notas()
         
         info_text = f"👥 {total_estudiantes} estudiantes | 📚 {total_asignaturas} asignaturas | 👨‍🏫 {total_profesores} profesores | 📝 {total_notas} calificaciones"
         self.system_info_label.setText(info_text)
@@ -476,6 +512,7 @@ class MainWindow(QMainWindow):
                                <tr><td><b>Ctrl+E</b></td><td>Exportar Datos</td></tr>
                                <tr><td><b>Ctrl+I</b></td><td>Importar Datos</td></tr>
                                <tr><td><b>F1-F5</b></td><td>Navegar entre secciones</td></tr>
+                               <tr><td><b>Ctrl+K</b></td><td>Ir a un estudiante, asignatura, profesor o comando</td></tr>
                                <tr><td><b>Ctrl+Q</b></td><td>Salir</td></tr>
                                </table>
                                """)
@@ -504,10 +541,6 @@ class MainWindow(QMainWindow):
             if self.sistema.agregar_estudiante(nuevo_estudiante):
                 QMessageBox.information(self, "✅ Éxito", 
                                       f"Estudiante '{data['nombre']}' agregado correctamente.")
-                self.students_tab.update_table()
-                self.stats_tab.update_student_combo()
-                self.dashboard.update_stats()
-                self.update_system_info()
                 self.show_main_tab(0)
                 self.statusBar().showMessage(f"✅ Estudiante {data['nombre']} registrado", 3000)
             else:
@@ -537,10 +570,6 @@ class MainWindow(QMainWindow):
             if self.sistema.editar_estudiante(data['codigo'], nuevo_estudiante):
                 QMessageBox.information(self, "✅ Éxito", 
                                       f"Estudiante '{data['nombre']}' actualizado correctamente.")
-                self.students_tab.update_table()
-                self.stats_tab.update_student_combo()
-                self.dashboard.update_stats()
-                self.update_system_info()
                 self.statusBar().showMessage(f"✅ Estudiante {data['nombre']} actualizado", 3000)
             else:
                 QMessageBox.warning(self, "❌ Error", "No se pudo actualizar el estudiante.")
@@ -567,10 +596,6 @@ class MainWindow(QMainWindow):
             if self.sistema.agregar_asignatura(nueva_asignatura):
                 QMessageBox.information(self, "✅ Éxito", 
                                       f"Asignatura '{data['nombre']}' agregada correctamente.")
-                self.subjects_tab.update_table()
-                self.stats_tab.update_subject_combo()
-                self.dashboard.update_stats()
-                self.update_system_info()
                 self.show_main_tab(1)
                 self.statusBar().showMessage(f"✅ Asignatura {data['nombre']} registrada", 3000)
             else:
@@ -599,10 +624,6 @@ class MainWindow(QMainWindow):
             if self.sistema.editar_asignatura(data['codigo'], nueva_asignatura):
                 QMessageBox.information(self, "✅ Éxito", 
                                       f"Asignatura '{data['nombre']}' actualizada correctamente.")
-                self.subjects_tab.update_table()
-                self.stats_tab.update_subject_combo()
-                self.dashboard.update_stats()
-                self.update_system_info()
                 self.statusBar().showMessage(f"✅ Asignatura {data['nombre']} actualizada", 3000)
             else:
                 QMessageBox.warning(self, "❌ Error", "No se pudo actualizar la asignatura.")
@@ -631,8 +652,6 @@ class MainWindow(QMainWindow):
             if self.sistema.agregar_profesor(nuevo_profesor):
                 QMessageBox.information(self, "✅ Éxito", 
                                       f"Profesor '{data['nombre']}' agregado correctamente.")
-                self.profesores_tab.update_table()
-                self.update_system_info()
                 self.show_main_tab(2)
                 self.statusBar().showMessage(f"✅ Profesor {data['nombre']} registrado", 3000)
             else:
@@ -674,9 +693,6 @@ class MainWindow(QMainWindow):
             if self.sistema.agregar_nota(nueva_nota):
                 QMessageBox.information(self, "✅ Éxito", 
                                       f"Calificación {data['calificacion']} registrada correctamente.")
-                self.notes_tab.update_table()
-                self.dashboard.update_stats()
-                self.update_system_info()
                 self.show_main_tab(3)
                 self.statusBar().showMessage(f"✅ Calificación {data['calificacion']} registrada", 3000)
             else:
@@ -705,13 +721,9 @@ class MainWindow(QMainWindow):
                 data['descripcion']
             )
             
-            indice = self.notes_tab.table.currentRow()
-            if self.sistema.editar_nota(indice, nueva_nota):
+            if self.sistema.editar_nota(nota.id_nota, nueva_nota):
                 QMessageBox.information(self, "✅ Éxito", 
                                       f"Calificación actualizada a {data['calificacion']}.")
-                self.notes_tab.update_table()
-                self.dashboard.update_stats()
-                self.update_system_info()
                 self.statusBar().showMessage(f"✅ Calificación actualizada", 3000)
             else:
                 QMessageBox.warning(self, "❌ Error", "No se pudo actualizar la calificación.")
@@ -720,7 +732,6 @@ class MainWindow(QMainWindow):
     def show_dashboard(self):
         """Muestra el dashboard principal"""
         self.central_widget.setCurrentIndex(0)
-        self.dashboard.update_stats()
         self.statusBar().showMessage("📊 Mostrando Dashboard Principal", 2000)
     
     def show_main_tabs(self):
@@ -737,21 +748,44 @@ class MainWindow(QMainWindow):
         tab_names = ["Estudiantes", "Asignaturas", "Profesores", "Calificaciones", "Estadísticas"]
         if 0 <= index < len(tab_names):
             self.statusBar().showMessage(f"📋 Mostrando sección: {tab_names[index]}", 2000)
+    
+    def show_command_palette(self):
+        """Muestra la paleta "Ir a..." y abre lo elegido"""
+        from .dialogs.paleta import PaletaComandos
+        
+        # Los comandos son las acciones de los menús (salvo la propia paleta)
+        comandos = [(accion.text(), accion.trigger)
+                    for menu_action in self.menuBar().actions() if menu_action.menu()
+                    for accion in menu_action.menu().actions()
+                    if not accion.isSeparator() and accion is not self.go_to_action]
+        
+        paleta = PaletaComandos(self.sistema, comandos, self)
+        if paleta.exec_() != QDialog.Accepted or paleta.seleccion is None:
+            return
         
-        # Actualizar la pestaña seleccionada
-        if index == 0:
-            self.students_tab.update_table()
-        elif index == 1:
-            self.subjects_tab.update_table()
-        elif index == 2:
-            self.profesores_tab.update_table()
-        elif index == 3:
-            self.notes_tab.update_table()
-        elif index == 4:
-            self.stats_tab.update_student_combo()
-            self.stats_tab.update_subject_combo()
-            self.stats_tab.update_ranking()
-            self.stats_tab.update_risk_students()
+        tipo, clave = paleta.seleccion
+        if tipo == 'comando':
+            clave()
+        else:
+            self.go_to_entity(tipo, clave)
+    
+    def go_to_entity(self, catalogo, clave):
+        """Abre la pestaña del catálogo y selecciona la fila de la entidad"""
+        index, tab = {'estudiantes': (0, self.students_tab),
+                      'asignaturas': (1, self.subjects_tab),
+                      'profesores': (2, self.profesores_tab)}[catalogo]
+        self.show_main_tab(index)
+        
+        row = tab.model.fila(clave)
+        if row < 0:
+            # La fila está oculta por los filtros: se quitan
+            tab.clear_filters()
+            tab.busqueda.cancelar()
+            tab.model.filtrar()
+            row = tab.model.fila(clave)
+        if row >= 0:
+            tab.table.selectRow(row)
+            tab.table.scrollTo(tab.model.index(row, 0))
     
     # Métodos de importación/exportación mejorados
     def export_data(self):
@@ -795,25 +829,10 @@ class MainWindow(QMainWindow):
             success, message = self.sistema.importar_csv(file_name)
             if success:
                 QMessageBox.information(self, "✅ Importación Exitosa", message)
-                self.update_all_tables()
-                self.dashboard.update_stats()
-                self.update_system_info()
                 self.statusBar().showMessage("✅ " + message, 5000)
             else:
                 QMessageBox.warning(self, "❌ Error de Importación", message)
     
-    def update_all_tables(self):
-        """Actualiza todas las tablas del sistema"""
-        self.students_tab.update_table()
-        self.subjects_tab.update_table()
-        self.profesores_tab.update_table()
-        self.notes_tab.update_table()
-        self.stats_tab.update_student_combo()
-        self.stats_tab.update_subject_combo()
-        self.stats_tab.update_ranking()
-        self.stats_tab.update_risk_students()
-        self.update_system_info()
-    
     def closeEvent(self, event):
         """Evento al cerrar la ventana con confirmación"""
         reply = QMessageBox.question(self, "🚪 Confirmar Salida", 
@@ -823,6 +842,11 @@ class MainWindow(QMainWindow):
         
         if reply == QMessageBox.Yes:
             self.sistema.guardar_datos()
+            # Esperar a que el escritor lleve al disco todo lo pendiente
+            if not self.sistema.detener_escritor(timeout=30):
+                QMessageBox.warning(self, "⚠️ Guardado incompleto",
+                                    "No se pudieron escribir todos los cambios en disco.\n\n"
+                                    "Los cambios no guardados se perderán.")
             self.statusBar().showMessage("💾 Datos guardados correctamente", 1000)
             event.accept()
         else:
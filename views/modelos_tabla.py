@@ -0,0 +1,675 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QColor, QBrush, QFont
+from models.busqueda import normalizar
+from models.nota import ordinal_a_fecha
+from models import eventos
+from .busqueda_diferida import BusquedaCancelada
+
+# Colores compartidos por las tablas
+VERDE = QColor(46, 204, 113)
+AZUL = QColor(52, 152, 219)
+AMARILLO = QColor(241, 196, 15)
+AMARILLO_OSCURO = QColor(255, 193, 7)
+ROJO = QColor(231, 76, 60)
+GRIS = QColor(108, 117, 125)
+
+MAXIMO_FILAS_PARCHE = 200  # con más filas afectadas por un cambio sale más a cuenta recargar la tabla
+
+class ModeloTablaSistema(QAbstractTableModel):
+    """Modelo de solo lectura sobre SistemaNotas.
+
+    Solo guarda la clave de cada fila (código o id de nota); el texto y el
+    estilo de una fila se calculan cuando la vista la pinta, de modo que abrir
+    la tabla no crea un objeto por celda y solo se formatean las filas visibles.
+
+    Los filtros (ver filtrar) no recorren las filas de la vista: cada subclase
+    los resuelve con índices, y el texto se busca en el índice de búsqueda del
+    sistema (SistemaNotas.buscar).
+
+    Tras una mutación, aplicar_cambio recibe el Cambio que avisa el sistema y
+    solo quita, inserta, mueve o repinta las filas afectadas: cada fila se
+    ubica con una búsqueda binaria sobre el orden mostrado, sin recorrer la tabla.
+    """
+    COLUMNAS = ()  # encabezados
+    CATALOGO = None  # catálogo de SistemaNotas.buscar en el que busca el filtro de texto
+    FILAS_EN_CACHE = 512  # filas formateadas que se conservan entre repintados
+
+    def __init__(self, sistema, parent=None):
+        super().__init__(parent)
+        self.sistema = sistema
+        self._todas = {}  # {clave: posición en el orden natural} de todas las filas, en ese orden
+        self._siguiente_posicion = 0
+        self._claves = []  # claves de las filas visibles, en el orden mostrado
+        self._valores = None  # {clave: valor en la columna ordenada} de las visibles; None sin orden
+        self._texto = ""  # texto buscado, ya normalizado
+        self._criterios = {}  # criterios del filtro activo (ver filtrar)
+        self._cache = {}  # {clave: (textos, estilos)}
+        self._columna_orden = -1  # -1: en el orden en que las entrega el sistema
+        self._orden = Qt.AscendingOrder
+        self._negrita = QFont("Arial", 10, QFont.Bold)
+        self._negrita_pequena = QFont("Arial", 9, QFont.Bold)
+        self._normal_pequena = QFont("Arial", 9, QFont.Normal)
+
+    # Lo que define cada tabla
+    def obtener_claves(self):
+        """Claves de todas las filas, en el orden natural de la tabla"""
+        raise NotImplementedError
+
+    def formatear(self, clave):
+        """(textos, {columna: (QColor, QFont)}) de la fila; None si la clave ya no existe"""
+        raise NotImplementedError
+
+    def valores_orden(self, columna):
+        """Función clave -> valor por el que se ordena la columna (por defecto, su texto)"""
+        return lambda clave: self.texto_clave(clave, columna)
+
+    def valor_orden(self, clave, columna):
+        """Valor de una sola fila según valores_orden, para ubicarla sin reordenar la tabla"""
+        return self.valores_orden(columna)(clave)
+
+    def existe(self, clave):
+        """Si la clave sigue existiendo en el sistema"""
+        return clave in getattr(self.sistema, self.CATALOGO)
+
+    def claves_afectadas(self, cambio):
+        """Claves de las filas que cambian con un Cambio del sistema; None si hay que recargar la tabla"""
+        if cambio.catalogo == self.CATALOGO:
+            return cambio.claves
+        return None if cambio.tipo == eventos.DATOS_RECARGADOS else ()
+
+    def preparar_filtros(self):
+        """Precalcula lo que usan los criterios de la subclase tras cada recarga"""
+
+    def aplicar_criterio(self, claves, nombre, valor):
+        """Claves que cumplen un criterio de la subclase (ver filtrar)"""
+        raise NotImplementedError
+
+    def claves_filtradas(self, texto, criterios, claves):
+        """Claves, en el orden natural, que coinciden con `texto` en el índice de búsqueda y cumplen los criterios
+        (claves son todas las filas, en ese orden)"""
+        if texto:
+            encontradas = set(self.sistema.buscar(self.CATALOGO, texto))
+            claves = [clave for clave in claves if clave in encontradas]
+        for nombre, valor in criterios.items():
+            claves = self.aplicar_criterio(claves, nombre, valor)
+        return list(claves)
+
+    def cumple_filtro(self, clave):
+        """Si una fila existente pasa el filtro activo, comprobándolo solo sobre ella"""
+        if self._texto and not self.sistema.coincide(self.CATALOGO, clave, self._texto):
+            return False
+        claves = [clave]
+        for nombre, valor in self._criterios.items():
+            claves = self.aplicar_criterio(claves, nombre, valor)
+        return bool(claves)
+
+    # Acceso desde las pestañas
+    def recargar(self):
+        """Vuelve a leer las claves del sistema (tras cualquier cambio en los datos); conserva el filtro"""
+        self.beginResetModel()
+        claves = self.obtener_claves()
+        self._todas = dict(zip(claves, range(len(claves))))
+        self._siguiente_posicion = len(claves)
+        self._cache = {}
+        self.preparar_filtros()
+        self._claves, self._valores = self._claves_visibles()
+        self.endResetModel()
+
+    def aplicar_cambio(self, cambio):
+        """Refleja un Cambio del sistema (ver models/eventos.py) tocando solo las filas que afecta"""
+        claves = self.claves_afectadas(cambio)
+        if claves is None or len(claves) > MAXIMO_FILAS_PARCHE:
+            self.recargar()
+            return
+        if cambio.catalogo == self.CATALOGO:
+            # Una alta, baja o edición del propio catálogo puede cambiar lo precalculado para los filtros
+            self.preparar_filtros()
+        for clave in claves:
+            self._cache.pop(clave, None)
+            self._actualizar_fila(clave)
+
+    def _actualizar_fila(self, clave):
+        """Quita, inserta o mueve la fila de una clave según su estado actual en el sistema"""
+        fila = self.fila(clave)  # con el valor con que se ubicó, antes de olvidarlo
+        if not self.existe(clave):
+            visible = False
+            self._todas.pop(clave, None)
+        else:
+            if clave not in self._todas:
+                self._todas[clave] = self._siguiente_posicion
+                self._siguiente_posicion += 1
+            visible = self.cumple_filtro(clave)
+
+        if not visible:
+            if fila >= 0:
+                self.beginRemoveRows(QModelIndex(), fila, fila)
+                del self._claves[fila]
+                if self._valores is not None:
+                    del self._valores[clave]
+                self.endRemoveRows()
+            return
+        valor = self.valor_orden(clave, self._columna_orden) if self._valores is not None else None
+        if fila < 0:
+            fila = self._buscar(self._llave(clave, valor))
+            self.beginInsertRows(QModelIndex(), fila, fila)
+            self._claves.insert(fila, clave)
+            if self._valores is not None:
+                self._valores[clave] = valor
+            self.endInsertRows()
+            return
+        if self._valores is not None:
+            fila = self._mover(clave, fila, valor)
+        self.dataChanged.emit(self.index(fila, 0), self.index(fila, len(self.COLUMNAS) - 1))
+
+    def _mover(self, clave, fila, valor):
+        """Lleva la fila a donde le toca con su nuevo valor en la columna ordenada; devuelve la fila nueva"""
+        # Las demás filas siguen ordenadas: la búsqueda da el destino contando aún la fila en su sitio
+        destino = self._buscar(self._llave(clave, valor))
+        self._valores[clave] = valor
+        if destino in (fila, fila + 1):
+            return fila
+        nueva = destino - 1 if destino > fila else destino
+        self.beginMoveRows(QModelIndex(), fila, fila, QModelIndex(), destino)
+        del self._claves[fila]
+        self._claves.insert(nueva, clave)
+        self.endMoveRows()
+        return nueva
+
+    def _llave(self, clave, valor=None):
+        """Lo que ubica la clave en el orden mostrado: su posición natural o (valor, posición natural)"""
+        if self._valores is None:
+            return self._todas[clave]
+        return (valor, self._todas[clave])
+
+    def _va_antes(self, llave, otra):
+        if self._valores is None:
+            return llave < otra
+        if llave[0] == otra[0]:
+            return llave[1] < otra[1]  # sort() es estable: los empates quedan en el orden natural
+        return otra[0] < llave[0] if self._orden == Qt.DescendingOrder else llave[0] < otra[0]
+
+    def _buscar(self, llave):
+        """Primera fila visible que no va antes que la llave (búsqueda binaria)"""
+        posiciones, valores = self._todas, self._valores
+        inicio, fin = 0, len(self._claves)
+        while inicio < fin:
+            medio = (inicio + fin) // 2
+            otra = self._claves[medio]
+            actual = posiciones[otra] if valores is None else (valores[otra], posiciones[otra])
+            if self._va_antes(actual, llave):
+                inicio = medio + 1
+            else:
+                fin = medio
+        return inicio
+
+    def repintar(self):
+        """Vuelve a formatear las filas visibles sin moverlas (tras un cambio que afecta a muchas)"""
+        self._cache = {}
+        if self._claves:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._claves) - 1, len(self.COLUMNAS) - 1))
+
+    def filtrar(self, texto="", **criterios):
+        """Muestra solo las filas que contienen el texto y cumplen los criterios (los None se ignoran)"""
+        self.mostrar(self.consultar(texto, **criterios))
+
+    def consultar(self, texto="", vigente=None, captura=None, **criterios):
+        """Calcula, sin tocar la vista, el resultado de filtrar(); puede correr fuera del hilo de la interfaz.
+
+        vigente es una función opcional que deja de devolver True cuando el
+        resultado ya no interesa; entre etapas se lanza BusquedaCancelada.
+        Fuera del hilo de la interfaz, captura debe ser capturar_estado(), tomado
+        en ese hilo: las filas cambian allí mientras la consulta las recorre.
+        """
+        texto = normalizar(texto.strip())
+        criterios = {nombre: valor for nombre, valor in criterios.items() if valor is not None}
+        version, orden, claves = captura if captura is not None else self.capturar_estado()
+        visibles = self._claves_visibles(texto, criterios, vigente, claves, orden)
+        return texto, criterios, version, orden, visibles
+
+    def capturar_estado(self):
+        """(versión de los datos, orden, copia de las claves de todas las filas) para consultar"""
+        return self.sistema.version_datos, (self._columna_orden, self._orden), list(self._todas)
+
+    def mostrar(self, resultado):
+        """Muestra en la vista el resultado de consultar()"""
+        texto, criterios, version, orden, visibles = resultado
+        self._texto, self._criterios = texto, criterios
+        if version != self.sistema.version_datos or orden != (self._columna_orden, self._orden):
+            # Los datos o el orden de la tabla cambiaron durante la consulta
+            visibles = self._claves_visibles(texto, criterios)
+        self.beginResetModel()
+        self._claves, self._valores = visibles
+        self.endResetModel()
+
+    def total(self):
+        """Filas sin filtrar"""
+        return len(self._todas)
+
+    def _claves_visibles(self, texto=None, criterios=None, vigente=None, claves=None, orden=None):
+        """(claves visibles en el orden mostrado, {clave: valor en la columna ordenada} o None sin orden);
+        claves y orden son los de capturar_estado cuando corre fuera del hilo de la interfaz"""
+        if texto is None:
+            texto, criterios = self._texto, self._criterios
+        if claves is None:
+            claves = list(self._todas)
+        columna_orden, orden = orden if orden is not None else (self._columna_orden, self._orden)
+        if texto or criterios:
+            claves = self.claves_filtradas(texto, criterios, claves)
+        if vigente is not None and not vigente():
+            raise BusquedaCancelada()
+        if columna_orden < 0:
+            return claves, None
+        # Se guardan los valores: al cambiar una fila, el anterior dice dónde estaba
+        valor = self.valores_orden(columna_orden)
+        valores = {clave: valor(clave) for clave in claves}
+        claves.sort(key=valores.__getitem__, reverse=orden == Qt.DescendingOrder)
+        return claves, valores
+
+    def fila(self, clave):
+        """Fila visible de la clave; -1 si no existe o está filtrada"""
+        if self._valores is None:
+            if clave not in self._todas:
+                return -1
+            llave = self._llave(clave)
+        elif clave in self._valores:
+            llave = self._llave(clave, self._valores[clave])
+        else:
+            return -1
+        fila = self._buscar(llave)
+        return fila if fila < len(self._claves) and self._claves[fila] == clave else -1
+
+    def clave(self, fila):
+        if 0 <= fila < len(self._claves):
+            return self._claves[fila]
+        return None
+
+    def texto(self, fila, columna):
+        clave = self.clave(fila)
+        return "" if clave is None else self.texto_clave(clave, columna)
+
+    def texto_clave(self, clave, columna):
+        formato = self._formato(clave)
+        return formato[0][columna] if formato else ""
+
+    def _formato(self, clave):
+        formato = self._cache.get(clave)
+        if formato is None:
+            if len(self._cache) >= self.FILAS_EN_CACHE:
+                self._cache = {}
+            formato = self.formatear(clave)
+            if formato is not None:
+                self._cache[clave] = formato
+        return formato
+
+    # Interfaz de QAbstractTableModel
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._claves)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNAS)
+
+    def headerData(self, seccion, orientacion, rol=Qt.DisplayRole):
+        if orientacion == Qt.Horizontal and rol == Qt.DisplayRole:
+            return self.COLUMNAS[seccion]
+        return None
+
+    def data(self, indice, rol=Qt.DisplayRole):
+        if not indice.isValid():
+            return None
+        clave = self._claves[indice.row()]
+        if rol == Qt.UserRole:
+            return clave
+        if rol not in (Qt.DisplayRole, Qt.ForegroundRole, Qt.FontRole):
+            return None
+        formato = self._formato(clave)
+        if formato is None:
+            return None
+        textos, estilos = formato
+        if rol == Qt.DisplayRole:
+            return textos[indice.column()]
+        estilo = estilos.get(indice.column())
+        if estilo is None:
+            return None
+        color, fuente = estilo
+        return QBrush(color) if rol == Qt.ForegroundRole else fuente
+
+    def sort(self, columna, orden=Qt.AscendingOrder):
+        self._columna_orden, self._orden = columna, orden
+        self._reordenar(self._claves_visibles)
+
+    def _reordenar(self, calcular):
+        """Cambia las filas visibles por calcular() conservando la selección: cada índice persistente sigue a su clave"""
+        self.layoutAboutToBeChanged.emit()
+        persistentes = self.persistentIndexList()
+        claves = [self._claves[indice.row()] for indice in persistentes]
+        self._claves, self._valores = calcular()
+        if persistentes:
+            filas = {clave: fila for fila, clave in enumerate(self._claves)}
+            self.changePersistentIndexList(
+                persistentes, [self.index(filas[clave], indice.column()) if clave in filas else QModelIndex()
+                               for clave, indice in zip(claves, persistentes)])
+        self.layoutChanged.emit()
+
+
+def estado_calificacion(calificacion):
+    if calificacion >= 4.5:
+        return "🌟 Excelente", VERDE
+    if calificacion >= 4.0:
+        return "✅ Buena", AZUL
+    if calificacion >= 3.0:
+        return "⚠️ Aceptable", AMARILLO
+    return "❌ Deficiente", ROJO
+
+
+# Texto normalizado con que se muestra cada valor de los campos de una nota que se buscan por texto
+_TEXTO_VALOR = {
+    'calificacion': lambda calificacion: normalizar(f"{calificacion:.2f} {estado_calificacion(calificacion)[0]}"),
+    'dia': lambda dia: ordinal_a_fecha(dia * 86400).strftime('%d/%m/%Y'),
+    'peso': lambda peso: f"{peso:.1f}%",
+    'descripcion': normalizar,
+}
+
+# Campo de valores_notas por el que se ordena cada columna de la tabla de notas y su posición en fila_nota
+_ORDEN_NOTAS = {0: ('estudiante', 0), 1: ('asignatura', 1), 2: ('calificacion', 2), 3: ('fecha', 3),
+                4: ('peso', 4), 5: ('descripcion', 5), 6: ('calificacion', 2)}
+
+
+def _en_rango(valor, rango):
+    """valor en [minimo, maximo); None deja ese extremo abierto"""
+    minimo, maximo = rango
+    return (minimo is None or valor >= minimo) and (maximo is None or valor < maximo)
+
+
+class ModeloNotas(ModeloTablaSistema):
+    """Notas identificadas por id_nota; los ids salen de las columnas sin crear objetos Nota"""
+    COLUMNAS = ("👤 Estudiante", "📚 Asignatura", "📊 Calificación",
+                "📅 Fecha", "⚖️ Peso", "📝 Descripción", "🎯 Estado")
+
+    def obtener_claves(self):
+        # En orden de id, que es el de alta: las notas nuevas van siempre al final del orden natural
+        return list(self.sistema.ids_notas())
+
+    def formatear(self, id_nota):
+        # Se leen los valores de la fila, no un objeto Nota: pintar no debe cargar todas las notas
+        fila = self.sistema.fila_nota(id_nota)
+        if fila is None:
+            return None
+        codigo_estudiante, codigo_asignatura, calificacion, fecha, peso, descripcion, _ = fila
+        estudiante = self.sistema.estudiantes.get(codigo_estudiante)
+        asignatura = self.sistema.asignaturas.get(codigo_asignatura)
+        estado, color = estado_calificacion(calificacion)
+        textos = (estudiante.nombre if estudiante else codigo_estudiante,
+                  asignatura.nombre if asignatura else codigo_asignatura,
+                  f"{calificacion:.2f}",
+                  ordinal_a_fecha(fecha).strftime('%d/%m/%Y'),
+                  f"{peso:.1f}%",
+                  descripcion,
+                  estado)
+        return textos, {2: (color, self._negrita), 6: (color, self._negrita_pequena)}
+
+    def valores_orden(self, columna):
+        # Una sola lectura de la columna del sistema para todas las filas, en lugar de formatear cada una
+        campo, _ = _ORDEN_NOTAS[columna]
+        valores = self.sistema.valores_notas(campo)
+        traducir = self._traducir_valor(columna)
+        return valores.__getitem__ if traducir is None else lambda id_nota: traducir(valores[id_nota])
+
+    def valor_orden(self, id_nota, columna):
+        fila = self.sistema.fila_nota(id_nota)
+        if fila is None:
+            return None
+        valor = fila[_ORDEN_NOTAS[columna][1]]
+        traducir = self._traducir_valor(columna)
+        return valor if traducir is None else traducir(valor)
+
+    def _traducir_valor(self, columna):
+        """Las columnas de estudiante y asignatura se ordenan por el nombre mostrado; None en las demás"""
+        if columna not in (0, 1):
+            return None
+        catalogo = self.sistema.estudiantes if columna == 0 else self.sistema.asignaturas
+        return lambda codigo: catalogo[codigo].nombre if codigo in catalogo else codigo
+
+    def existe(self, id_nota):
+        return self.sistema.fila_nota(id_nota) is not None
+
+    def claves_afectadas(self, cambio):
+        if cambio.catalogo == 'notas':
+            self._claves_valor = None  # pudieron aparecer valores distintos nuevos
+            return cambio.claves
+        if cambio.tipo in (eventos.ESTUDIANTE_EDITADO, eventos.ASIGNATURA_EDITADA):
+            # Cambia el nombre mostrado en todas sus notas: con filtro de texto u orden por nombre
+            # las filas visibles pueden ser otras; si no, basta repintarlas
+            if self._texto or self._columna_orden in (0, 1):
+                self._cache = {}
+                self.sort(self._columna_orden, self._orden)
+            else:
+                self.repintar()
+            return ()
+        # Las bajas de estudiantes y asignaturas llegan antes como NOTAS_ELIMINADAS
+        return None if cambio.tipo == eventos.DATOS_RECARGADOS else ()
+
+    def preparar_filtros(self):
+        # Las claves de búsqueda son por valor distinto, no por fila: se calculan en la primera búsqueda
+        self._claves_valor = None
+
+    def cumple_filtro(self, id_nota):
+        fila = self.sistema.fila_nota(id_nota)
+        if fila is None:
+            return False
+        estudiante, asignatura, calificacion, fecha, peso, descripcion, _ = fila
+        criterios = self._criterios
+        if 'estudiantes' in criterios and estudiante not in criterios['estudiantes']:
+            return False
+        if 'asignaturas' in criterios and asignatura not in criterios['asignaturas']:
+            return False
+        if 'rango' in criterios and not _en_rango(calificacion, criterios['rango']):
+            return False
+        if not self._texto:
+            return True
+        valores = {'calificacion': calificacion, 'dia': fecha // 86400, 'peso': peso, 'descripcion': descripcion}
+        return (any(self._texto in _TEXTO_VALOR[campo](valor) for campo, valor in valores.items())
+                or self.sistema.coincide('estudiantes', estudiante, self._texto)
+                or self.sistema.coincide('asignaturas', asignatura, self._texto))
+
+    def claves_filtradas(self, texto, criterios, claves):
+        """Filtra con las columnas del sistema: estudiantes y asignaturas son conjuntos de códigos,
+        rango es (minimo, maximo) de la calificación"""
+        minimo, maximo = criterios.get('rango', (None, None))
+        alguna = self._coincidencias(texto) if texto else None
+        return list(self.sistema.filtrar_notas(criterios.get('estudiantes'), criterios.get('asignaturas'),
+                                               minimo, maximo, alguna))
+
+    def _coincidencias(self, texto):
+        """{campo: valores} cuyo texto mostrado contiene el texto buscado"""
+        if self._claves_valor is None:
+            self._claves_valor = self._calcular_claves_valor()
+        coincidencias = {campo: {valor for valor, clave in pares if texto in clave}
+                         for campo, pares in self._claves_valor.items()}
+        coincidencias['estudiante'] = set(self.sistema.buscar('estudiantes', texto))
+        coincidencias['asignatura'] = set(self.sistema.buscar('asignaturas', texto))
+        return coincidencias
+
+    def _calcular_claves_valor(self):
+        # Unos pocos miles de valores distintos en lugar de una clave por cada nota
+        # (estudiantes y asignaturas se buscan en el índice del sistema)
+        distintos = self.sistema.valores_distintos_notas
+        return {campo: [(valor, texto(valor)) for valor in distintos(campo)] for campo, texto in _TEXTO_VALOR.items()}
+
+
+class ModeloEstudiantes(ModeloTablaSistema):
+    CATALOGO = 'estudiantes'
+    COLUMNAS = ("🔢 Código", "👤 Nombre", "📚 Programa", "📧 Email", "📱 Teléfono", "📊 Promedio")
+
+    def obtener_claves(self):
+        return list(self.sistema.estudiantes)
+
+    def formatear(self, codigo):
+        estudiante = self.sistema.estudiantes.get(codigo)
+        if estudiante is None:
+            return None
+        promedio = self.sistema.calcular_promedio_estudiante(codigo)
+        if promedio >= 4.5:
+            color = VERDE
+        elif promedio >= 4.0:
+            color = AZUL
+        elif promedio >= 3.0:
+            color = AMARILLO
+        elif promedio > 0:
+            color = ROJO
+        else:
+            color = GRIS
+        textos = (estudiante.codigo, estudiante.nombre, estudiante.programa, estudiante.email,
+                  estudiante.telefono, f"{promedio:.2f}" if promedio > 0 else "Sin notas")
+        return textos, {5: (color, self._negrita)}
+
+    def valores_orden(self, columna):
+        if columna == 5:
+            return self.sistema.calcular_promedio_estudiante
+        return super().valores_orden(columna)
+
+    def claves_afectadas(self, cambio):
+        # Una nota cambia el promedio (y con él el color, el filtro de rendimiento y el orden) de su estudiante
+        if cambio.catalogo == 'notas':
+            return cambio.estudiantes
+        return super().claves_afectadas(cambio)
+
+    def preparar_filtros(self):
+        self._por_programa = {}
+        for codigo, estudiante in self.sistema.estudiantes.items():
+            self._por_programa.setdefault(estudiante.programa, set()).add(codigo)
+
+    def aplicar_criterio(self, claves, nombre, valor):
+        """programa: nombre del programa; rendimiento: (minimo, maximo) del promedio o 'sin_notas'"""
+        if nombre == 'programa':
+            codigos = self._por_programa.get(valor, set())
+            return [codigo for codigo in claves if codigo in codigos]
+        promedio = self.sistema.calcular_promedio_estudiante
+        if valor == 'sin_notas':
+            return [codigo for codigo in claves if promedio(codigo) <= 0]
+        return [codigo for codigo in claves if promedio(codigo) > 0 and _en_rango(promedio(codigo), valor)]
+
+
+class ModeloAsignaturas(ModeloTablaSistema):
+    CATALOGO = 'asignaturas'
+    COLUMNAS = ("🔢 Código", "📚 Nombre", "🎓 Créditos", "👨‍🏫 Profesor", "📊 Promedio", "🎯 Estado")
+
+    def obtener_claves(self):
+        return list(self.sistema.asignaturas)
+
+    def formatear(self, codigo):
+        asignatura = self.sistema.asignaturas.get(codigo)
+        if asignatura is None:
+            return None
+        profesor = self.sistema.profesores.get(asignatura.profesor)
+        promedio = self.sistema.calcular_promedio_asignatura(codigo)
+
+        # El estado solo necesita saber si hay notas: se cuentan sin crearlas
+        if not self.sistema.contar_notas_asignatura(codigo):
+            estado, color_estado = "📝 Sin calificaciones", GRIS
+        elif not profesor:
+            estado, color_estado = "⚠️ Sin profesor", AMARILLO_OSCURO
+        elif promedio >= 4.0:
+            estado, color_estado = "🌟 Excelente", VERDE
+        elif promedio >= 3.0:
+            estado, color_estado = "✅ Buena", AZUL
+        else:
+            estado, color_estado = "❌ Necesita atención", ROJO
+
+        if asignatura.creditos >= 5:
+            color_creditos = VERDE
+        elif asignatura.creditos >= 3:
+            color_creditos = AZUL
+        else:
+            color_creditos = AMARILLO
+
+        if promedio > 0:
+            estilo_promedio = (VERDE if promedio >= 4.0 else ROJO if promedio < 3.0 else AMARILLO, self._negrita)
+        else:
+            estilo_promedio = (GRIS, None)
+
+        textos = (asignatura.codigo, asignatura.nombre, str(asignatura.creditos),
+                  profesor.nombre if profesor else "Sin asignar",
+                  f"{promedio:.2f}" if promedio > 0 else "Sin notas", estado)
+        return textos, {2: (color_creditos, self._negrita), 4: estilo_promedio,
+                        5: (color_estado, self._negrita_pequena)}
+
+    def valores_orden(self, columna):
+        if columna == 2:
+            return lambda codigo: self.sistema.asignaturas[codigo].creditos
+        if columna == 4:
+            return self.sistema.calcular_promedio_asignatura
+        return super().valores_orden(columna)
+
+    def claves_afectadas(self, cambio):
+        if cambio.catalogo == 'notas':
+            return cambio.asignaturas
+        if cambio.tipo in (eventos.PROFESOR_AGREGADO, eventos.PROFESOR_EDITADO):
+            # Cambia el profesor mostrado (y el filtro por profesor) de un número indeterminado de asignaturas
+            return None
+        return super().claves_afectadas(cambio)
+
+    def preparar_filtros(self):
+        profesores = self.sistema.profesores
+        self._por_profesor = {}  # {nombre del profesor o "Sin asignar": {codigo}}
+        for codigo, asignatura in self.sistema.asignaturas.items():
+            profesor = profesores.get(asignatura.profesor)
+            self._por_profesor.setdefault(profesor.nombre if profesor else "Sin asignar", set()).add(codigo)
+
+    def aplicar_criterio(self, claves, nombre, valor):
+        """profesor: nombre mostrado; creditos: (minimo, maximo); estado: 'con_notas', 'sin_notas' o 'sin_profesor'"""
+        if nombre == 'profesor':
+            codigos = self._por_profesor.get(valor, set())
+            return [codigo for codigo in claves if codigo in codigos]
+        if nombre == 'creditos':
+            asignaturas = self.sistema.asignaturas
+            return [codigo for codigo in claves if _en_rango(asignaturas[codigo].creditos, valor)]
+        if valor == 'sin_profesor':
+            codigos = self._por_profesor.get("Sin asignar", set())
+            return [codigo for codigo in claves if codigo in codigos]
+        con_notas = valor == 'con_notas'
+        promedio = self.sistema.calcular_promedio_asignatura
+        return [codigo for codigo in claves if (promedio(codigo) > 0) == con_notas]
+
+
+class ModeloProfesores(ModeloTablaSistema):
+    CATALOGO = 'profesores'
+    COLUMNAS = ("🔢 ID", "👨‍🏫 Nombre", "📧 Email", "📱 Teléfono", "🎓 Especialidad")
+
+    def obtener_claves(self):
+        return list(self.sistema.profesores)
+
+    def formatear(self, id_profesor):
+        profesor = self.sistema.profesores.get(id_profesor)
+        if profesor is None:
+            return None
+        email_valido = "@" in profesor.email if profesor.email else False
+        textos = (profesor.id_profesor, profesor.nombre, profesor.email if email_valido else "Sin email",
+                  profesor.telefono, profesor.especialidad)
+        return textos, {2: (VERDE if email_valido else ROJO,
+                            self._negrita_pequena if email_valido else self._normal_pequena)}
+
+    def claves_afectadas(self, cambio):
+        if cambio.catalogo == 'asignaturas':
+            # El estado con/sin asignaturas de los profesores depende de todas las asignaturas
+            return None
+        return super().claves_afectadas(cambio)
+
+    def preparar_filtros(self):
+        self._por_especialidad = {}
+        for id_profesor, profesor in self.sistema.profesores.items():
+            self._por_especialidad.setdefault(profesor.especialidad, set()).add(id_profesor)
+        self._con_asignaturas = {asignatura.profesor for asignatura in self.sistema.asignaturas.values()}
+
+    def aplicar_criterio(self, claves, nombre, valor):
+        """especialidad: nombre; estado: 'con_asignaturas', 'sin_asignaturas', 'con_email' o 'sin_email'"""
+        if nombre == 'especialidad':
+            ids = self._por_especialidad.get(valor, set())
+            return [id_profesor for id_profesor in claves if id_profesor in ids]
+        if valor in ('con_asignaturas', 'sin_asignaturas'):
+            con_asignaturas = valor == 'con_asignaturas'
+            return [id_profesor for id_profesor in claves
+                    if (id_profesor in self._con_asignaturas) == con_asignaturas]
+        profesores = self.sistema.profesores
+        con_email = valor == 'con_email'
+        return [id_profesor for id_profesor in claves
+                if ("@" in profesores[id_profesor].email if profesores[id_profesor].email else False) == con_email]
@@ -0,0 +1,38 @@
+from PyQt5.QtCore import QObject, QEvent, QTimer
+
+class RefrescoDiferido(QObject):
+    """Agrupa las actualizaciones costosas que piden los cambios del sistema a un widget.
+
+    pedir(funcion) la anota; cada función anotada se ejecuta una sola vez, al
+    volver al bucle de eventos si el widget está a la vista o cuando se muestre
+    si no, por muchos cambios que lleguen entretanto.
+    """
+    def __init__(self, widget):
+        super().__init__(widget)
+        self._widget = widget
+        self._pendientes = []  # funciones en el orden en que se pidieron, sin repetir
+        self._programado = False
+        widget.installEventFilter(self)
+
+    def pedir(self, funcion):
+        if funcion not in self._pendientes:
+            self._pendientes.append(funcion)
+        self._programar()
+
+    def _programar(self):
+        if self._pendientes and not self._programado and self._widget.isVisible():
+            self._programado = True
+            QTimer.singleShot(0, self._ejecutar)
+
+    def _ejecutar(self):
+        self._programado = False
+        if not self._widget.isVisible():
+            return  # quedan pendientes hasta que se muestre
+        pendientes, self._pendientes = self._pendientes, []
+        for funcion in pendientes:
+            funcion()
+
+    def eventFilter(self, objeto, evento):
+        if objeto is self._widget and evento.type() == QEvent.Show:
+            self._programar()
+        return False
@@ -1,9 +1,26 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                            QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox,
+                            QTableView, QHeaderView, QMessageBox,
                             QLabel, QFrame, QLineEdit, QComboBox, QGroupBox, QGridLayout,
                             QSplitter, QScrollArea, QProgressBar, QSpinBox)
 from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QIcon, QColor, QBrush, QFont, QPalette
+from PyQt5.QtGui import QIcon, QPalette
+from ..modelos_tabla import ModeloAsignaturas
+from ..busqueda_diferida import BusquedaDiferida
+from ..refresco_diferido import RefrescoDiferido
+from models.asignatura import Asignatura
+from utils.helpers import crear_dialogo_progreso
+
+# Opciones de los filtros -> criterios de ModeloAsignaturas
+RANGOS_CREDITOS = {
+    "1-2 créditos": (1, 3),
+    "3-4 créditos": (3, 5),
+    "5+ créditos": (5, None),
+}
+ESTADOS_FILTRO = {
+    "Con Calificaciones": 'con_notas',
+    "Sin Calificaciones": 'sin_notas',
+    "Sin Profesor": 'sin_profesor',
+}
 
 class SubjectsTab(QWidget):
     """Pestaña de gestión de asignaturas con diseño moderno"""
@@ -13,6 +30,10 @@ class SubjectsTab(QWidget):
         self.parent = parent
         self.setup_modern_ui()
         self.apply_modern_styles()
+        
+        # Tras cada cambio el modelo toca solo las filas afectadas; combos y estadísticas se refrescan una vez
+        self.refresco = RefrescoDiferido(self)
+        self.sistema.suscribir(self.on_data_changed)
 
     def setup_modern_ui(self):
         # Layout principal
@@ -161,12 +182,11 @@ class SubjectsTab(QWidget):
         table_layout.addWidget(table_title)
         
         # Tabla de asignaturas mejorada
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([
-            "🔢 Código", "📚 Nombre", "🎓 Créditos", 
-            "👨‍🏫 Profesor", "📊 Promedio", "🎯 Estado"
-        ])
+        self.table = QTableView()
+        self.model = ModeloAsignaturas(self.sistema, self)
+        self.busqueda = BusquedaDiferida(self.model.consultar, self.model.mostrar, parent=self,
+                                         capturar=self.model.capturar_estado)
+        self.table.setModel(self.model)
         
         # Configurar tabla
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
@@ -174,10 +194,11 @@ class SubjectsTab(QWidget):
         self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)  # Profesor
         
         self.table.verticalHeader().setVisible(False)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
         self.table.setAlternatingRowColors(True)
         self.table.setSortingEnabled(True)
+        self.table.sortByColumn(1, Qt.AscendingOrder)  # por nombre
         self.table.setObjectName("subjectsTable")
         
         # Conectar doble clic para editar
@@ -218,7 +239,7 @@ class SubjectsTab(QWidget):
         info_layout.addWidget(self.selected_subject_info)
         
         # Conectar selección de tabla
-        self.table.itemSelectionChanged.connect(self.update_selected_subject_info)
+        self.table.selectionModel().selectionChanged.connect(self.update_selected_subject_info)
         
         parent_layout.addWidget(info_group)
 
@@ -601,88 +622,26 @@ class SubjectsTab(QWidget):
 
     def update_table(self):
         """Actualizar tabla con todas las asignaturas"""
-        self.table.setRowCount(0)
-        
         # Actualizar filtros
         self.update_filter_combos()
         
-        # Obtener asignaturas ordenadas
-        asignaturas = sorted(self.sistema.obtener_asignaturas(), key=lambda x: x.nombre)
-        
-        for asignatura in asignaturas:
-            self.add_subject_to_table(asignatura)
+        # El modelo solo relee los códigos; cada fila se formatea al pintarse
+        self.model.recargar()
         
         # Actualizar contador
-        self.subjects_count_label.setText(f"{len(asignaturas)} asignaturas registradas")
+        self.subjects_count_label.setText(f"{self.model.total()} asignaturas registradas")
 
-    def add_subject_to_table(self, asignatura):
-        """Agregar una asignatura a la tabla"""
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        
-        # Obtener nombre del profesor
-        profesor = self.sistema.profesores.get(asignatura.profesor, None)
-        nombre_profesor = profesor.nombre if profesor else "Sin asignar"
-        
-        # Calcular promedio de la asignatura
-        promedio = self.sistema.calcular_promedio_asignatura(asignatura.codigo)
-        promedio_str = f"{promedio:.2f}" if promedio > 0 else "Sin notas"
-        
-        # Determinar estado de la asignatura
-        notas_asignatura = [n for n in self.sistema.notas_heap if n.asignatura == asignatura.codigo]
-        
-        if not notas_asignatura:
-            estado = "📝 Sin calificaciones"
-            color_estado = QColor(108, 117, 125)  # Gris
-        elif not profesor:
-            estado = "⚠️ Sin profesor"
-            color_estado = QColor(255, 193, 7)  # Amarillo
-        elif promedio >= 4.0:
-            estado = "🌟 Excelente"
-            color_estado = QColor(46, 204, 113)  # Verde
-        elif promedio >= 3.0:
-            estado = "✅ Buena"
-            color_estado = QColor(52, 152, 219)  # Azul
-        else:
-            estado = "❌ Necesita atención"
-            color_estado = QColor(231, 76, 60)  # Rojo
-        
-        # Determinar color de créditos
-        if asignatura.creditos >= 5:
-            creditos_color = QColor(46, 204, 113)  # Verde para muchos créditos
-        elif asignatura.creditos >= 3:
-            creditos_color = QColor(52, 152, 219)  # Azul para créditos normales
-        else:
-            creditos_color = QColor(241, 196, 15)  # Amarillo para pocos créditos
-        
-        # Crear items para la tabla
-        items = [
-            QTableWidgetItem(asignatura.codigo),
-            QTableWidgetItem(asignatura.nombre),
-            QTableWidgetItem(str(asignatura.creditos)),
-            QTableWidgetItem(nombre_profesor),
-            QTableWidgetItem(promedio_str),
-            QTableWidgetItem(estado)
-        ]
-        
-        # Aplicar colores y formato
-        items[2].setForeground(QBrush(creditos_color))
-        items[2].setFont(QFont("Arial", 10, QFont.Bold))
-        
-        if promedio > 0:
-            promedio_color = QColor(46, 204, 113) if promedio >= 4.0 else QColor(231, 76, 60) if promedio < 3.0 else QColor(241, 196, 15)
-            items[4].setForeground(QBrush(promedio_color))
-            items[4].setFont(QFont("Arial", 10, QFont.Bold))
-        else:
-            items[4].setForeground(QBrush(QColor(108, 117, 125)))
-        
-        items[5].setForeground(QBrush(color_estado))
-        items[5].setFont(QFont("Arial", 9, QFont.Bold))
-        
-        # Hacer celdas no editables
-        for col, item in enumerate(items):
-            self.table.setItem(row, col, item)
-            item.setFlags(item.flags() ^ Qt.ItemIsEditable)
+    def on_data_changed(self, cambio):
+        """Aplicar un cambio del sistema (ver models/eventos.py)"""
+        self.model.aplicar_cambio(cambio)
+        self.subjects_count_label.setText(f"{self.model.total()} asignaturas registradas")
+        
+        if cambio.catalogo in ('asignaturas', 'profesores', None):
+            self.refresco.pedir(self.update_filter_combos)
+        if cambio.catalogo in ('asignaturas', 'notas', None):
+            self.refresco.pedir(self.update_statistics)
+        if cambio.catalogo in ('asignaturas', 'profesores', 'notas', None):
+            self.refresco.pedir(self.update_selected_subject_info)
 
     def update_filter_combos(self):
         """Actualizar los combos de filtro"""
@@ -717,70 +676,20 @@ class SubjectsTab(QWidget):
 
     def filter_table(self):
         """Filtrar tabla según criterios seleccionados"""
-        search_text = self.search_input.text().lower()
         selected_professor = self.professor_filter.currentText()
         selected_credits = self.credits_filter.currentText()
         selected_status = self.status_filter.currentText()
         
-        for row in range(self.table.rowCount()):
-            show_row = True
-            
-            # Filtro por texto de búsqueda
-            if search_text:
-                row_text = ""
-                for col in range(self.table.columnCount()):
-                    item = self.table.item(row, col)
-                    if item:
-                        row_text += item.text().lower() + " "
-                
-                if search_text not in row_text:
-                    show_row = False
-            
-            # Filtro por profesor
-            if selected_professor != "Todos los profesores":
-                professor_item = self.table.item(row, 3)
-                if professor_item:
-                    if selected_professor == "Sin profesor asignado":
-                        if professor_item.text() != "Sin asignar":
-                            show_row = False
-                    else:
-                        if professor_item.text() != selected_professor:
-                            show_row = False
-            
-            # Filtro por créditos
-            if selected_credits != "Todos":
-                credits_item = self.table.item(row, 2)
-                if credits_item:
-                    try:
-                        credits = int(credits_item.text())
-                        if selected_credits == "1-2 créditos" and not (1 <= credits <= 2):
-                            show_row = False
-                        elif selected_credits == "3-4 créditos" and not (3 <= credits <= 4):
-                            show_row = False
-                        elif selected_credits == "5+ créditos" and credits < 5:
-                            show_row = False
-                    except ValueError:
-                        show_row = False
-            
-            # Filtro por estado
-            if selected_status != "Todas":
-                status_item = self.table.item(row, 5)
-                promedio_item = self.table.item(row, 4)
-                professor_item = self.table.item(row, 3)
-                
-                if status_item and promedio_item and professor_item:
-                    has_grades = promedio_item.text() != "Sin notas"
-                    has_professor = professor_item.text() != "Sin asignar"
-                    
-                    if selected_status == "Con Calificaciones" and not has_grades:
-                        show_row = False
-                    elif selected_status == "Sin Calificaciones" and has_grades:
-                        show_row = False
-                    elif selected_status == "Sin Profesor" and has_professor:
-                        show_row = False
-            
-            self.table.setRowHidden(row, not show_row)
-
+        profesor = None
+        if selected_professor == "Sin profesor asignado":
+            profesor = "Sin asignar"
+        elif selected_professor != "Todos los profesores":
+            profesor = selected_professor
+        
+        self.busqueda.solicitar(self.search_input.text(), profesor=profesor,
+                                creditos=RANGOS_CREDITOS.get(selected_credits),
+                                estado=ESTADOS_FILTRO.get(selected_status))
+    
     def clear_filters(self):
         """Limpiar todos los filtros"""
         self.search_input.clear()
@@ -812,8 +721,7 @@ class SubjectsTab(QWidget):
         # Contar asignaturas con calificaciones
         asignaturas_con_notas = 0
         for asignatura in asignaturas:
-            notas = [n for n in self.sistema.notas_heap if n.asignatura == asignatura.codigo]
-            if notas:
+            if self.sistema.contar_notas_asignatura(asignatura.codigo):
                 asignaturas_con_notas += 1
         
         # Actualizar labels
@@ -824,14 +732,14 @@ class SubjectsTab(QWidget):
 
     def update_selected_subject_info(self):
         """Actualizar información de la asignatura seleccionada"""
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row < 0:
             self.selected_subject_info.setText("Seleccione una asignatura para ver detalles")
             self.clear_subject_stats()
             return
         
         # Obtener información de la asignatura
-        codigo = self.table.item(selected_row, 0).text()
+        codigo = self.model.texto(selected_row, 0)
         asignatura = self.sistema.asignaturas.get(codigo)
         
         if not asignatura:
@@ -864,7 +772,7 @@ class SubjectsTab(QWidget):
         
         # Calcular y mostrar estadísticas
         promedio = self.sistema.calcular_promedio_asignatura(codigo)
-        notas_asignatura = [n for n in self.sistema.notas_heap if n.asignatura == codigo]
+        notas_asignatura = self.sistema.obtener_notas_asignatura(codigo)
         
         if promedio > 0:
             self.subject_avg_label.setText(f"📊 Promedio: {promedio:.2f}")
@@ -888,10 +796,11 @@ class SubjectsTab(QWidget):
             self.subject_status_label.setStyleSheet(f"padding: 8px; border-radius: 6px; {color_style}")
             
             # Estadísticas detalladas
-            total_notas = len(notas_asignatura)
+            resumen = self.sistema.resumen_notas_asignatura(codigo)
+            total_notas = resumen.total
             estudiantes_unicos = len(set(n.estudiante for n in notas_asignatura))
-            notas_excelentes = len([n for n in notas_asignatura if n.calificacion >= 4.5])
-            notas_deficientes = len([n for n in notas_asignatura if n.calificacion < 3.0])
+            notas_excelentes = resumen.excelentes
+            notas_deficientes = resumen.deficientes
             
             details_text = f"""
             📊 <b>Total de calificaciones:</b> {total_notas}
@@ -928,37 +837,37 @@ class SubjectsTab(QWidget):
 
     def edit_subject(self):
         """Editar asignatura seleccionada"""
-        selected = self.table.currentRow()
+        selected = self.table.currentIndex().row()
         if selected < 0:
             QMessageBox.warning(self, "⚠️ Selección Requerida", 
                               "Seleccione una asignatura para editar.")
             return
         
-        codigo = self.table.item(selected, 0).text()
+        codigo = self.model.texto(selected, 0)
         asignatura = self.sistema.asignaturas.get(codigo)
         if asignatura:
             self.parent.show_edit_subject_dialog(asignatura)
 
     def delete_subject(self):
         """Eliminar asignatura seleccionada"""
-        selected = self.table.currentRow()
+        selected = self.table.currentIndex().row()
         if selected < 0:
             QMessageBox.warning(self, "⚠️ Selección Requerida", 
                               "Seleccione una asignatura para eliminar.")
             return
         
-        codigo = self.table.item(selected, 0).text()
-        nombre = self.table.item(selected, 1).text()
+        codigo = self.model.texto(selected, 0)
+        nombre = self.model.texto(selected, 1)
         
-        # Verificar si tiene calificaciones
-        notas_asignatura = [n for n in self.sistema.notas_heap if n.asignatura == codigo]
+        # Verificar si tiene calificaciones (sin crear los objetos Nota)
+        total_notas = self.sistema.contar_notas_asignatura(codigo)
         
         warning_text = f"¿Está seguro que desea eliminar la asignatura? " \
                       f"📚 Nombre: {nombre} " \
                       f"🔢 Código: {codigo} "
         
-        if notas_asignatura:
-            warning_text += f"⚠️ ADVERTENCIA: Esta asignatura tiene {len(notas_asignatura)} calificaciones registradas. " \
+        if total_notas:
+            warning_text += f"⚠️ ADVERTENCIA: Esta asignatura tiene {total_notas} calificaciones registradas. " \
                            f"Al eliminarla, también se eliminarán todas sus calificaciones. "
         
         warning_text += "Esta acción no se puede deshacer."
@@ -971,26 +880,26 @@ class SubjectsTab(QWidget):
         )
         
         if reply == QMessageBox.Yes:
-            if self.sistema.eliminar_asignatura(codigo):
+            dialogo, progreso = crear_dialogo_progreso(self, f"Eliminando calificaciones de '{nombre}'...", total_notas)
+            eliminado = self.sistema.eliminar_asignatura(codigo, progreso)
+            dialogo.close()
+            if eliminado:
                 QMessageBox.information(self, "✅ Éxito", 
                                       f"Asignatura '{nombre}' eliminada correctamente.")
-                self.refresh_data()
-                self.parent.dashboard.update_stats()
-                self.parent.update_system_info()
             else:
                 QMessageBox.warning(self, "❌ Error", 
                                   "No se pudo eliminar la asignatura.")
 
     def view_subject_grades(self):
         """Ver calificaciones de la asignatura seleccionada"""
-        selected = self.table.currentRow()
+        selected = self.table.currentIndex().row()
         if selected < 0:
             QMessageBox.warning(self, "⚠️ Selección Requerida", 
                               "Seleccione una asignatura para ver sus calificaciones.")
             return
         
-        codigo = self.table.item(selected, 0).text()
-        nombre = self.table.item(selected, 1).text()
+        codigo = self.model.texto(selected, 0)
+        nombre = self.model.texto(selected, 1)
         
         # Ir a la pestaña de notas y filtrar por la asignatura
         self.parent.show_main_tab(3)  # Pestaña de notas
@@ -1003,14 +912,14 @@ class SubjectsTab(QWidget):
 
     def assign_professor(self):
         """Asignar profesor a la asignatura seleccionada"""
-        selected = self.table.currentRow()
+        selected = self.table.currentIndex().row()
         if selected < 0:
             QMessageBox.warning(self, "⚠️ Selección Requerida", 
                               "Seleccione una asignatura para asignar profesor.")
             return
         
-        codigo = self.table.item(selected, 0).text()
-        nombre = self.table.item(selected, 1).text()
+        codigo = self.model.texto(selected, 0)
+        nombre = self.model.texto(selected, 1)
         
         # Mostrar diálogo de selección de profesor
         from PyQt5.QtWidgets import QDialog, QVBoxLayout, QComboBox, QDialogButtonBox, QLabel
@@ -1054,13 +963,12 @@ class SubjectsTab(QWidget):
             asignatura = self.sistema.asignaturas.get(codigo)
             
             if asignatura:
-                asignatura.profesor = nuevo_profesor
+                # A través del sistema, para que se guarde y avise a las vistas
+                self.sistema.editar_asignatura(codigo, Asignatura(codigo, asignatura.nombre,
+                                                                  asignatura.creditos, nuevo_profesor))
                 profesor_nombre = professor_combo.currentText().split(" - ")[0] if nuevo_profesor else "Sin asignar"
                 
                 QMessageBox.information(self, "✅ Éxito", 
                                       f"Profesor asignado correctamente: "
                                       f"📚 Asignatura: {nombre}"
                                       f"👨‍🏫 Profesor: {profesor_nombre}")
-                
-                self.refresh_data()
-                self.parent.dashboard.update_stats()
\ No newline at end of file
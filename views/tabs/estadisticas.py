@@ -8,6 +8,8 @@ from PyQt5.QtGui import QIcon, QColor, QBrush, QFont, QPalette
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from datetime import date, datetime, time
+from ..busqueda_diferida import BusquedaDiferida, BusquedaCancelada
+from ..refresco_diferido import RefrescoDiferido
 
 class StatsTab(QWidget):
     """Pestaña de estadísticas con diseño moderno"""
@@ -17,6 +19,10 @@ class StatsTab(QWidget):
         self.parent = parent
         self.setup_modern_ui()
         self.apply_modern_styles()
+        
+        # Cada cambio pide solo las secciones que afecta; se recalculan una vez y al estar a la vista
+        self.refresco = RefrescoDiferido(self)
+        self.sistema.suscribir(self.on_data_changed)
     
     def setup_modern_ui(self):
         # Layout principal
@@ -184,6 +190,7 @@ class StatsTab(QWidget):
         self.student_search.setPlaceholderText("Buscar estudiante...")
         self.student_search.setObjectName("searchInput")
         self.student_search.textChanged.connect(self.filter_students)
+        self.busqueda_estudiantes = BusquedaDiferida(self.buscar_estudiantes, self.mostrar_estudiantes, parent=self)
         
         selection_layout.addWidget(selection_label)
         selection_layout.addWidget(self.student_combo, 2)
@@ -947,17 +954,34 @@ class StatsTab(QWidget):
         if self.parent:
             self.parent.statusBar().showMessage("📊 Estadísticas actualizadas correctamente", 3000)
     
+    def on_data_changed(self, cambio):
+        """Aplicar un cambio del sistema (ver models/eventos.py)"""
+        recargado = cambio.catalogo is None
+        if cambio.catalogo in ('estudiantes', None):
+            self.refresco.pedir(self.update_student_combo)
+        if cambio.catalogo in ('asignaturas', None):
+            self.refresco.pedir(self.update_subject_combo)
+        if cambio.catalogo in ('estudiantes', 'asignaturas', 'notas', None):
+            self.refresco.pedir(self.update_header_stats)
+            self.refresco.pedir(self.update_visual_analysis)
+        if cambio.catalogo in ('estudiantes', 'notas', None):
+            self.refresco.pedir(self.update_ranking)
+            self.refresco.pedir(self.update_risk_students)
+        
+        # El detalle mostrado solo se recalcula si el cambio toca a ese estudiante o asignatura
+        if recargado or self.student_combo.currentData() in cambio.estudiantes:
+            self.refresco.pedir(self.update_student_stats)
+        if recargado or self.subject_combo.currentData() in cambio.asignaturas:
+            self.refresco.pedir(self.update_subject_stats)
+    
     def update_header_stats(self):
         """Actualizar estadísticas del header"""
         total_students = len(self.sistema.estudiantes)
         total_subjects = len(self.sistema.asignaturas)
-        total_grades = len(self.sistema.notas_heap)
+        total_grades = self.sistema.total_notas()
         
         # Calcular promedio del sistema
-        if self.sistema.notas_heap:
-            system_avg = sum(nota.calificacion for nota in self.sistema.notas_heap) / len(self.sistema.notas_heap)
-        else:
-            system_avg = 0.0
+        system_avg = self.sistema.calcular_promedio_general()
         
         # Actualizar cards
         self.total_students_card.value_label.setText(str(total_students))
@@ -998,19 +1022,27 @@ class StatsTab(QWidget):
             self.update_subject_stats()
     
     def filter_students(self):
-        """Filtrar estudiantes en el combo"""
-        search_text = self.student_search.text().lower()
-        
+        """Filtrar estudiantes en el combo (tras una pausa al escribir)"""
+        self.busqueda_estudiantes.solicitar(self.student_search.text())
+    
+    def buscar_estudiantes(self, search_text, vigente):
+        """[(etiqueta, código)] de los estudiantes que coinciden; corre fuera del hilo de la interfaz"""
+        codigos = self.sistema.buscar('estudiantes', search_text)
+        if not vigente():
+            raise BusquedaCancelada()
+        
+        estudiantes = sorted(filter(None, map(self.sistema.estudiantes.get, codigos)), key=lambda x: x.nombre)
+        return [(f"{est.nombre} ({est.codigo})", est.codigo) for est in estudiantes]
+    
+    def mostrar_estudiantes(self, coincidencias):
+        """Repoblar el combo con el resultado de buscar_estudiantes"""
         # Guardar selección actual
         current_data = self.student_combo.currentData()
         
         # Limpiar y repoblar
         self.student_combo.clear()
-        estudiantes = sorted(self.sistema.obtener_estudiantes(), key=lambda x: x.nombre)
-        
-        for est in estudiantes:
-            if search_text in est.nombre.lower() or search_text in est.codigo.lower():
-                self.student_combo.addItem(f"{est.nombre} ({est.codigo})", est.codigo)
+        for etiqueta, codigo in coincidencias:
+            self.student_combo.addItem(etiqueta, codigo)
         
         # Restaurar selección si aún existe
         for i in range(self.student_combo.count()):
@@ -1120,11 +1152,12 @@ class StatsTab(QWidget):
         self.student_status_label.setStyleSheet(f"padding: 8px; border-radius: 6px; {color_style}")
         
         # Estadísticas detalladas
-        total_notas = len(notas)
-        notas_excelentes = len([n for n in notas if n.calificacion >= 4.5])
-        notas_buenas = len([n for n in notas if 4.0 <= n.calificacion < 4.5])
-        notas_regulares = len([n for n in notas if 3.0 <= n.calificacion < 4.0])
-        notas_deficientes = len([n for n in notas if n.calificacion < 3.0])
+        resumen = self.sistema.resumen_notas_estudiante(codigo)
+        total_notas = resumen.total
+        notas_excelentes = resumen.excelentes
+        notas_buenas = resumen.buenas
+        notas_regulares = resumen.regulares
+        notas_deficientes = resumen.deficientes
         
         details_text = f"""
         📊 <b>Total de calificaciones:</b> {total_notas}
@@ -1136,6 +1169,12 @@ class StatsTab(QWidget):
         📈 <b>Tasa de éxito:</b> {((total_notas - notas_deficientes) / total_notas * 100):.1f}%
         """
         
+        # Rendimiento periodo a periodo
+        for periodo, promedio_periodo, promedio_acumulado, cantidad in self.sistema.promedios_por_periodo(codigo):
+            if cantidad:
+                details_text += (f"\n📅 <b>{periodo.nombre}:</b> {promedio_periodo:.2f} "
+                                 f"(acumulado {promedio_acumulado:.2f}, {cantidad} notas)")
+        
         self.student_details_label.setText(details_text.strip())
     
     def clear_student_info(self):
@@ -1250,11 +1289,12 @@ class StatsTab(QWidget):
         self.subject_status_label.setStyleSheet(f"padding: 8px; border-radius: 6px; {color_style}")
         
         # Distribución de calificaciones
-        total_notas = len(notas)
-        excelentes = len([n for n in notas if n.calificacion >= 4.5])
-        buenas = len([n for n in notas if 4.0 <= n.calificacion < 4.5])
-        regulares = len([n for n in notas if 3.0 <= n.calificacion < 4.0])
-        deficientes = len([n for n in notas if n.calificacion < 3.0])
+        resumen = self.sistema.resumen_notas_asignatura(codigo)
+        total_notas = resumen.total
+        excelentes = resumen.excelentes
+        buenas = resumen.buenas
+        regulares = resumen.regulares
+        deficientes = resumen.deficientes
         
         distribution_text = f"""
         📊 <b>Distribución de calificaciones:</b>
@@ -1375,8 +1415,7 @@ class StatsTab(QWidget):
             programa = estudiante.programa if estudiante else "Desconocido"
             
             # Contar notas del estudiante
-            notas_estudiante = [n for n in self.sistema.notas_heap if n.estudiante == codigo]
-            total_notas = len(notas_estudiante)
+            total_notas = self.sistema.contar_notas_estudiante(codigo)
             
             # Crear items
             items = [
@@ -1405,19 +1444,19 @@ class StatsTab(QWidget):
         self.grade_dist_figure.clear()
         ax = self.grade_dist_figure.add_subplot(111)
         
-        if not self.sistema.notas_heap:
+        if not self.sistema.total_notas():
             ax.text(0.5, 0.5, 'Sin datos disponibles', 
                    horizontalalignment='center', verticalalignment='center',
                    transform=ax.transAxes, fontsize=12, color='gray')
             self.grade_dist_canvas.draw()
             return
         
-        # Obtener calificaciones
-        calificaciones = [nota.calificacion for nota in self.sistema.notas_heap]
+        # Conteos calculados sobre la columna de calificaciones
+        conteos, bordes = self.sistema.histograma_calificaciones(10)
         
         # Crear histograma
         colors = ['#e74c3c', '#f39c12', '#f1c40f', '#2ecc71', '#27ae60']
-        n, bins, patches = ax.hist(calificaciones, bins=10, edgecolor='white', linewidth=1.5)
+        n, bins, patches = ax.hist(bordes[:-1], bordes, weights=conteos, edgecolor='white', linewidth=1.5)
         
         # Aplicar colores
         for i, patch in enumerate(patches):
@@ -1483,32 +1522,25 @@ class StatsTab(QWidget):
         self.trends_figure.clear()
         ax = self.trends_figure.add_subplot(111)
         
-        if not self.sistema.notas_heap:
+        if not self.sistema.total_notas():
             ax.text(0.5, 0.5, 'Sin datos disponibles', 
                    horizontalalignment='center', verticalalignment='center',
                    transform=ax.transAxes, fontsize=12, color='gray')
             self.trends_canvas.draw()
             return
         
-        # Agrupar notas por fecha
-        from collections import defaultdict
-        import datetime
-        
-        notas_por_fecha = defaultdict(list)
-        for nota in self.sistema.notas_heap:
-            fecha_str = nota.fecha.strftime('%Y-%m')
-            notas_por_fecha[fecha_str].append(nota.calificacion)
+        # Promedios por mes mantenidos por el sistema (no se recorren las notas)
+        promedios_mes = self.sistema.promedios_por_mes()
         
-        if len(notas_por_fecha) < 2:
+        if len(promedios_mes) < 2:
             ax.text(0.5, 0.5, 'Datos insuficientes para mostrar tendencias', 
                    horizontalalignment='center', verticalalignment='center',
                    transform=ax.transAxes, fontsize=12, color='gray')
             self.trends_canvas.draw()
             return
         
-        # Calcular promedios por mes
-        fechas = sorted(notas_por_fecha.keys())
-        promedios = [sum(notas_por_fecha[fecha]) / len(notas_por_fecha[fecha]) for fecha in fechas]
+        fechas = [f"{anio}-{mes:02d}" for (anio, mes), _, _ in promedios_mes]
+        promedios = [promedio for _, promedio, _ in promedios_mes]
         
         # Crear gráfico de línea
         ax.plot(fechas, promedios, marker='o', linewidth=2, markersize=6, color='#3498db')
@@ -1549,17 +1581,17 @@ class StatsTab(QWidget):
                     f.write("-" * 30 + "\n")
                     f.write(f"👥 Total de estudiantes: {len(self.sistema.estudiantes)}\n")
                     f.write(f"📚 Total de asignaturas: {len(self.sistema.asignaturas)}\n")
-                    f.write(f"📝 Total de calificaciones: {len(self.sistema.notas_heap)}\n")
+                    f.write(f"📝 Total de calificaciones: {self.sistema.total_notas()}\n")
                     
-                    if self.sistema.notas_heap:
-                        promedio_sistema = sum(n.calificacion for n in self.sistema.notas_heap) / len(self.sistema.notas_heap)
+                    if self.sistema.total_notas():
+                        promedio_sistema = self.sistema.calcular_promedio_general()
                         f.write(f"📊 Promedio del sistema: {promedio_sistema:.2f}\n\n")
                     
                     # Ranking de estudiantes
                     f.write("🏆 RANKING DE ESTUDIANTES\n")
                     f.write("-" * 30 + "\n")
-                    ranking = self.sistema.ranking_estudiantes()
-                    for i, (codigo, promedio) in enumerate(ranking[:10], 1):
+                    ranking = self.sistema.top_estudiantes(10)
+                    for i, (codigo, promedio) in enumerate(ranking, 1):
                         estudiante = self.sistema.estudiantes.get(codigo)
                         nombre = estudiante.nombre if estudiante else codigo
                         f.write(f"{i:2d}. {nombre}: {promedio:.2f}\n")
@@ -1,9 +1,22 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                            QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox,
+                            QTableView, QHeaderView, QMessageBox,
                             QLabel, QFrame, QLineEdit, QComboBox, QGroupBox, QGridLayout,
                             QSplitter, QScrollArea, QProgressBar)
 from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QIcon, QColor, QBrush, QFont, QPalette
+from PyQt5.QtGui import QIcon, QPalette
+from ..modelos_tabla import ModeloEstudiantes
+from ..busqueda_diferida import BusquedaDiferida
+from ..refresco_diferido import RefrescoDiferido
+from utils.helpers import crear_dialogo_progreso
+
+# Opción del filtro de rendimiento -> rango [minimo, maximo) del promedio
+RANGOS_RENDIMIENTO = {
+    "Excelente (≥4.5)": (4.5, None),
+    "Bueno (4.0-4.4)": (4.0, 4.5),
+    "Regular (3.0-3.9)": (3.0, 4.0),
+    "En Riesgo (<3.0)": (None, 3.0),
+    "Sin Calificaciones": 'sin_notas',
+}
 
 class StudentsTab(QWidget):
     """Pestaña de gestión de estudiantes con diseño moderno"""
@@ -13,6 +26,10 @@ class StudentsTab(QWidget):
         self.parent = parent
         self.setup_modern_ui()
         self.apply_modern_styles()
+        
+        # Tras cada cambio el modelo toca solo las filas afectadas; combos y estadísticas se refrescan una vez
+        self.refresco = RefrescoDiferido(self)
+        self.sistema.suscribir(self.on_data_changed)
     
     def setup_modern_ui(self):
         # Layout principal
@@ -151,12 +168,11 @@ class StudentsTab(QWidget):
         table_layout.addWidget(table_title)
         
         # Tabla de estudiantes mejorada
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([
-            "🔢 Código", "👤 Nombre", "📚 Programa", 
-            "📧 Email", "📱 Teléfono", "📊 Promedio"
-        ])
+        self.table = QTableView()
+        self.model = ModeloEstudiantes(self.sistema, self)
+        self.busqueda = BusquedaDiferida(self.model.consultar, self.model.mostrar, parent=self,
+                                         capturar=self.model.capturar_estado)
+        self.table.setModel(self.model)
         
         # Configurar tabla
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
@@ -165,10 +181,11 @@ class StudentsTab(QWidget):
         self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)  # Email
         
         self.table.verticalHeader().setVisible(False)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
         self.table.setAlternatingRowColors(True)
         self.table.setSortingEnabled(True)
+        self.table.sortByColumn(1, Qt.AscendingOrder)  # por nombre
         self.table.setObjectName("studentsTable")
         
         # Conectar doble clic para editar
@@ -211,7 +228,7 @@ class StudentsTab(QWidget):
         info_layout.addWidget(self.selected_student_info, 0, 0, 1, 2)
         
         # Conectar selección de tabla
-        self.table.itemSelectionChanged.connect(self.update_selected_student_info)
+        self.table.selectionModel().selectionChanged.connect(self.update_selected_student_info)
         
         parent_layout.addWidget(info_group)
 
@@ -568,59 +585,25 @@ class StudentsTab(QWidget):
     
     def update_table(self):
         """Actualizar tabla con todos los estudiantes"""
-        self.table.setRowCount(0)
-        
         # Actualizar filtros
         self.update_filter_combos()
         
-        # Obtener estudiantes ordenados
-        estudiantes = sorted(self.sistema.obtener_estudiantes(), key=lambda x: x.nombre)
-        
-        for estudiante in estudiantes:
-            self.add_student_to_table(estudiante)
+        # El modelo solo relee los códigos; cada fila se formatea al pintarse
+        self.model.recargar()
         
         # Actualizar contador
-        self.students_count_label.setText(f"{len(estudiantes)} estudiantes registrados")
+        self.students_count_label.setText(f"{self.model.total()} estudiantes registrados")
     
-    def add_student_to_table(self, estudiante):
-        """Agregar un estudiante a la tabla"""
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        
-        # Calcular promedio del estudiante
-        promedio = self.sistema.calcular_promedio_estudiante(estudiante.codigo)
-        promedio_str = f"{promedio:.2f}" if promedio > 0 else "Sin notas"
-        
-        # Determinar color del promedio
-        if promedio >= 4.5:
-            promedio_color = QColor(46, 204, 113)  # Verde
-        elif promedio >= 4.0:
-            promedio_color = QColor(52, 152, 219)  # Azul
-        elif promedio >= 3.0:
-            promedio_color = QColor(241, 196, 15)  # Amarillo
-        elif promedio > 0:
-            promedio_color = QColor(231, 76, 60)  # Rojo
-        else:
-            promedio_color = QColor(108, 117, 125)  # Gris
-        
-        # Crear items para la tabla
-        items = [
-            QTableWidgetItem(estudiante.codigo),
-            QTableWidgetItem(estudiante.nombre),
-            QTableWidgetItem(estudiante.programa),
-            QTableWidgetItem(estudiante.email),
-            QTableWidgetItem(estudiante.telefono),
-            QTableWidgetItem(promedio_str)
-        ]
-        
-        # Aplicar formato especial al promedio
-        items[5].setForeground(QBrush(promedio_color))
-        items[5].setFont(QFont("Arial", 10, QFont.Bold))
-        
-        # Hacer celdas no editables
-        for col, item in enumerate(items):
-            self.table.setItem(row, col, item)
-            item.setFlags(item.flags() ^ Qt.ItemIsEditable)
+    def on_data_changed(self, cambio):
+        """Aplicar un cambio del sistema (ver models/eventos.py)"""
+        self.model.aplicar_cambio(cambio)
+        self.students_count_label.setText(f"{self.model.total()} estudiantes registrados")
+        
+        if cambio.catalogo in ('estudiantes', None):
+            self.refresco.pedir(self.update_filter_combos)
+        if cambio.catalogo in ('estudiantes', 'notas', None):
+            self.refresco.pedir(self.update_statistics)
+            self.refresco.pedir(self.update_selected_student_info)
     
     def update_filter_combos(self):
         """Actualizar los combos de filtro"""
@@ -649,56 +632,12 @@ class StudentsTab(QWidget):
     
     def filter_table(self):
         """Filtrar tabla según criterios seleccionados"""
-        search_text = self.search_input.text().lower()
         selected_program = self.program_filter.currentText()
         selected_performance = self.performance_filter.currentText()
         
-        for row in range(self.table.rowCount()):
-            show_row = True
-            
-            # Filtro por texto de búsqueda
-            if search_text:
-                row_text = ""
-                for col in range(self.table.columnCount() - 1):  # Excluir promedio
-                    item = self.table.item(row, col)
-                    if item:
-                        row_text += item.text().lower() + " "
-                
-                if search_text not in row_text:
-                    show_row = False
-            
-            # Filtro por programa
-            if selected_program != "Todos los programas":
-                program_item = self.table.item(row, 2)
-                if program_item and program_item.text() != selected_program:
-                    show_row = False
-            
-            # Filtro por rendimiento
-            if selected_performance != "Todos":
-                promedio_item = self.table.item(row, 5)
-                if promedio_item:
-                    promedio_text = promedio_item.text()
-                    if promedio_text == "Sin notas":
-                        if selected_performance != "Sin Calificaciones":
-                            show_row = False
-                    else:
-                        try:
-                            promedio = float(promedio_text)
-                            if selected_performance == "Excelente (≥4.5)" and promedio < 4.5:
-                                show_row = False
-                            elif selected_performance == "Bueno (4.0-4.4)" and not (4.0 <= promedio < 4.5):
-                                show_row = False
-                            elif selected_performance == "Regular (3.0-3.9)" and not (3.0 <= promedio < 4.0):
-                                show_row = False
-                            elif selected_performance == "En Riesgo (<3.0)" and promedio >= 3.0:
-                                show_row = False
-                            elif selected_performance == "Sin Calificaciones":
-                                show_row = False
-                        except ValueError:
-                            if selected_performance != "Sin Calificaciones":
-                                show_row = False
-            
-            self.table.setRowHidden(row, not show_row)
+        self.busqueda.solicitar(self.search_input.text(),
+                                programa=selected_program if selected_program != "Todos los programas" else None,
+                                rendimiento=RANGOS_RENDIMIENTO.get(selected_performance))
     
     def clear_filters(self):
         """Limpiar todos los filtros"""
@@ -747,7 +686,7 @@ class StudentsTab(QWidget):
     
     def update_selected_student_info(self):
         """Actualizar información del estudiante seleccionado"""
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row < 0:
             self.selected_student_info.setText("Seleccione un estudiante para ver detalles")
             self.student_avg_label.setText("📊 Promedio: --")
@@ -757,11 +696,11 @@ class StudentsTab(QWidget):
             return
         
         # Obtener información del estudiante
-        codigo = self.table.item(selected_row, 0).text()
-        nombre = self.table.item(selected_row, 1).text()
-        programa = self.table.item(selected_row, 2).text()
-        email = self.table.item(selected_row, 3).text()
-        telefono = self.table.item(selected_row, 4).text()
+        codigo = self.model.texto(selected_row, 0)
+        nombre = self.model.texto(selected_row, 1)
+        programa = self.model.texto(selected_row, 2)
+        email = self.model.texto(selected_row, 3)
+        telefono = self.model.texto(selected_row, 4)
         
         # Información básica con mejor formato
         info_text = f"""
@@ -800,13 +739,13 @@ class StudentsTab(QWidget):
             self.academic_status_label.setStyleSheet(f"padding: 5px; border-radius: 4px; {color}")
             
             # Estadísticas de calificaciones con mejor formato
-            notas_estudiante = [n for n in self.sistema.notas_heap if n.estudiante == codigo]
-            if notas_estudiante:
-                total_notas = len(notas_estudiante)
-                notas_excelentes = len([n for n in notas_estudiante if n.calificacion >= 4.5])
-                notas_buenas = len([n for n in notas_estudiante if 4.0 <= n.calificacion < 4.5])
-                notas_regulares = len([n for n in notas_estudiante if 3.0 <= n.calificacion < 4.0])
-                notas_riesgo = len([n for n in notas_estudiante if n.calificacion < 3.0])
+            resumen = self.sistema.resumen_notas_estudiante(codigo)
+            if resumen.total:
+                total_notas = resumen.total
+                notas_excelentes = resumen.excelentes
+                notas_buenas = resumen.buenas
+                notas_regulares = resumen.regulares
+                notas_riesgo = resumen.deficientes
                 
                 stats_text = f"""
                 <table style='width:100%; color: black;'>
@@ -838,37 +777,37 @@ class StudentsTab(QWidget):
     
     def edit_student(self):
         """Editar estudiante seleccionado"""
-        selected = self.table.currentRow()
+        selected = self.table.currentIndex().row()
         if selected < 0:
             QMessageBox.warning(self, "⚠️ Selección Requerida", 
                               "Seleccione un estudiante para editar.")
             return
         
-        codigo = self.table.item(selected, 0).text()
+        codigo = self.model.texto(selected, 0)
         estudiante = self.sistema.estudiantes.get(codigo)
         if estudiante:
             self.parent.show_edit_student_dialog(estudiante)
     
     def delete_student(self):
         """Eliminar estudiante seleccionado"""
-        selected = self.table.currentRow()
+        selected = self.table.currentIndex().row()
         if selected < 0:
             QMessageBox.warning(self, "⚠️ Selección Requerida", 
                               "Seleccione un estudiante para eliminar.")
             return
         
-        codigo = self.table.item(selected, 0).text()
-        nombre = self.table.item(selected, 1).text()
+        codigo = self.model.texto(selected, 0)
+        nombre = self.model.texto(selected, 1)
         
-        # Verificar si tiene calificaciones
-        notas_estudiante = [n for n in self.sistema.notas_heap if n.estudiante == codigo]
+        # Verificar si tiene calificaciones (sin crear los objetos Nota)
+        total_notas = self.sistema.contar_notas_estudiante(codigo)
         
         warning_text = f"¿Está seguro que desea eliminar al estudiante?\n\n" \
                       f"👤 Nombre: {nombre}\n" \
                       f"🔢 Código: {codigo}\n\n"
         
-        if notas_estudiante:
-            warning_text += f"⚠️ ADVERTENCIA: Este estudiante tiene {len(notas_estudiante)} calificaciones registradas.\n" \
+        if total_notas:
+            warning_text += f"⚠️ ADVERTENCIA: Este estudiante tiene {total_notas} calificaciones registradas.\n" \
                            f"Al eliminarlo, también se eliminarán todas sus calificaciones.\n\n"
         
         warning_text += "Esta acción no se puede deshacer."
@@ -881,26 +820,26 @@ class StudentsTab(QWidget):
         )
         
         if reply == QMessageBox.Yes:
-            if self.sistema.eliminar_estudiante(codigo):
+            dialogo, progreso = crear_dialogo_progreso(self, f"Eliminando calificaciones de '{nombre}'...", total_notas)
+            eliminado = self.sistema.eliminar_estudiante(codigo, progreso)
+            dialogo.close()
+            if eliminado:
                 QMessageBox.information(self, "✅ Éxito", 
                                       f"Estudiante '{nombre}' eliminado correctamente.")
-                self.refresh_data()
-                self.parent.dashboard.update_stats()
-                self.parent.update_system_info()
             else:
                 QMessageBox.warning(self, "❌ Error", 
                                   "No se pudo eliminar el estudiante.")
     
     def view_student_grades(self):
         """Ver calificaciones del estudiante seleccionado"""
-        selected = self.table.currentRow()
+        selected = self.table.currentIndex().row()
         if selected < 0:
             QMessageBox.warning(self, "⚠️ Selección Requerida", 
                               "Seleccione un estudiante para ver sus calificaciones.")
             return
         
-        codigo = self.table.item(selected, 0).text()
-        nombre = self.table.item(selected, 1).text()
+        codigo = self.model.texto(selected, 0)
+        nombre = self.model.texto(selected, 1)
         
         # Ir a la pestaña de notas y filtrar por el estudiante
         self.parent.show_main_tab(3)  # Pestaña de notas
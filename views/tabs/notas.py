@@ -1,14 +1,23 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                            QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox,
+                            QTableView, QHeaderView, QMessageBox,
                             QLabel, QFrame, QLineEdit, QComboBox, QGroupBox, QGridLayout,
                             QSplitter, QScrollArea)
 from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QIcon, QColor, QBrush, QFont, QPalette
-from models.estudiante import Estudiante
-from models.asignatura import Asignatura
+from PyQt5.QtGui import QIcon, QPalette
+from ..modelos_tabla import ModeloNotas
+from ..busqueda_diferida import BusquedaDiferida
+from ..refresco_diferido import RefrescoDiferido
 from models.nota import Nota
 from models.sistema_notas import SistemaNotas
 
+# Opción del filtro de calificación -> rango [minimo, maximo)
+RANGOS_CALIFICACION = {
+    "Excelente (4.5-5.0)": (4.5, None),
+    "Buena (4.0-4.4)": (4.0, 4.5),
+    "Aceptable (3.0-3.9)": (3.0, 4.0),
+    "Deficiente (<3.0)": (None, 3.0),
+}
+
 class NotesTab(QWidget):
     """Pestaña de gestión de notas con diseño moderno"""
     def __init__(self, sistema, parent=None):
@@ -17,6 +26,10 @@ class NotesTab(QWidget):
         self.parent = parent
         self.setup_modern_ui()
         self.apply_modern_styles()
+        
+        # Tras cada cambio el modelo toca solo las filas afectadas; combos y estadísticas se refrescan una vez
+        self.refresco = RefrescoDiferido(self)
+        self.sistema.suscribir(self.on_data_changed)
     
     def setup_modern_ui(self):
         # Layout principal
@@ -161,12 +174,11 @@ class NotesTab(QWidget):
         table_layout.addWidget(table_title)
         
         # Tabla de notas mejorada
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([
-            "👤 Estudiante", "📚 Asignatura", "📊 Calificación", 
-            "📅 Fecha", "⚖️ Peso", "📝 Descripción", "🎯 Estado"
-        ])
+        self.table = QTableView()
+        self.model = ModeloNotas(self.sistema, self)
+        self.busqueda = BusquedaDiferida(self.model.consultar, self.model.mostrar, parent=self,
+                                         capturar=self.model.capturar_estado)
+        self.table.setModel(self.model)
         
         # Configurar tabla
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
@@ -175,9 +187,11 @@ class NotesTab(QWidget):
         self.table.horizontalHeader().setSectionResizeMode(5, QHeaderView.Stretch)  # Descripción
         
         self.table.verticalHeader().setVisible(False)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
         self.table.setAlternatingRowColors(True)
+        # Sin orden inicial: las notas aparecen en el orden del sistema hasta pulsar un encabezado
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
         self.table.setSortingEnabled(True)
         self.table.setObjectName("notesTable")
         
@@ -219,7 +233,7 @@ class NotesTab(QWidget):
         info_layout.addWidget(self.selected_note_info)
         
         # Conectar selección de tabla
-        self.table.itemSelectionChanged.connect(self.update_selected_note_info)
+        self.table.selectionModel().selectionChanged.connect(self.update_selected_note_info)
         
         parent_layout.addWidget(info_group)
     
@@ -510,71 +524,26 @@ class NotesTab(QWidget):
     
     def update_table(self):
         """Actualizar tabla con todas las notas"""
-        self.table.setRowCount(0)
-        
         # Actualizar filtros
         self.update_filter_combos()
         
-        # Ordenar notas por estudiante y asignatura
-        notas_ordenadas = sorted(self.sistema.notas_heap, key=lambda x: (
-            self.sistema.estudiantes.get(x.estudiante, Estudiante("", x.estudiante, "")).nombre,
-            self.sistema.asignaturas.get(x.asignatura, Asignatura("", x.asignatura)).nombre
-        ))
-        
-        for nota in notas_ordenadas:
-            self.add_note_to_table(nota)
+        # El modelo solo relee los ids de las notas; cada fila se formatea al pintarse
+        self.model.recargar()
         
         # Actualizar contador
-        self.notes_count_label.setText(f"{len(notas_ordenadas)} calificaciones registradas")
+        self.notes_count_label.setText(f"{self.model.total()} calificaciones registradas")
     
-    def add_note_to_table(self, nota):
-        """Agregar una nota a la tabla"""
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        
-        # Obtener nombres de estudiante y asignatura
-        estudiante = self.sistema.estudiantes.get(nota.estudiante, None)
-        nombre_estudiante = estudiante.nombre if estudiante else nota.estudiante
-        
-        asignatura = self.sistema.asignaturas.get(nota.asignatura, None)
-        nombre_asignatura = asignatura.nombre if asignatura else nota.asignatura
-        
-        # Determinar estado de la calificación
-        if nota.calificacion >= 4.5:
-            estado = "🌟 Excelente"
-            color_estado = QColor(46, 204, 113)
-        elif nota.calificacion >= 4.0:
-            estado = "✅ Buena"
-            color_estado = QColor(52, 152, 219)
-        elif nota.calificacion >= 3.0:
-            estado = "⚠️ Aceptable"
-            color_estado = QColor(241, 196, 15)
-        else:
-            estado = "❌ Deficiente"
-            color_estado = QColor(231, 76, 60)
-        
-        # Crear items para la tabla
-        items = [
-            QTableWidgetItem(nombre_estudiante),
-            QTableWidgetItem(nombre_asignatura),
-            QTableWidgetItem(f"{nota.calificacion:.2f}"),
-            QTableWidgetItem(nota.fecha.strftime('%d/%m/%Y')),
-            QTableWidgetItem(f"{nota.peso:.1f}%"),
-            QTableWidgetItem(nota.descripcion),
-            QTableWidgetItem(estado)
-        ]
-        
-        # Aplicar colores según la calificación
-        items[2].setForeground(QBrush(color_estado))
-        items[2].setFont(QFont("Arial", 10, QFont.Bold))
-        
-        items[6].setForeground(QBrush(color_estado))
-        items[6].setFont(QFont("Arial", 9, QFont.Bold))
-        
-        # Hacer celdas no editables
-        for col, item in enumerate(items):
-            self.table.setItem(row, col, item)
-            item.setFlags(item.flags() ^ Qt.ItemIsEditable)
+    def on_data_changed(self, cambio):
+        """Aplicar un cambio del sistema (ver models/eventos.py)"""
+        self.model.aplicar_cambio(cambio)
+        self.notes_count_label.setText(f"{self.model.total()} calificaciones registradas")
+        
+        if cambio.catalogo in ('estudiantes', 'asignaturas', None):
+            self.refresco.pedir(self.update_filter_combos)
+        if cambio.catalogo in ('notas', None):
+            self.refresco.pedir(self.update_statistics)
+        if cambio.catalogo in ('notas', 'estudiantes', 'asignaturas', None):
+            self.refresco.pedir(self.update_selected_note_info)
     
     def update_filter_combos(self):
         """Actualizar los combos de filtro"""
@@ -609,55 +578,20 @@ class NotesTab(QWidget):
     
     def filter_table(self):
         """Filtrar tabla según criterios seleccionados"""
-        search_text = self.search_input.text().lower()
         selected_student = self.student_filter.currentText()
         selected_subject = self.subject_filter.currentText()
         selected_grade = self.grade_filter.currentText()
         
-        for row in range(self.table.rowCount()):
-            show_row = True
-            
-            # Filtro por texto de búsqueda
-            if search_text:
-                row_text = ""
-                for col in range(self.table.columnCount()):
-                    item = self.table.item(row, col)
-                    if item:
-                        row_text += item.text().lower() + " "
-                
-                if search_text not in row_text:
-                    show_row = False
-            
-            # Filtro por estudiante
-            if selected_student != "Todos los estudiantes":
-                student_item = self.table.item(row, 0)
-                if student_item and student_item.text() != selected_student:
-                    show_row = False
-            
-            # Filtro por asignatura
-            if selected_subject != "Todas las asignaturas":
-                subject_item = self.table.item(row, 1)
-                if subject_item and subject_item.text() != selected_subject:
-                    show_row = False
-            
-            # Filtro por calificación
-            if selected_grade != "Todas":
-                grade_item = self.table.item(row, 2)
-                if grade_item:
-                    try:
-                        grade = float(grade_item.text())
-                        if selected_grade == "Excelente (4.5-5.0)" and not (4.5 <= grade <= 5.0):
-                            show_row = False
-                        elif selected_grade == "Buena (4.0-4.4)" and not (4.0 <= grade < 4.5):
-                            show_row = False
-                        elif selected_grade == "Aceptable (3.0-3.9)" and not (3.0 <= grade < 4.0):
-                            show_row = False
-                        elif selected_grade == "Deficiente (<3.0)" and not (grade < 3.0):
-                            show_row = False
-                    except ValueError:
-                        show_row = False
-            
-            self.table.setRowHidden(row, not show_row)
+        # Los combos muestran nombres; el sistema filtra por códigos
+        estudiantes = None
+        if selected_student != "Todos los estudiantes":
+            estudiantes = {codigo for codigo, e in self.sistema.estudiantes.items() if e.nombre == selected_student}
+        asignaturas = None
+        if selected_subject != "Todas las asignaturas":
+            asignaturas = {codigo for codigo, a in self.sistema.asignaturas.items() if a.nombre == selected_subject}
+        
+        self.busqueda.solicitar(self.search_input.text(), estudiantes=estudiantes, asignaturas=asignaturas,
+                                rango=RANGOS_CALIFICACION.get(selected_grade))
     
     def clear_filters(self):
         """Limpiar todos los filtros"""
@@ -668,17 +602,18 @@ class NotesTab(QWidget):
     
     def update_statistics(self):
         """Actualizar estadísticas generales"""
-        if not self.sistema.notas_heap:
+        total = self.sistema.total_notas()
+        if not total:
             self.avg_grade_label.setText("📊 Promedio General: --")
             self.highest_grade_label.setText("🏆 Nota Más Alta: --")
             self.lowest_grade_label.setText("📉 Nota Más Baja: --")
             return
         
-        # Calcular estadísticas
-        calificaciones = [nota.calificacion for nota in self.sistema.notas_heap]
-        promedio = sum(calificaciones) / len(calificaciones)
-        nota_alta = max(calificaciones)
-        nota_baja = min(calificaciones)
+        # Calcular estadísticas (una sola pasada sobre todas las calificaciones)
+        resumen = self.sistema.resumen_general()
+        promedio = resumen.promedio
+        nota_alta = resumen.maximo
+        nota_baja = resumen.minimo
         
         # Actualizar labels
         self.avg_grade_label.setText(f"📊 Promedio General: {promedio:.2f}")
@@ -686,37 +621,38 @@ class NotesTab(QWidget):
         self.lowest_grade_label.setText(f"📉 Nota Más Baja: {nota_baja:.2f}")
         
         # Actualizar estadísticas rápidas
-        total_excelentes = len([n for n in calificaciones if n >= 4.5])
-        total_deficientes = len([n for n in calificaciones if n < 3.0])
+        total_excelentes = resumen.excelentes
+        total_deficientes = resumen.deficientes
         
         stats_text = f"""
-        📈 Total de calificaciones: {len(calificaciones)}
+        📈 Total de calificaciones: {total}
         🌟 Excelentes (≥4.5): {total_excelentes}
         ❌ Deficientes (<3.0): {total_deficientes}
         📊 Promedio: {promedio:.2f}
+        📐 Mediana: {resumen.mediana:.2f} · Desv. estándar: {resumen.desviacion:.2f}
         
         🎯 Distribución:
-        • Excelente: {(total_excelentes/len(calificaciones)*100):.1f}%
-        • Deficiente: {(total_deficientes/len(calificaciones)*100):.1f}%
+        • Excelente: {(total_excelentes/total*100):.1f}%
+        • Deficiente: {(total_deficientes/total*100):.1f}%
         """
         
         self.quick_stats_label.setText(stats_text.strip())
     
     def update_selected_note_info(self):
         """Actualizar información de la nota seleccionada"""
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row < 0:
             self.selected_note_info.setText("Seleccione una calificación para ver detalles")
             return
         
         # Obtener información de la fila seleccionada
-        estudiante = self.table.item(selected_row, 0).text()
-        asignatura = self.table.item(selected_row, 1).text()
-        calificacion = self.table.item(selected_row, 2).text()
-        fecha = self.table.item(selected_row, 3).text()
-        peso = self.table.item(selected_row, 4).text()
-        descripcion = self.table.item(selected_row, 5).text()
-        estado = self.table.item(selected_row, 6).text()
+        estudiante = self.model.texto(selected_row, 0)
+        asignatura = self.model.texto(selected_row, 1)
+        calificacion = self.model.texto(selected_row, 2)
+        fecha = self.model.texto(selected_row, 3)
+        peso = self.model.texto(selected_row, 4)
+        descripcion = self.model.texto(selected_row, 5)
+        estado = self.model.texto(selected_row, 6)
         
         info_text = f"""
         👤 <b>Estudiante:</b> {estudiante}
@@ -742,38 +678,35 @@ class NotesTab(QWidget):
     
     def edit_note(self):
         """Editar nota seleccionada"""
-        selected = self.table.currentRow()
+        selected = self.table.currentIndex().row()
         if selected < 0:
             QMessageBox.warning(self, "⚠️ Selección Requerida", 
                               "Seleccione una calificación para editar.")
             return
         
-        # Obtener índice real considerando filtros
-        visible_rows = []
-        for row in range(self.table.rowCount()):
-            if not self.table.isRowHidden(row):
-                visible_rows.append(row)
-        
-        if selected >= len(visible_rows):
-            return
-        
-        actual_index = visible_rows[selected]
-        if actual_index < len(self.sistema.notas_heap):
-            nota = self.sistema.notas_heap[actual_index]
+        nota = self.sistema.obtener_nota(self.selected_note_id())
+        if nota:
             self.parent.show_edit_note_dialog(nota)
     
+    def selected_note_id(self):
+        """Obtener el identificador de la nota en la fila seleccionada"""
+        selected = self.table.currentIndex().row()
+        if selected < 0:
+            return None
+        return self.model.clave(selected)
+    
     def delete_note(self):
         """Eliminar nota seleccionada"""
-        selected = self.table.currentRow()
+        selected = self.table.currentIndex().row()
         if selected < 0:
             QMessageBox.warning(self, "⚠️ Selección Requerida", 
                               "Seleccione una calificación para eliminar.")
             return
         
         # Obtener información de la nota
-        estudiante = self.table.item(selected, 0).text()
-        asignatura = self.table.item(selected, 1).text()
-        calificacion = self.table.item(selected, 2).text()
+        estudiante = self.model.texto(selected, 0)
+        asignatura = self.model.texto(selected, 1)
+        calificacion = self.model.texto(selected, 2)
         
         reply = QMessageBox.question(
             self, "🗑️ Confirmar Eliminación", 
@@ -787,22 +720,9 @@ class NotesTab(QWidget):
         )
         
         if reply == QMessageBox.Yes:
-            # Obtener índice real considerando filtros
-            visible_rows = []
-            for row in range(self.table.rowCount()):
-                if not self.table.isRowHidden(row):
-                    visible_rows.append(row)
-            
-            if selected >= len(visible_rows):
-                return
-            
-            actual_index = visible_rows[selected]
-            if self.sistema.eliminar_nota(actual_index):
+            if self.sistema.eliminar_nota(self.selected_note_id()):
                 QMessageBox.information(self, "✅ Éxito", 
                                       "Calificación eliminada correctamente.")
-                self.refresh_data()
-                self.parent.dashboard.update_stats()
-                self.parent.update_system_info()
             else:
                 QMessageBox.warning(self, "❌ Error", 
                                   "No se pudo eliminar la calificación.")
\ No newline at end of file
@@ -1,9 +1,20 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                            QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox, QDialog,
+                            QTableView, QHeaderView, QMessageBox, QDialog,
                             QLabel, QFrame, QLineEdit, QComboBox, QGroupBox, QGridLayout,
                             QSplitter, QScrollArea, QProgressBar)
 from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QIcon, QColor, QBrush, QFont, QPalette
+from PyQt5.QtGui import QIcon, QPalette
+from ..modelos_tabla import ModeloProfesores
+from ..busqueda_diferida import BusquedaDiferida
+from ..refresco_diferido import RefrescoDiferido
+
+# Opción del filtro de estado -> criterio de ModeloProfesores
+ESTADOS_FILTRO = {
+    "Con Asignaturas": 'con_asignaturas',
+    "Sin Asignaturas": 'sin_asignaturas',
+    "Con Email": 'con_email',
+    "Sin Email": 'sin_email',
+}
 
 class ProfesoresTab(QWidget):
     """Pestaña de gestión de profesores con diseño moderno"""
@@ -13,6 +24,10 @@ class ProfesoresTab(QWidget):
         self.parent = parent
         self.setup_modern_ui()
         self.apply_modern_styles()
+        
+        # Tras cada cambio el modelo toca solo las filas afectadas; combos y estadísticas se refrescan una vez
+        self.refresco = RefrescoDiferido(self)
+        self.sistema.suscribir(self.on_data_changed)
 
     def setup_modern_ui(self):
         # Layout principal
@@ -150,15 +165,18 @@ class ProfesoresTab(QWidget):
         table_layout.addWidget(table_title)
         
         # Tabla original pero con estilos mejorados
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["🔢 ID", "👨‍🏫 Nombre", "📧 Email", "📱 Teléfono", "🎓 Especialidad"])
+        self.table = QTableView()
+        self.model = ModeloProfesores(self.sistema, self)
+        self.busqueda = BusquedaDiferida(self.model.consultar, self.model.mostrar, parent=self,
+                                         capturar=self.model.capturar_estado)
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.verticalHeader().setVisible(False)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
         self.table.setAlternatingRowColors(True)
         self.table.setSortingEnabled(True)
+        self.table.sortByColumn(1, Qt.AscendingOrder)  # por nombre
         self.table.setObjectName("professorsTable")
         
         # Conectar doble clic para editar
@@ -199,7 +217,7 @@ class ProfesoresTab(QWidget):
         info_layout.addWidget(self.selected_professor_info)
         
         # Conectar selección de tabla
-        self.table.itemSelectionChanged.connect(self.update_selected_professor_info)
+        self.table.selectionModel().selectionChanged.connect(self.update_selected_professor_info)
         
         parent_layout.addWidget(info_group)
 
@@ -501,49 +519,28 @@ class ProfesoresTab(QWidget):
             }
         """)
 
-    # Métodos originales mantenidos exactamente igual
     def update_table(self):
-        """Actualizar tabla con todos los profesores (método original mejorado)"""
-        self.table.setRowCount(0)
-        
+        """Actualizar tabla con todos los profesores"""
         # Actualizar filtros
         self.update_filter_combos()
         
-        # Lógica original mantenida
-        profesores = sorted(self.sistema.obtener_profesores(), key=lambda x: x.nombre)
-        
-        for profesor in profesores:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            
-            # Determinar estado del profesor para colores
-            asignaturas_asignadas = [a for a in self.sistema.asignaturas.values() if hasattr(a, 'profesor') and a.profesor == profesor.id_profesor]
-            
-            # Validar email
-            email_valido = "@" in profesor.email if profesor.email else False
-            email_display = profesor.email if email_valido else "Sin email"
-            email_color = QColor(46, 204, 113) if email_valido else QColor(231, 76, 60)
-            
-            # Items originales mantenidos
-            items = [
-                QTableWidgetItem(profesor.id_profesor),
-                QTableWidgetItem(profesor.nombre),
-                QTableWidgetItem(email_display),
-                QTableWidgetItem(profesor.telefono),
-                QTableWidgetItem(profesor.especialidad)
-            ]
-            
-            # Aplicar colores mejorados
-            items[2].setForeground(QBrush(email_color))
-            items[2].setFont(QFont("Arial", 9, QFont.Bold if email_valido else QFont.Normal))
-            
-            for col, item in enumerate(items):
-                self.table.setItem(row, col, item)
-                item.setFlags(item.flags() ^ Qt.ItemIsEditable)
+        # El modelo solo relee los identificadores; cada fila se formatea al pintarse
+        self.model.recargar()
         
         # Actualizar estadísticas
         self.update_statistics()
 
+    def on_data_changed(self, cambio):
+        """Aplicar un cambio del sistema (ver models/eventos.py)"""
+        self.model.aplicar_cambio(cambio)
+        self.professors_count_label.setText(f"{self.model.total()} profesores registrados")
+        
+        if cambio.catalogo in ('profesores', None):
+            self.refresco.pedir(self.update_filter_combos)
+        if cambio.catalogo in ('profesores', 'asignaturas', None):
+            self.refresco.pedir(self.update_statistics)
+            self.refresco.pedir(self.update_selected_professor_info)
+
     def update_filter_combos(self):
         """Actualizar los combos de filtro"""
         # Guardar selección actual
@@ -570,50 +567,12 @@ class ProfesoresTab(QWidget):
 
     def filter_table(self):
         """Filtrar tabla según criterios seleccionados"""
-        search_text = self.search_input.text().lower()
         selected_specialty = self.specialty_filter.currentText()
-        selected_status = self.status_filter.currentText()
-        
-        for row in range(self.table.rowCount()):
-            show_row = True
-            
-            # Filtro por texto de búsqueda
-            if search_text:
-                row_text = ""
-                for col in range(self.table.columnCount()):
-                    item = self.table.item(row, col)
-                    if item:
-                        row_text += item.text().lower() + " "
-                
-                if search_text not in row_text:
-                    show_row = False
-            
-            # Filtro por especialidad
-            if selected_specialty != "Todas las especialidades":
-                specialty_item = self.table.item(row, 4)
-                if specialty_item and specialty_item.text() != selected_specialty:
-                    show_row = False
-            
-            # Filtro por estado
-            if selected_status != "Todos":
-                id_profesor = self.table.item(row, 0).text()
-                email_item = self.table.item(row, 2)
-                
-                if email_item:
-                    has_subjects = any(hasattr(a, 'profesor') and a.profesor == id_profesor for a in self.sistema.asignaturas.values())
-                    has_email = "Sin email" not in email_item.text()
-                    
-                    if selected_status == "Con Asignaturas" and not has_subjects:
-                        show_row = False
-                    elif selected_status == "Sin Asignaturas" and has_subjects:
-                        show_row = False
-                    elif selected_status == "Con Email" and not has_email:
-                        show_row = False
-                    elif selected_status == "Sin Email" and has_email:
-                        show_row = False
-            
-            self.table.setRowHidden(row, not show_row)
-
+        
+        self.busqueda.solicitar(self.search_input.text(),
+                                especialidad=selected_specialty if selected_specialty != "Todas las especialidades" else None,
+                                estado=ESTADOS_FILTRO.get(self.status_filter.currentText()))
+    
     def clear_filters(self):
         """Limpiar todos los filtros"""
         self.search_input.clear()
@@ -639,11 +598,9 @@ class ProfesoresTab(QWidget):
         especialidades = set(p.especialidad for p in profesores if p.especialidad)
         self.specialties_count_label.setText(f"🎓 Especialidades: {len(especialidades)}")
         
-        # Contar profesores con asignaturas
-        profesores_con_asignaturas = 0
-        for profesor in profesores:
-            if any(hasattr(a, 'profesor') and a.profesor == profesor.id_profesor for a in self.sistema.asignaturas.values()):
-                profesores_con_asignaturas += 1
+        # Contar profesores con asignaturas (una pasada por las asignaturas, no una por profesor)
+        asignados = {a.profesor for a in self.sistema.asignaturas.values()}
+        profesores_con_asignaturas = sum(1 for p in profesores if p.id_profesor in asignados)
         
         self.assigned_professors_label.setText(f"📚 Con Asignaturas: {profesores_con_asignaturas}")
         
@@ -657,7 +614,7 @@ class ProfesoresTab(QWidget):
 
     def update_selected_professor_info(self):
         """Actualizar información del profesor seleccionado"""
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row < 0:
             self.selected_professor_info.setText("Seleccione un profesor para ver detalles")
             self.professor_subjects_count.setText("📊 Total: 0 asignaturas")
@@ -665,7 +622,7 @@ class ProfesoresTab(QWidget):
             return
         
         # Obtener información del profesor
-        id_profesor = self.table.item(selected_row, 0).text()
+        id_profesor = self.model.texto(selected_row, 0)
         profesor = self.sistema.profesores.get(id_profesor)
         
         if not profesor:
@@ -721,19 +678,18 @@ class ProfesoresTab(QWidget):
                 
                 if self.sistema.agregar_profesor(nuevo_profesor):
                     QMessageBox.information(self, "✅ Éxito", "Profesor agregado correctamente")
-                    self.update_table()
                 else:
                     QMessageBox.warning(self, "❌ Error", "El ID de profesor ya existe")
         except ImportError:
             QMessageBox.warning(self, "❌ Error", "No se pudo cargar el diálogo de profesor")
 
     def show_edit_dialog(self):
-        selected = self.table.currentRow()
+        selected = self.table.currentIndex().row()
         if selected < 0:
             QMessageBox.warning(self, "⚠️ Error", "Seleccione un profesor para editar")
             return
         
-        id_profesor = self.table.item(selected, 0).text()
+        id_profesor = self.model.texto(selected, 0)
         profesor = self.sistema.profesores.get(id_profesor)
         
         if profesor:
@@ -758,19 +714,18 @@ class ProfesoresTab(QWidget):
                     
                     if self.sistema.editar_profesor(id_profesor, profesor_editado):
                         QMessageBox.information(self, "✅ Éxito", "Profesor actualizado correctamente")
-                        self.update_table()
                     else:
                         QMessageBox.warning(self, "❌ Error", "No se pudo actualizar el profesor")
             except ImportError:
                 QMessageBox.warning(self, "❌ Error", "No se pudo cargar el diálogo de profesor")
 
     def delete_profesor(self):
-        selected = self.table.currentRow()
+        selected = self.table.currentIndex().row()
         if selected < 0:
             QMessageBox.warning(self, "⚠️ Error", "Seleccione un profesor para eliminar")
             return
         
-        id_profesor = self.table.item(selected, 0).text()
+        id_profesor = self.model.texto(selected, 0)
         profesor = self.sistema.profesores.get(id_profesor)
         
         if profesor:
@@ -783,7 +738,6 @@ class ProfesoresTab(QWidget):
             if reply == QMessageBox.Yes:
                 if self.sistema.eliminar_profesor(id_profesor):
                     QMessageBox.information(self, "✅ Éxito", "Profesor eliminado correctamente")
-                    self.update_table()
                 else:
                     QMessageBox.warning(self, "❌ Error", 
                         "No se pudo eliminar el profesor. Verifique que no esté asignado a ninguna asignatura.")
\ No newline at end of file